@@ -0,0 +1,422 @@
+"""
+Buffered ingestion of engagement events into daily analytics and trends.
+"""
+
+from typing import List, Dict, Any, Iterable, NamedTuple, Optional, Sequence, Tuple
+from collections import Counter, deque
+from datetime import date, datetime, timedelta, timezone
+import logging
+import threading
+import time
+
+from sqlalchemy import Table, select
+from sqlalchemy.engine import Engine
+
+from app.catalog.store import CatalogStore
+from app.core import schema
+from app.core.config import settings
+
+from .ingest import ANALYTICS_TABLES, AnalyticsIngestor
+from .trending import EVENT_ALIASES, EVENT_WEIGHTS, trend_tracker
+
+logger = logging.getLogger(__name__)
+
+# Daily analytics column each event type adds to, per kind of entity
+EVENT_COLUMNS: Dict[str, Dict[str, str]] = {
+    "products": {"view": "views", "click": "clicks", "sale": "sales"},
+    "shops": {"view": "views", "click": "clicks", "sale": "sales"},
+    "creators": {"view": "views", "like": "likes", "comment": "comments", "share": "shares", "follow": "followers_gained"},
+    "videos": {"view": "views", "like": "likes", "comment": "comments", "share": "shares", "save": "saves"}
+}
+
+EVENT_TYPES = frozenset(EVENT_WEIGHTS) | {"follow"}
+
+# Event field naming the entity, checked in this order
+ENTITY_FIELDS: Dict[str, str] = {"products": "product_id", "videos": "video_id", "creators": "creator_id"}
+
+# Catalog table, external id column and parent (kind, column) of each kind;
+# a product's events also count for its shop, a video's for its creator
+_SOURCES: Dict[str, Tuple[Table, str, Optional[Tuple[str, str]]]] = {
+    "products": (schema.products, "product_id", ("shops", "shop_id")),
+    "videos": (schema.videos, "video_id", ("creators", "creator_id")),
+    "creators": (schema.creators, "creator_id", None)
+}
+
+MAX_CLOCK_SKEW_SECONDS = 300
+MAX_QUANTITY = 10_000
+_ID_CACHE_SIZE = 100_000
+_EPOCH_DAY = date(1970, 1, 1)
+
+
+class Event(NamedTuple):
+    kind: str
+    entity_id: str
+    type: str
+    timestamp: float
+    user_id: Optional[str]
+    quantity: int
+    amount: float
+
+
+def _timestamp(value: Any, now: float) -> float:
+    if value is None:
+        return now
+    if isinstance(value, bool):
+        raise ValueError("timestamp must be epoch seconds or an ISO 8601 string")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    raise ValueError("timestamp must be epoch seconds or an ISO 8601 string")
+
+
+def parse_event(payload: Any, now: float) -> Event:
+    """Validate one event payload; raises ``ValueError`` with the reason."""
+    if not isinstance(payload, dict):
+        raise ValueError("event must be a JSON object")
+    event_type = payload.get("type", "view")
+    if isinstance(event_type, str):
+        event_type = EVENT_ALIASES.get(event_type, event_type)
+    if not isinstance(event_type, str) or event_type not in EVENT_TYPES:
+        raise ValueError(f"unknown event type {event_type!r}")
+
+    for kind, field in ENTITY_FIELDS.items():
+        entity_id = payload.get(field)
+        if entity_id is not None:
+            break
+    else:
+        raise ValueError("event needs a product_id, video_id or creator_id")
+    if not isinstance(entity_id, str) or not 0 < len(entity_id) <= 100:
+        raise ValueError(f"{field} must be a string of 1 to 100 characters")
+
+    timestamp = _timestamp(payload.get("timestamp"), now)
+    if not now - settings.EVENTS_MAX_AGE_DAYS * 86400 <= timestamp <= now + MAX_CLOCK_SKEW_SECONDS:
+        raise ValueError(f"timestamp must be within the last {settings.EVENTS_MAX_AGE_DAYS} days")
+
+    quantity = payload.get("quantity", 1)
+    if isinstance(quantity, bool) or not isinstance(quantity, int) or not 1 <= quantity <= MAX_QUANTITY:
+        raise ValueError(f"quantity must be an integer from 1 to {MAX_QUANTITY}")
+    amount = payload.get("amount", 0)
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not 0 <= amount < 1e9:
+        raise ValueError("amount must be a non-negative number")
+
+    user_id = payload.get("user_id")
+    return Event(
+        kind, entity_id, event_type, timestamp,
+        None if user_id is None else str(user_id), quantity, float(amount)
+    )
+
+
+class EventBuffer:
+    """Fixed-capacity FIFO ring of parsed events.
+
+    Request handlers ``put`` and the flusher ``take``; both only copy list
+    slices under a lock. ``put`` is all-or-nothing, so a request refused
+    for lack of room can be retried as a whole.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._slots: List[Optional[Event]] = [None] * capacity
+        self._head = 0  # oldest event
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, events: Sequence[Event]) -> bool:
+        """Append ``events``; ``False`` (and nothing appended) if they don't fit."""
+        with self._lock:
+            if self._size + len(events) > self.capacity:
+                return False
+            tail = (self._head + self._size) % self.capacity
+            first = min(len(events), self.capacity - tail)
+            self._slots[tail:tail + first] = events[:first]
+            self._slots[:len(events) - first] = events[first:]
+            self._size += len(events)
+        return True
+
+    def take(self, limit: int) -> List[Event]:
+        """Remove and return up to ``limit`` of the oldest events."""
+        with self._lock:
+            count = min(limit, self._size)
+            end = self._head + count
+            if end <= self.capacity:
+                events = self._slots[self._head:end]
+                self._slots[self._head:end] = [None] * count
+            else:
+                events = self._slots[self._head:] + self._slots[:end - self.capacity]
+                self._slots[self._head:] = [None] * (self.capacity - self._head)
+                self._slots[:end - self.capacity] = [None] * (end - self.capacity)
+            self._head = end % self.capacity
+            self._size -= count
+        return events
+
+
+class EventMetrics:
+    """Counters for accepted, invalid, dropped and flushed events and flush latency."""
+
+    def __init__(self, rate_window: int = 60):
+        self._lock = threading.Lock()
+        self.rate_window = rate_window
+        self.counts: Counter = Counter()
+        self._recent: deque = deque()  # (second, events accepted)
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.last_flush_seconds: Optional[float] = None
+        self.max_flush_seconds = 0.0
+
+    def count(self, name: str, events: int):
+        with self._lock:
+            self.counts[name] += events
+            if name == "accepted":
+                second = int(time.time())
+                if self._recent and self._recent[-1][0] == second:
+                    self._recent[-1][1] += events
+                else:
+                    self._recent.append([second, events])
+
+    def flushed(self, events: int, failed: int, seconds: float):
+        with self._lock:
+            self.counts["flushed"] += events - failed
+            self.counts["failed"] += failed
+            self.flushes += 1
+            self.flush_seconds += seconds
+            self.last_flush_seconds = seconds
+            self.max_flush_seconds = max(self.max_flush_seconds, seconds)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            horizon = int(time.time()) - self.rate_window
+            while self._recent and self._recent[0][0] <= horizon:
+                self._recent.popleft()
+            return {
+                "events": {
+                    name: self.counts[name]
+                    for name in ("accepted", "invalid", "dropped", "flushed", "failed", "unknown_entity")
+                },
+                "accepted_per_second": round(sum(count for _, count in self._recent) / self.rate_window, 1),
+                "flushes": self.flushes,
+                "flush_seconds": {
+                    "last": None if self.last_flush_seconds is None else round(self.last_flush_seconds, 4),
+                    "mean": round(self.flush_seconds / self.flushes, 4) if self.flushes else None,
+                    "max": round(self.max_flush_seconds, 4)
+                }
+            }
+
+
+class EventPipeline:
+    """Accepts events into a ring buffer and flushes them in batches.
+
+    Handlers validate and ``submit`` events; a full buffer refuses the
+    whole submission (the endpoint answers 429). A background thread
+    drains the buffer whenever ``batch_size`` events are waiting or
+    ``interval`` seconds have passed: product events go to the trend
+    tracker, and every event is counted into per-day increments of the
+    ``*_analytics`` table of its entity (and of the product's shop or the
+    video's creator), written through ``AnalyticsIngestor.add``. External
+    ids are resolved to catalog row ids with one query per kind and batch,
+    and cached; ids that are not in the catalog are remembered for
+    ``unknown_id_seconds`` so a stream of them isn't looked up on every
+    flush. A batch that fails to write is logged and counted as
+    failed rather than retried, since its increments are not idempotent.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        unknown_id_seconds: Optional[float] = None
+    ):
+        self.buffer = EventBuffer(capacity or settings.EVENTS_BUFFER_SIZE)
+        self.batch_size = batch_size or settings.EVENTS_FLUSH_BATCH_SIZE
+        self.unknown_id_seconds = (
+            settings.EVENTS_UNKNOWN_ID_SECONDS if unknown_id_seconds is None else unknown_id_seconds
+        )
+        self.metrics = EventMetrics()
+        self.engine: Optional[Engine] = None
+        self.store: Optional[CatalogStore] = None
+        self._ids: Dict[str, Dict[str, Tuple[int, Optional[int]]]] = {kind: {} for kind in _SOURCES}
+        self._unknown: Dict[str, Dict[str, float]] = {kind: {} for kind in _SOURCES}  # id -> retry after
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def parse(self, payloads: Sequence[Any], now: Optional[float] = None) -> Tuple[List[Event], List[Dict[str, Any]]]:
+        """Valid events, and ``{"index", "error"}`` for each invalid payload."""
+        now = time.time() if now is None else now
+        events, errors = [], []
+        for index, payload in enumerate(payloads):
+            try:
+                events.append(parse_event(payload, now))
+            except ValueError as e:
+                errors.append({"index": index, "error": str(e)})
+        if errors:
+            self.metrics.count("invalid", len(errors))
+        return events, errors
+
+    def submit(self, events: Sequence[Event]) -> bool:
+        """Buffer ``events`` for the next flush; ``False`` if the buffer is full."""
+        if not self.buffer.put(events):
+            self.metrics.count("dropped", len(events))
+            return False
+        self.metrics.count("accepted", len(events))
+        if len(self.buffer) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def flush(self) -> int:
+        """Drain the buffer now; returns the number of events flushed."""
+        flushed = 0
+        with self._flush_lock:
+            while True:
+                events = self.buffer.take(self.batch_size)
+                if not events:
+                    return flushed
+                self._flush_batch(events)
+                flushed += len(events)
+
+    def _flush_batch(self, events: List[Event]):
+        start = time.perf_counter()
+        failed = 0
+        if self.store is not None:
+            trend_tracker.record(
+                (
+                    {"product_id": e.entity_id, "type": e.type, "user_id": e.user_id, "timestamp": e.timestamp}
+                    for e in events if e.kind == "products" and e.type in EVENT_WEIGHTS
+                ),
+                self.store
+            )
+        if self.engine is not None:
+            try:
+                self._write(events)
+            except Exception as e:
+                failed = len(events)
+                logger.error(f"Writing {len(events)} events to the analytics tables failed: {e}")
+        self.metrics.flushed(len(events), failed, time.perf_counter() - start)
+
+    def _resolve(self, kind: str, entity_ids: Iterable[str]) -> Dict[str, Tuple[int, Optional[int]]]:
+        """``{external id: (row id, parent row id)}`` for the ids found in the catalog."""
+        cache, unknown = self._ids[kind], self._unknown[kind]
+        now = time.monotonic()
+        missing = [
+            entity_id for entity_id in set(entity_ids)
+            if entity_id not in cache and unknown.get(entity_id, 0.0) <= now
+        ]
+        if missing:
+            table, key, parent = _SOURCES[kind]
+            parent_column = table.c[parent[1]] if parent else None
+            columns = [table.c.id, table.c[key]] + ([parent_column] if parent_column is not None else [])
+            if len(cache) + len(missing) > _ID_CACHE_SIZE:
+                cache.clear()
+            if len(unknown) + len(missing) > _ID_CACHE_SIZE:
+                unknown.clear()
+            with self.engine.connect() as conn:
+                for offset in range(0, len(missing), 1000):
+                    statement = select(*columns).where(table.c[key].in_(missing[offset:offset + 1000]))
+                    for row in conn.execute(statement):
+                        cache[row[1]] = (row[0], row[2] if parent else None)
+            retry_after = now + self.unknown_id_seconds
+            for entity_id in missing:
+                if entity_id in cache:
+                    unknown.pop(entity_id, None)
+                else:
+                    unknown[entity_id] = retry_after
+        return cache
+
+    def _write(self, events: List[Event]):
+        increments: Dict[str, Dict[Tuple[int, date], Counter]] = {kind: {} for kind in EVENT_COLUMNS}
+        days: Dict[int, date] = {}
+        unknown = 0
+        for kind in _SOURCES:
+            ids = self._resolve(kind, (e.entity_id for e in events if e.kind == kind))
+            parent = _SOURCES[kind][2]
+            for event in events:
+                if event.kind != kind:
+                    continue
+                resolved = ids.get(event.entity_id)
+                if resolved is None:
+                    unknown += 1
+                    continue
+                day_number = int(event.timestamp // 86400)
+                day = days.get(day_number)
+                if day is None:
+                    day = days[day_number] = _EPOCH_DAY + timedelta(days=day_number)
+                targets = [(kind, resolved[0])]
+                if parent is not None and resolved[1] is not None:
+                    targets.append((parent[0], resolved[1]))
+                for target, row_id in targets:
+                    column = EVENT_COLUMNS[target].get(event.type)
+                    if column is None:
+                        continue
+                    amounts = increments[target].setdefault((row_id, day), Counter())
+                    if event.type == "sale":
+                        amounts["sales"] += event.quantity
+                        amounts["revenue"] += event.amount
+                    else:
+                        amounts[column] += 1
+        if unknown:
+            self.metrics.count("unknown_entity", unknown)
+
+        ingestor = AnalyticsIngestor(self.engine)
+        for kind, amounts in increments.items():
+            if not amounts:
+                continue
+            _, entity = ANALYTICS_TABLES[kind]
+            ingestor.add(kind, [
+                {entity: row_id, "date": day, **counts}
+                for (row_id, day), counts in amounts.items()
+            ])
+
+    def start(self, engine: Optional[Engine], store: Optional[CatalogStore], interval: float):
+        """Flush on a daemon thread every ``interval`` seconds, or sooner when a batch is waiting.
+
+        Without an ``engine`` events only feed the trend tracker, and
+        without a ``store`` they don't feed it (its state is per worker,
+        so the app passes none when running several).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.engine, self.store = engine, store
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                self._wake.wait(interval)
+                self._wake.clear()
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Event flush failed: {e}")
+
+        self._thread = threading.Thread(target=loop, name="event-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the flush thread after a final flush of the buffered events."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def report(self) -> Dict[str, Any]:
+        """Event counts, ingest rate, flush latency and buffer fill."""
+        return {
+            "scheduled": self._thread is not None and self._thread.is_alive(),
+            **self.metrics.report(),
+            "buffered": len(self.buffer),
+            "capacity": self.buffer.capacity,
+            "batch_size": self.batch_size,
+            "writes_analytics": self.engine is not None
+        }
+
+
+# Global event pipeline instance
+event_pipeline = EventPipeline()
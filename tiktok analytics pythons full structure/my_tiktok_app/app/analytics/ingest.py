@@ -0,0 +1,340 @@
+"""
+Bulk loader for the daily product, shop, creator and video analytics tables.
+"""
+
+from typing import List, Dict, Any, Iterable, Mapping, Optional, Tuple
+from collections import Counter
+from datetime import date
+import csv
+import io
+import logging
+import queue
+import threading
+import time
+
+from sqlalchemy import Table, case, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from app.core import schema
+from app.core.config import settings
+
+from .partitions import partition_manager
+from .rollups import ROLLUPS, apply_batch, apply_increments
+
+logger = logging.getLogger(__name__)
+
+# Daily analytics table and its entity column per kind; rows are unique
+# on (entity column, date)
+ANALYTICS_TABLES: Dict[str, Tuple[Table, str]] = {
+    "products": (schema.product_analytics, "product_id"),
+    "shops": (schema.shop_analytics, "shop_id"),
+    "creators": (schema.creator_analytics, "creator_id"),
+    "videos": (schema.video_analytics, "video_id")
+}
+
+_DONE = object()
+
+
+class IngestMetrics:
+    """Cumulative ingestion counters per analytics kind."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._kinds: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, kind: str, stats: Dict[str, Any]):
+        with self._lock:
+            totals = self._kinds.setdefault(kind, {
+                "runs": 0, "rows": 0, "batches": 0, "duplicates": 0, "retries": 0,
+                "seconds": 0.0, "backpressure_seconds": 0.0, "last_rows_per_second": None
+            })
+            totals["runs"] += 1
+            for field in ("rows", "batches", "duplicates", "retries", "seconds", "backpressure_seconds"):
+                totals[field] += stats[field]
+            totals["last_rows_per_second"] = stats["rows_per_second"]
+
+    def report(self) -> Dict[str, Any]:
+        """Totals per kind, with overall throughput."""
+        with self._lock:
+            return {
+                kind: {
+                    **{field: round(value, 4) if isinstance(value, float) else value
+                       for field, value in totals.items()},
+                    "rows_per_second": round(totals["rows"] / totals["seconds"], 1) if totals["seconds"] else None
+                }
+                for kind, totals in self._kinds.items()
+            }
+
+
+class AnalyticsIngestor:
+    """Streams daily analytics rows into the database in upserted batches.
+
+    Rows are plain mappings of table columns (``product_id``, ``date``,
+    ``views``, ...). The caller's iterable is consumed on the calling
+    thread and cut into batches of ``batch_size``; a writer thread upserts
+    them, one transaction per batch, through a queue holding at most
+    ``max_pending`` batches, so a fast source blocks (back-pressure) rather
+    than buffering the whole load in memory.
+
+    Every batch is an ``INSERT ... ON CONFLICT (entity, date) DO UPDATE``,
+    so re-running a load, or resuming one after a failure, converges to
+    the same table contents. Rows repeating a key within a batch keep the
+    last value. On PostgreSQL with psycopg2, batches are streamed with
+    ``COPY`` into a temporary staging table and upserted from there;
+    elsewhere they go through executemany, which SQLAlchemy turns into
+    multi-row ``VALUES`` statements.
+
+    Before each batch the monthly partitions it needs are created, and
+    inside its transaction the weekly/monthly rollups of products and shops
+    are updated with the batch's changes (``rollups=False`` skips that,
+    e.g. for a backfill followed by ``rollups.rebuild``).
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        batch_size: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        method: str = "auto",
+        retries: int = 2,
+        rollups: bool = True,
+        metrics: Optional[IngestMetrics] = None
+    ):
+        if method not in ("auto", "copy", "values"):
+            raise ValueError(f"Unknown ingest method: {method}")
+        self.engine = engine
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.max_pending = max_pending or settings.INGEST_MAX_PENDING_BATCHES
+        self.retries = retries
+        self.rollups = rollups
+        self.metrics = metrics if metrics is not None else ingest_metrics
+        use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+        if method == "copy" and not use_copy:
+            raise ValueError("COPY ingestion needs PostgreSQL with psycopg2")
+        self.method = "copy" if use_copy and method != "values" else "values"
+
+    def ingest(self, kind: str, rows: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+        """Upsert ``rows`` into the ``kind`` analytics table.
+
+        Returns the rows written, batches, in-batch duplicates dropped,
+        retries, elapsed seconds, time the source spent blocked on the
+        writer, and throughput.
+        """
+        table, entity = ANALYTICS_TABLES[kind]
+        columns = [c.name for c in table.columns if c.name not in ("id", "created_at")]
+        stats = {"rows": 0, "batches": 0, "duplicates": 0, "retries": 0, "backpressure_seconds": 0.0}
+        pending: "queue.Queue[Any]" = queue.Queue(maxsize=self.max_pending)
+        failure: List[BaseException] = []
+
+        def writer():
+            while True:
+                batch = pending.get()
+                if batch is _DONE:
+                    return
+                if failure:
+                    continue  # drain so the producer never blocks forever
+                try:
+                    self._write(kind, table, entity, columns, batch, stats)
+                except BaseException as e:
+                    failure.append(e)
+
+        thread = threading.Thread(target=writer, name=f"ingest-{kind}", daemon=True)
+        start = time.perf_counter()
+        thread.start()
+        try:
+            for batch in self._batches(rows, table, entity, columns, stats):
+                if failure:
+                    break
+                waited = time.perf_counter()
+                pending.put(batch)
+                stats["backpressure_seconds"] += time.perf_counter() - waited
+        finally:
+            pending.put(_DONE)
+            thread.join()
+        stats["seconds"] = time.perf_counter() - start
+        stats["rows_per_second"] = round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] else None
+        self.metrics.record(kind, stats)
+
+        if failure:
+            logger.error(f"Ingesting {kind} analytics failed after {stats['rows']} rows: {failure[0]}")
+            raise failure[0]
+        logger.info(
+            f"Ingested {stats['rows']} {kind} analytics rows in {stats['batches']} batches "
+            f"({stats['rows_per_second']} rows/s)"
+        )
+        return stats
+
+    def add(self, kind: str, increments: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+        """Add amounts to the ``kind`` daily rows, creating rows that don't exist yet.
+
+        ``increments`` are rows of the entity, ``date`` and amounts to add to
+        summed metric columns (e.g. counted from events); rows repeating a
+        key are summed. Each batch is an ``INSERT ... ON CONFLICT DO UPDATE
+        SET views = views + excluded.views, ...``, so concurrent writers
+        never lose counts, with the conversion rate and average order value
+        recomputed from the new sums. Rollups follow as in ``ingest``.
+        Unlike ``ingest`` a batch is not idempotent, so it is not retried.
+        """
+        table, entity = ANALYTICS_TABLES[kind]
+        stats = {"rows": 0, "batches": 0, "duplicates": 0, "retries": 0, "backpressure_seconds": 0.0}
+        start = time.perf_counter()
+        totals: Dict[Tuple[Any, date], Counter] = {}
+        for row in increments:
+            key = (row[entity], row["date"])
+            if key in totals:
+                stats["duplicates"] += 1
+            else:
+                totals[key] = Counter()
+            totals[key].update({column: value for column, value in row.items() if column not in (entity, "date")})
+
+        metrics = sorted({column for amounts in totals.values() for column in amounts})
+        unknown = [column for column in metrics if column not in table.c]
+        if unknown:
+            raise ValueError(f"Unknown {table.name} columns: {', '.join(unknown)}")
+        keys = list(totals)
+        for offset in range(0, len(keys), self.batch_size):
+            batch = [
+                {entity: key[0], "date": key[1], **self._rates({m: totals[key][m] for m in metrics})}
+                for key in keys[offset:offset + self.batch_size]
+            ]
+            partition_manager.ensure(self.engine, table.name, {row["date"] for row in batch})
+            with self.engine.begin() as conn:
+                if self.rollups and kind in ROLLUPS:
+                    apply_increments(conn, kind, batch)
+                conn.execute(self._increment(table, entity, metrics), batch)
+            stats["rows"] += len(batch)
+            stats["batches"] += 1
+        stats["seconds"] = time.perf_counter() - start
+        stats["rows_per_second"] = round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] else None
+        self.metrics.record(kind, stats)
+        return stats
+
+    @staticmethod
+    def _rates(amounts: Dict[str, Any]) -> Dict[str, Any]:
+        # Rates of a new row, from its own amounts
+        if "views" in amounts and "sales" in amounts:
+            views, sales = amounts["views"], amounts["sales"]
+            amounts["conversion_rate"] = min(sales / views, 1.0) if views > 0 else 0
+        if "sales" in amounts and "revenue" in amounts:
+            amounts["avg_order_value"] = round(amounts["revenue"] / amounts["sales"], 2) if amounts["sales"] > 0 else 0
+        return amounts
+
+    def _batches(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        table: Table,
+        entity: str,
+        columns: List[str],
+        stats: Dict[str, Any]
+    ) -> Iterable[List[Dict[str, Any]]]:
+        # Metrics missing from a row get the column default, not NULL
+        defaults = {c.name: c.default.arg for c in table.columns if c.default is not None}
+        # Keyed by (entity, date) so a repeated key keeps its last row;
+        # ON CONFLICT cannot touch the same row twice in one statement
+        batch: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+        for row in rows:
+            day = row["date"]
+            if isinstance(day, str):
+                day = date.fromisoformat(day)
+            key = (row[entity], day)
+            if key in batch:
+                stats["duplicates"] += 1
+            batch[key] = {column: row.get(column, defaults.get(column)) for column in columns}
+            batch[key]["date"] = day
+            if len(batch) >= self.batch_size:
+                yield list(batch.values())
+                batch = {}
+        if batch:
+            yield list(batch.values())
+
+    def _write(
+        self,
+        kind: str,
+        table: Table,
+        entity: str,
+        columns: List[str],
+        batch: List[Dict[str, Any]],
+        stats: Dict[str, Any]
+    ):
+        partition_manager.ensure(self.engine, table.name, {row["date"] for row in batch})
+        for attempt in range(self.retries + 1):
+            try:
+                with self.engine.begin() as conn:
+                    if self.rollups and kind in ROLLUPS:
+                        apply_batch(conn, kind, batch)
+                    if self.method == "copy":
+                        self._copy(conn, table, entity, columns, batch)
+                    else:
+                        conn.execute(self._upsert(table, entity, columns), batch)
+                break
+            except OperationalError as e:
+                # Lost connections, deadlocks and the like; the batch is
+                # an idempotent upsert, so retrying it is safe
+                if attempt == self.retries:
+                    raise
+                stats["retries"] += 1
+                logger.warning(f"Retrying {table.name} batch after error: {e}")
+                time.sleep(0.5 * 2 ** attempt)
+        stats["rows"] += len(batch)
+        stats["batches"] += 1
+
+    def _insert(self, table: Table):
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(table)
+        if dialect == "sqlite":
+            return sqlite.insert(table)
+        raise NotImplementedError(f"Analytics upserts are not supported on {dialect}")
+
+    def _upsert(self, table: Table, entity: str, columns: List[str]):
+        statement = self._insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=[entity, "date"],
+            set_={column: statement.excluded[column] for column in columns if column not in (entity, "date")}
+        )
+
+    def _increment(self, table: Table, entity: str, metrics: List[str]):
+        statement = self._insert(table)
+        # SET expressions see the row as it was before the update
+        sums = {m: table.c[m] + statement.excluded[m] for m in metrics}
+        updates = dict(sums)
+        if "views" in sums and "sales" in sums and "conversion_rate" in table.c:
+            updates["conversion_rate"] = case(
+                (sums["views"] <= 0, 0),
+                (sums["sales"] >= sums["views"], 1),
+                else_=sums["sales"] * 1.0 / sums["views"]
+            )
+        if "sales" in sums and "revenue" in sums and "avg_order_value" in table.c:
+            updates["avg_order_value"] = case((sums["sales"] <= 0, 0), else_=sums["revenue"] / sums["sales"])
+        return statement.on_conflict_do_update(index_elements=[entity, "date"], set_=updates)
+
+    def _copy(self, conn: Connection, table: Table, entity: str, columns: List[str], batch: List[Dict[str, Any]]):
+        staging = f"_ingest_{table.name}"
+        column_list = ", ".join(columns)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c not in (entity, "date"))
+        conn.execute(text(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging} ON COMMIT DELETE ROWS "
+            f"AS SELECT {column_list} FROM {table.name} WITH NO DATA"
+        ))
+
+        buffer = io.StringIO()
+        out = csv.writer(buffer)
+        for row in batch:
+            out.writerow(["" if row[c] is None else row[c] for c in columns])
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+        conn.execute(text(
+            f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {staging} "
+            f"ON CONFLICT ({entity}, date) DO UPDATE SET {updates}"
+        ))
+
+
+# Global ingestion metrics instance
+ingest_metrics = IngestMetrics()
@@ -0,0 +1,134 @@
+"""
+Monthly range partitions of the daily analytics tables (PostgreSQL).
+"""
+
+from typing import List, Dict, Iterable, Optional, Set, Tuple
+from datetime import date
+import logging
+import re
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("product_analytics", "shop_analytics", "creator_analytics", "video_analytics")
+
+_PARTITION_NAME = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def months_between(start: date, end: date) -> List[date]:
+    """First days of the months from ``start`` through ``end``."""
+    months, month = [], month_start(start)
+    while month <= end:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+class PartitionManager:
+    """Creates, lists and retires the monthly partitions of analytics tables.
+
+    Partitions are named ``<table>_yYYYYmMM`` and cover one calendar month
+    of ``date``. ``ensure`` is cheap to call before every ingest batch: it
+    remembers the partitions it has seen and only issues DDL for new
+    months. On other databases (SQLite fixtures) every method is a no-op,
+    since their tables are not partitioned.
+    """
+
+    def __init__(self):
+        self._known: Set[Tuple[str, date]] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def supported(engine: Engine) -> bool:
+        return engine.dialect.name == "postgresql"
+
+    def ensure(self, engine: Engine, table: str, months: Iterable[date]) -> List[str]:
+        """Create any missing partitions of ``table`` for ``months``."""
+        if not self.supported(engine):
+            return []
+        missing = sorted({month_start(m) for m in months} - {m for t, m in self._known if t == table})
+        if not missing:
+            return []
+
+        created = []
+        with self._lock, engine.begin() as conn:
+            for month in missing:
+                if (table, month) in self._known:
+                    continue
+                name = partition_name(table, month)
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+                ))
+                self._known.add((table, month))
+                created.append(name)
+        if created:
+            logger.info(f"Ensured analytics partitions: {', '.join(created)}")
+        return created
+
+    def ensure_range(
+        self,
+        engine: Engine,
+        start: date,
+        end: date,
+        tables: Iterable[str] = PARTITIONED_TABLES
+    ) -> List[str]:
+        """Create partitions for every month from ``start`` through ``end``."""
+        months = months_between(start, end)
+        return [name for table in tables for name in self.ensure(engine, table, months)]
+
+    def partitions(self, engine: Engine, table: str) -> Dict[str, Optional[date]]:
+        """Partition names of ``table`` and the month each covers (``None`` for the default)."""
+        if not self.supported(engine):
+            return {}
+        with engine.connect() as conn:
+            names = conn.execute(text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :table ORDER BY child.relname"
+            ), {"table": table}).scalars().all()
+        partitions = {}
+        for name in names:
+            match = _PARTITION_NAME.search(name)
+            partitions[name] = date(int(match.group(1)), int(match.group(2)), 1) if match else None
+        return partitions
+
+    def drop_before(self, engine: Engine, table: str, cutoff: date) -> List[str]:
+        """Detach and drop monthly partitions that end on or before ``cutoff``.
+
+        Dropping a whole partition is how old daily rows are retired; the
+        weekly and monthly rollups are separate tables and keep their
+        history.
+        """
+        dropped = []
+        for name, month in self.partitions(engine, table).items():
+            if month is None or next_month(month) > cutoff:
+                continue
+            with self._lock, engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+                self._known.discard((table, month))
+            dropped.append(name)
+        if dropped:
+            logger.info(f"Dropped analytics partitions: {', '.join(dropped)}")
+        return dropped
+
+
+# Global partition manager instance
+partition_manager = PartitionManager()
@@ -0,0 +1,325 @@
+"""
+Materialized product, shop and creator rankings.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, timedelta
+import logging
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import Table, delete, func, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from app.catalog.repository import SQLCatalogRepository
+from app.catalog.views import overlay
+from app.core import schema
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Ranking types per kind, as documented on the ranking tables
+RANKING_TYPES: Dict[str, Tuple[str, ...]] = {
+    "products": ("trending", "best_seller", "most_viewed", "highest_rated"),
+    "shops": ("top_seller", "most_followed", "highest_rated"),
+    "creators": ("most_followed", "highest_engagement", "most_viral")
+}
+
+RANKING_TABLES: Dict[str, Tuple[Table, str]] = {
+    "products": (schema.product_rankings, "product_id"),
+    "shops": (schema.shop_rankings, "shop_id"),
+    "creators": (schema.creator_rankings, "creator_id")
+}
+
+# Catalog columns the scores are computed from
+_SOURCES: Dict[str, Tuple[Table, Tuple[str, ...]]] = {
+    "products": (schema.products, ("sold_quantity", "views_count", "rating", "review_count")),
+    "shops": (schema.shops, ("total_sales", "followers_count", "rating", "review_count")),
+    "creators": (schema.creators, ("followers_count", "engagement_rate"))
+}
+
+# Daily analytics summed over the recent window and the one before it
+_WINDOWS: Dict[str, Tuple[Table, str, Tuple[str, ...]]] = {
+    "products": (schema.product_analytics, "product_id", ("views", "sales")),
+    "creators": (schema.creator_analytics, "creator_id", ("views", "shares"))
+}
+
+SALE_WEIGHT = 20.0  # views a sale counts for in trending activity
+SHARE_WEIGHT = 10.0  # views a share counts for in virality
+RATING_PRIOR_REVIEWS = 20.0  # reviews' worth of pull toward the mean rating
+MIN_AUDIENCE = 1_000  # followers below which engagement and virality are not ranked
+
+
+def _bayesian_rating(rating: np.ndarray, reviews: np.ndarray) -> np.ndarray:
+    """Ratings shrunk toward the review-weighted mean, so a few 5-star reviews don't top the list."""
+    rated = reviews > 0
+    if not rated.any():
+        return np.zeros_like(rating)
+    mean = np.average(rating[rated], weights=reviews[rated])
+    return np.where(rated, (rating * reviews + mean * RATING_PRIOR_REVIEWS) / (reviews + RATING_PRIOR_REVIEWS), 0.0)
+
+
+def _growth(recent: np.ndarray, previous: np.ndarray, smoothing: float = 100.0) -> np.ndarray:
+    return np.clip((recent + smoothing) / (previous + smoothing), 0.5, 4.0)
+
+
+def _product_scores(c: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    activity = c["recent_views"] + SALE_WEIGHT * c["recent_sales"]
+    previous = c["previous_views"] + SALE_WEIGHT * c["previous_sales"]
+    return {
+        "trending": np.log1p(activity) * _growth(activity, previous),
+        "best_seller": c["sold_quantity"],
+        "most_viewed": c["views_count"],
+        "highest_rated": _bayesian_rating(c["rating"], c["review_count"])
+    }
+
+
+def _shop_scores(c: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return {
+        "top_seller": c["total_sales"],
+        "most_followed": c["followers_count"],
+        "highest_rated": _bayesian_rating(c["rating"], c["review_count"])
+    }
+
+
+def _creator_scores(c: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    audience = c["followers_count"] >= MIN_AUDIENCE
+    reach = c["recent_views"] + SHARE_WEIGHT * c["recent_shares"]
+    return {
+        "most_followed": c["followers_count"],
+        "highest_engagement": np.where(audience, c["engagement_rate"], 0.0),
+        "most_viral": np.where(audience, reach / np.maximum(c["followers_count"], MIN_AUDIENCE), 0.0)
+    }
+
+
+_SCORERS = {"products": _product_scores, "shops": _shop_scores, "creators": _creator_scores}
+
+
+def normalize(raw: np.ndarray) -> np.ndarray:
+    """Scale scores to 0-100 against the best entity, rounded as stored."""
+    best = raw.max() if raw.size else 0.0
+    if best <= 0:
+        return np.zeros_like(raw)
+    return np.round(np.clip(raw, 0, None) * (100.0 / best), 4)
+
+
+def top_per_category(category: np.ndarray, score: np.ndarray, top_n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions of the ``top_n`` best positive scores in each category, and their 1-based ranks.
+
+    Ties keep position order, which is ascending row id.
+    """
+    candidates = np.flatnonzero(score > 0)
+    order = candidates[np.lexsort((candidates, -score[candidates], category[candidates]))]
+    groups = category[order]
+    starts = np.r_[0, np.flatnonzero(groups[1:] != groups[:-1]) + 1]
+    first = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    rank = np.arange(len(order)) - first + 1
+    chosen = rank <= top_n
+    return order[chosen], rank[chosen]
+
+
+def _load_columns(conn: Connection, kind: str, day: date, window_days: int) -> Dict[str, np.ndarray]:
+    """Row ids, categories and score inputs of every active entity, as arrays ordered by id."""
+    table, fields = _SOURCES[kind]
+    statement = (
+        select(table.c.id, table.c.category_id, *(table.c[field] for field in fields))
+        .where(table.c.is_active.isnot(False))
+        .order_by(table.c.id)
+    )
+    matrix = np.array(conn.execute(statement).all(), dtype=np.float64).reshape(-1, len(fields) + 2)
+    ids = matrix[:, 0].astype(np.int64)
+    columns = {
+        "id": ids,
+        "category_id": np.nan_to_num(matrix[:, 1], nan=-1).astype(np.int64),
+        **{field: np.nan_to_num(matrix[:, i + 2]) for i, field in enumerate(fields)}
+    }
+
+    if kind in _WINDOWS:
+        daily, entity, metrics = _WINDOWS[kind]
+        recent_start = day - timedelta(days=window_days - 1)
+        windows = {
+            "recent": (recent_start, day),
+            "previous": (recent_start - timedelta(days=window_days), recent_start - timedelta(days=1))
+        }
+        for name, (start, end) in windows.items():
+            sums = {metric: np.zeros(len(ids)) for metric in metrics}
+            statement = (
+                select(daily.c[entity], *(func.sum(daily.c[metric]) for metric in metrics))
+                .where(daily.c.date.between(start, end))
+                .group_by(daily.c[entity])
+            )
+            rows = np.array(conn.execute(statement).all(), dtype=np.float64).reshape(-1, len(metrics) + 1)
+            positions = np.searchsorted(ids, rows[:, 0].astype(np.int64))
+            known = positions < len(ids)
+            known[known] = ids[positions[known]] == rows[known, 0]
+            for i, metric in enumerate(metrics):
+                sums[metric][positions[known]] = np.nan_to_num(rows[known, i + 1])
+                columns[f"{name}_{metric}"] = sums[metric]
+    return columns
+
+
+class RankingJob:
+    """Computes the per-category top lists of every ranking type in bulk.
+
+    Each run loads the score inputs of all active entities of a kind as
+    column arrays (catalog totals plus, for trending and virality, daily
+    analytics summed over the last ``window_days`` and the window before),
+    scores every ranking type with array arithmetic, normalizes the scores
+    to 0-100 and keeps the ``top_n`` best per category. A kind's lists for
+    the day replace any earlier ones in a single transaction, so re-running
+    the job is safe and readers never see half a list.
+
+    ``start`` runs the job on a background thread every ``interval``
+    seconds; enable it in one process only.
+    """
+
+    def __init__(self, top_n: Optional[int] = None, window_days: Optional[int] = None):
+        self.top_n = top_n or settings.RANKING_TOP_N
+        self.window_days = window_days or settings.RANKING_WINDOW_DAYS
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last: Optional[Dict[str, Any]] = None
+
+    def compute(self, conn: Connection, kind: str, day: date) -> List[Dict[str, Any]]:
+        """Ranking rows of ``kind`` for ``day``, ready to insert."""
+        table, entity = RANKING_TABLES[kind]
+        columns = _load_columns(conn, kind, day, self.window_days)
+        rows = []
+        for ranking_type, raw in _SCORERS[kind](columns).items():
+            score = normalize(raw.astype(np.float64))
+            positions, ranks = top_per_category(columns["category_id"], score, self.top_n)
+            categories = columns["category_id"][positions]
+            rows.extend(
+                {
+                    entity: row_id,
+                    "category_id": category_id if category_id >= 0 else None,
+                    "ranking_type": ranking_type,
+                    "rank_position": rank,
+                    "score": value,
+                    "date": day
+                }
+                for row_id, category_id, rank, value in zip(
+                    columns["id"][positions].tolist(), categories.tolist(),
+                    ranks.tolist(), score[positions].tolist()
+                )
+            )
+        return rows
+
+    def run(self, engine: Engine, day: Optional[date] = None, kinds: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Compute and store the rankings of ``day`` (default today) for ``kinds``."""
+        day = day or date.today()
+        stats: Dict[str, Any] = {"date": day.isoformat(), "kinds": {}}
+        started = time.perf_counter()
+        with self._lock:
+            for kind in kinds or list(RANKING_TABLES):
+                table, _ = RANKING_TABLES[kind]
+                start = time.perf_counter()
+                with engine.begin() as conn:
+                    rows = self.compute(conn, kind, day)
+                    conn.execute(delete(table).where(
+                        table.c.date == day, table.c.ranking_type.in_(RANKING_TYPES[kind])
+                    ))
+                    if rows:
+                        conn.execute(insert(table), rows)
+                stats["kinds"][kind] = {"rows": len(rows), "seconds": round(time.perf_counter() - start, 4)}
+            stats["seconds"] = round(time.perf_counter() - started, 4)
+            stats["finished_at"] = time.time()
+            self._last = stats
+        logger.info(f"Computed rankings for {day} in {stats['seconds']}s: {stats['kinds']}")
+        return stats
+
+    def start(self, engine: Engine, interval: float):
+        """Run the job now and then every ``interval`` seconds on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while True:
+                try:
+                    self.run(engine)
+                except Exception as e:
+                    logger.error(f"Ranking job failed: {e}")
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=loop, name="ranking-job", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def report(self) -> Dict[str, Any]:
+        """Schedule state and the last run's timings."""
+        return {
+            "scheduled": self._thread is not None and self._thread.is_alive(),
+            "top_n": self.top_n,
+            "window_days": self.window_days,
+            "last_run": self._last
+        }
+
+
+class RankingRepository:
+    """Serves stored rankings by ``(ranking_type, date)`` lookup.
+
+    Reads go through the ``idx_*_rankings_type_date`` index: a category's
+    list is an index range in rank order, the cross-category list merges
+    the (at most ``top_n`` per category) rows of that type and date. Only
+    the returned entries are joined to their catalog records.
+    """
+
+    def __init__(self, catalog: SQLCatalogRepository):
+        self.catalog = catalog
+        self.engine = catalog.engine
+
+    def latest_date(self, conn: Connection, kind: str, ranking_type: str) -> Optional[date]:
+        table, _ = RANKING_TABLES[kind]
+        return conn.execute(
+            select(func.max(table.c.date)).where(table.c.ranking_type == ranking_type)
+        ).scalar()
+
+    def lookup(
+        self,
+        kind: str,
+        ranking_type: str,
+        day: Optional[date] = None,
+        category: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], Optional[date]]:
+        """Top ``limit`` entries of a ranking, with their catalog records.
+
+        Without ``day`` the most recently computed list is used. Returns the
+        entries and the date they were computed for (``None`` when there
+        are no rankings of that type).
+        """
+        table, entity = RANKING_TABLES[kind]
+        with self.engine.connect() as conn:
+            day = day or self.latest_date(conn, kind, ranking_type)
+            if day is None:
+                return [], None
+            statement = select(table.c[entity], table.c.rank_position, table.c.score).where(
+                table.c.ranking_type == ranking_type, table.c.date == day
+            )
+            if category:
+                category_ids = select(schema.categories.c.id).where(
+                    func.lower(schema.categories.c.name) == category.lower()
+                )
+                statement = statement.where(table.c.category_id.in_(category_ids))
+            statement = statement.order_by(table.c.score.desc(), table.c[entity]).limit(limit)
+            entries = conn.execute(statement).all()
+
+        # Ranks are numbered before entries whose record is gone are dropped,
+        # so a deleted entity leaves a gap instead of moving the rest up
+        ranked = [(rank, *entry) for rank, entry in enumerate(entries, start=1)]
+        records = getattr(self.catalog, kind).records([row_id for _, row_id, _, _ in ranked])
+        return [
+            overlay(records[row_id], rank=rank, category_rank=category_rank, score=float(score))
+            for rank, row_id, category_rank, score in ranked
+            if row_id in records
+        ], day
+
+
+# Global ranking job instance
+ranking_job = RankingJob()
@@ -0,0 +1,297 @@
+"""
+Weekly and monthly rollups of the daily analytics tables.
+"""
+
+from typing import List, Dict, Any, Iterable, Mapping, Optional, Sequence, Tuple
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+import logging
+
+from sqlalchemy import Date, String, Table, cast, delete, func, insert, literal, select, tuple_, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import ColumnElement
+
+from app.core import schema
+
+from .partitions import month_start, next_month
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_METRICS = ("views", "clicks", "sales", "revenue")
+
+# Rollup tables per kind, coarsest first
+ROLLUPS: Dict[str, Dict[str, Table]] = {
+    "products": {"month": schema.product_analytics_monthly, "week": schema.product_analytics_weekly},
+    "shops": {"month": schema.shop_analytics_monthly, "week": schema.shop_analytics_weekly}
+}
+
+_DAILY = {
+    "products": (schema.product_analytics, "product_id"),
+    "shops": (schema.shop_analytics, "shop_id")
+}
+
+_DAY = timedelta(days=1)
+
+
+def period_start(day: date, grain: str) -> date:
+    """First day of the ISO week or calendar month containing ``day``."""
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    if grain == "month":
+        return month_start(day)
+    return day
+
+
+def period_after(start: date, grain: str) -> date:
+    """First day of the period following the one starting at ``start``."""
+    if grain == "week":
+        return start + timedelta(days=7)
+    if grain == "month":
+        return next_month(start)
+    return start + _DAY
+
+
+def plan_range(start: date, end: date, grains: Sequence[str] = ("month", "week")) -> List[Tuple[str, date, date]]:
+    """Cover ``start..end`` (inclusive) with as few stored rows as possible.
+
+    Whole calendar months come from the monthly rollup, whole weeks left
+    over at either edge from the weekly one, and the remaining days from
+    the daily table. Returns ``(grain, first day, last day)`` segments in
+    date order, with ``"day"`` for daily segments.
+    """
+    if start > end:
+        return []
+    if not grains:
+        return [("day", start, end)]
+    grain, finer = grains[0], grains[1:]
+    first = start if period_start(start, grain) == start else period_after(period_start(start, grain), grain)
+    last = period_start(end + _DAY, grain) - _DAY
+    if first > last:
+        return plan_range(start, end, finer)
+    return (
+        plan_range(start, first - _DAY, finer)
+        + [(grain, first, last)]
+        + plan_range(last + _DAY, end, finer)
+    )
+
+
+def _insert(conn: Connection):
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Analytics rollups are not supported on {dialect}")
+
+
+def _number(value: Any) -> Any:
+    if value is None:
+        return 0
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def apply_batch(conn: Connection, kind: str, batch: Sequence[Mapping[str, Any]]):
+    """Fold a batch of daily rows into the rollups, before it is upserted.
+
+    Runs in the batch's transaction: reads the daily rows the batch is
+    about to replace and adds the difference (new minus old values, plus
+    one day per new key) to each affected week and month. This keeps the
+    rollups exact for re-ingested days as long as one ingestion job
+    writes a given table at a time; ``rebuild`` recomputes them from
+    scratch.
+    """
+    _, entity = _DAILY[kind]
+    keys = [(row[entity], row["date"]) for row in batch]
+    previous = _previous(conn, kind, keys)
+    changes = []
+    for row, key in zip(batch, keys):
+        old = previous.get(key)
+        changes.append([0 if old is not None else 1] + [
+            _number(row[m]) - (_number(old[i + 2]) if old is not None else 0)
+            for i, m in enumerate(ROLLUP_METRICS)
+        ])
+    _add_deltas(conn, kind, keys, changes)
+
+
+def apply_increments(conn: Connection, kind: str, increments: Sequence[Mapping[str, Any]]):
+    """Fold per-day increments into the rollups, before they are added to the daily rows.
+
+    Like ``apply_batch``, but the rows carry amounts to add (from events)
+    rather than new totals, so only the keys' existence is read.
+    """
+    _, entity = _DAILY[kind]
+    keys = [(row[entity], row["date"]) for row in increments]
+    previous = _previous(conn, kind, keys)
+    changes = [
+        [0 if key in previous else 1] + [_number(row.get(m)) for m in ROLLUP_METRICS]
+        for row, key in zip(increments, keys)
+    ]
+    _add_deltas(conn, kind, keys, changes)
+
+
+def _previous(conn: Connection, kind: str, keys: Sequence[Tuple[Any, date]]) -> Dict[Tuple[Any, date], Any]:
+    """Current daily rows (entity, date, metrics) of ``keys``, locked on PostgreSQL."""
+    daily, entity = _DAILY[kind]
+    columns = [daily.c[entity], daily.c.date] + [daily.c[m] for m in ROLLUP_METRICS]
+    previous: Dict[Tuple[Any, date], Any] = {}
+    for offset in range(0, len(keys), 1000):
+        statement = select(*columns).where(tuple_(daily.c[entity], daily.c.date).in_(keys[offset:offset + 1000]))
+        if conn.dialect.name == "postgresql":
+            statement = statement.with_for_update()
+        for row in conn.execute(statement):
+            previous[(row[0], row[1])] = row
+    return previous
+
+
+def _add_deltas(conn: Connection, kind: str, keys: Sequence[Tuple[Any, date]], changes: Sequence[List[float]]):
+    """Add ``[days, *ROLLUP_METRICS]`` changes per daily key to its week and month."""
+    _, entity = _DAILY[kind]
+    deltas: Dict[str, Dict[Tuple[Any, date], List[float]]] = {
+        grain: defaultdict(lambda: [0] * (len(ROLLUP_METRICS) + 1)) for grain in ROLLUPS[kind]
+    }
+    for key, change in zip(keys, changes):
+        for grain, totals in deltas.items():
+            total = totals[(key[0], period_start(key[1], grain))]
+            for i, value in enumerate(change):
+                total[i] += value
+
+    insert_ = _insert(conn)
+    for grain, totals in deltas.items():
+        if not totals:
+            continue
+        table = ROLLUPS[kind][grain]
+        statement = insert_(table)
+        fields = ("days",) + ROLLUP_METRICS
+        statement = statement.on_conflict_do_update(
+            index_elements=[entity, "period_start"],
+            set_={
+                **{field: table.c[field] + statement.excluded[field] for field in fields},
+                "updated_at": func.current_timestamp()
+            }
+        )
+        rows = []
+        for (entity_id, start), values in totals.items():
+            row = {entity: entity_id, "period_start": start, **dict(zip(fields, values))}
+            row["revenue"] = round(row["revenue"], 2)
+            rows.append(row)
+        conn.execute(statement, rows)
+
+
+def _period_expression(conn: Connection, column: ColumnElement, grain: str) -> ColumnElement:
+    if conn.dialect.name == "postgresql":
+        return cast(func.date_trunc(grain, column), Date)
+    # SQLite: step back to Monday, or to the first of the month
+    if grain == "week":
+        weekday = (func.strftime("%w", column) + 6) % 7
+        return func.date(column, literal("-") + cast(weekday, String) + literal(" days"))
+    return func.date(column, "start of month")
+
+
+def rebuild(engine: Engine, kind: str, start: date, end: date):
+    """Recompute the rollups of every week and month overlapping ``start..end``."""
+    daily, entity = _DAILY[kind]
+    with engine.begin() as conn:
+        for grain, table in ROLLUPS[kind].items():
+            first = period_start(start, grain)
+            last = period_after(period_start(end, grain), grain) - _DAY
+            conn.execute(delete(table).where(table.c.period_start.between(first, last)))
+            period = _period_expression(conn, daily.c.date, grain).label("period_start")
+            source = (
+                select(
+                    daily.c[entity], period, func.count().label("days"),
+                    *(func.coalesce(func.sum(daily.c[m]), 0).label(m) for m in ROLLUP_METRICS)
+                )
+                .where(daily.c.date.between(first, last))
+                .group_by(daily.c[entity], period)
+            )
+            conn.execute(insert(table).from_select([entity, "period_start", "days", *ROLLUP_METRICS], source))
+    logger.info(f"Rebuilt {kind} analytics rollups for {start} to {end}")
+
+
+def segment_select(kind: str, segment: Tuple[str, date, date], entity_ids: Optional[Iterable[int]]):
+    """Rows of one ``plan_range`` segment, from its rollup or the daily table."""
+    grain, first, last = segment
+    daily, entity = _DAILY[kind]
+    if grain == "day":
+        table, column, days = daily, daily.c.date, literal(1)
+    else:
+        table = ROLLUPS[kind][grain]
+        column, days = table.c.period_start, table.c.days
+    statement = select(
+        table.c[entity].label("entity_id"),
+        column.label("period_start"),
+        literal(grain).label("grain"),
+        days.label("days"),
+        *(table.c[m].label(m) for m in ROLLUP_METRICS)
+    ).where(column.between(first, last))
+    if entity_ids is not None:
+        statement = statement.where(table.c[entity].in_(list(entity_ids)))
+    return statement
+
+
+def _rates(totals: Dict[str, Any]) -> Dict[str, Any]:
+    totals["revenue"] = round(float(totals["revenue"] or 0), 2)
+    totals["conversion_rate"] = round(totals["sales"] / totals["views"], 4) if totals["views"] else 0.0
+    totals["avg_order_value"] = round(totals["revenue"] / totals["sales"], 2) if totals["sales"] else 0.0
+    return totals
+
+
+def range_totals(
+    conn: Connection,
+    kind: str,
+    start: date,
+    end: date,
+    entity_ids: Optional[Iterable[int]] = None
+) -> Dict[int, Dict[str, Any]]:
+    """Summed metrics per entity over ``start..end``, read from the coarsest rollups.
+
+    Conversion rate and average order value are recomputed from the sums
+    rather than averaged over days.
+    """
+    segments = [segment_select(kind, segment, entity_ids) for segment in plan_range(start, end)]
+    if not segments:
+        return {}
+    rows = union_all(*segments).subquery()
+    statement = select(
+        rows.c.entity_id,
+        func.sum(rows.c.days).label("days"),
+        *(func.sum(rows.c[m]).label(m) for m in ROLLUP_METRICS)
+    ).group_by(rows.c.entity_id)
+    return {
+        row.entity_id: _rates({"days": row.days, **{m: row._mapping[m] for m in ROLLUP_METRICS}})
+        for row in conn.execute(statement)
+    }
+
+
+def period_series(
+    conn: Connection,
+    kind: str,
+    start: date,
+    end: date,
+    grain: str = "day",
+    entity_ids: Optional[Iterable[int]] = None
+) -> List[Dict[str, Any]]:
+    """Metrics per day, week or month over ``start..end``, summed over entities.
+
+    Whole periods are read from the matching rollup; periods cut by the
+    range edges are summed from the daily rows that fall inside it, so
+    every bucket covers exactly the requested days (``days`` says how
+    many had data).
+    """
+    grains = () if grain == "day" else (grain,)
+    segments = [segment_select(kind, segment, entity_ids) for segment in plan_range(start, end, grains)]
+    if not segments:
+        return []
+    buckets: Dict[date, Dict[str, Any]] = {}
+    for row in conn.execute(union_all(*segments)):
+        bucket = period_start(row.period_start, grain)
+        totals = buckets.setdefault(bucket, {"days": 0, **{m: 0 for m in ROLLUP_METRICS}})
+        totals["days"] += row.days or 0
+        for m in ROLLUP_METRICS:
+            totals[m] += row._mapping[m] or 0
+    return [
+        {"period_start": bucket, **_rates(totals)}
+        for bucket, totals in sorted(buckets.items())
+    ]
@@ -0,0 +1,319 @@
+"""
+Per-entity analytics time series with resampling and windowed metrics.
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from datetime import date, timedelta
+import logging
+import re
+
+import numpy as np
+from sqlalchemy import Table, func, select, union_all
+from sqlalchemy.engine import Connection, Engine
+
+from app.core import schema
+from app.core.lazy import providers
+
+from .ingest import ANALYTICS_TABLES
+from .rollups import ROLLUP_METRICS, ROLLUPS, period_after, period_start, plan_range, range_totals, segment_select
+
+logger = logging.getLogger(__name__)
+
+GRAINS = ("day", "week", "month")
+
+# Catalog table and external id column of each kind, and its summed metrics
+SERIES_SOURCES: Dict[str, Tuple[Table, str, Tuple[str, ...]]] = {
+    "products": (schema.products, "product_id", ROLLUP_METRICS),
+    "shops": (schema.shops, "shop_id", ROLLUP_METRICS),
+    "creators": (schema.creators, "creator_id", ("followers_gained", "views", "likes", "comments", "shares")),
+    "videos": (schema.videos, "video_id", ("views", "likes", "comments", "shares", "saves"))
+}
+
+# Daily columns averaged (not summed) over the days with data
+AVERAGED_METRICS = {"shops": ("customer_acquisition_cost", "return_on_ad_spend")}
+
+_DATE_RANGE = re.compile(r"^(\d+)([dwmy])$")
+_RANGE_DAYS = {"d": 1, "w": 7, "m": 30, "y": 365}
+
+
+def parse_date_range(value: str) -> int:
+    """Days in a ``date_range`` such as ``30d``, ``12w``, ``6m`` or ``2y`` (months are 30 days)."""
+    match = _DATE_RANGE.match(value.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid date range '{value}' (expected e.g. 30d, 12w, 6m or 2y)")
+    return int(match.group(1)) * _RANGE_DAYS[match.group(2)]
+
+
+def shift_periods(start: date, grain: str, periods: int) -> date:
+    """Start of the period ``periods`` before the one starting at ``start``."""
+    if grain == "month":
+        year, month = divmod(start.year * 12 + start.month - 1 - periods, 12)
+        return date(year, month + 1, 1)
+    return start - timedelta(days=periods * (7 if grain == "week" else 1))
+
+
+def period_starts(first: date, end: date, grain: str) -> List[date]:
+    starts, current = [], period_start(first, grain)
+    while current <= end:
+        starts.append(current)
+        current = period_after(current, grain)
+    return starts
+
+
+def bucket_index(days: np.ndarray, first: date, grain: str) -> np.ndarray:
+    """Index of the period (counted from the one starting at ``first``) containing each day."""
+    if grain == "month":
+        months = days.astype("datetime64[M]") - np.datetime64(first, "M")
+        return months.astype(np.int64)
+    offsets = (days - np.datetime64(first, "D")).astype(np.int64)
+    return offsets // 7 if grain == "week" else offsets
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` periods; NaN until a full window is available."""
+    out = np.full(values.shape, np.nan)
+    if window <= len(values):
+        sums = np.cumsum(np.r_[0.0, values])
+        out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def growth(values: np.ndarray) -> np.ndarray:
+    """Change relative to the previous period; NaN where that period is zero or missing."""
+    out = np.full(values.shape, np.nan)
+    previous = values[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.where(previous != 0, values[1:] / previous - 1, np.nan)
+    return out
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator != 0, numerator / denominator, 0.0)
+
+
+def _rounded(values: np.ndarray, digits: int) -> List[Optional[float]]:
+    return [None if value != value else value for value in np.round(values, digits).tolist()]
+
+
+def _metric_values(values: np.ndarray, metric: str) -> List[Any]:
+    if metric == "revenue":
+        return np.round(values, 2).tolist()
+    return values.astype(np.int64).tolist()
+
+
+class TimeSeriesRepository:
+    """Reads per-entity series from the daily analytics tables and their rollups.
+
+    A series request becomes one query: for products and shops, whole weeks
+    or months come from the rollup tables and only the days of an
+    unfinished last period from the daily table; other kinds read daily
+    rows. The rows are summed into a dense ``metrics x periods`` array and
+    every derived series (rolling mean, growth, cumulative sum, rates) is
+    an array operation over it. Enough periods before the range are read
+    for the first rolling mean and growth values to be complete.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def _row_id(self, conn: Connection, kind: str, entity_id: str) -> Optional[int]:
+        table, key, _ = SERIES_SOURCES[kind]
+        return conn.execute(select(table.c.id).where(table.c[key] == entity_id)).scalar()
+
+    def _latest_date(self, conn: Connection, kind: str, row_id: int) -> date:
+        daily, entity = ANALYTICS_TABLES[kind]
+        latest = conn.execute(select(func.max(daily.c.date)).where(daily.c[entity] == row_id)).scalar()
+        return latest or date.today()
+
+    def _block(
+        self,
+        conn: Connection,
+        kind: str,
+        row_id: int,
+        first: date,
+        end: date,
+        grain: str
+    ) -> np.ndarray:
+        """``metrics x periods`` sums for the periods from the one starting at ``first`` to ``end``."""
+        daily, entity = ANALYTICS_TABLES[kind]
+        metrics = SERIES_SOURCES[kind][2]
+        if kind in ROLLUPS and grain != "day":
+            statement = union_all(*(
+                segment_select(kind, segment, [row_id]) for segment in plan_range(first, end, (grain,))
+            ))
+        else:
+            statement = select(daily.c.date.label("period_start"), *(daily.c[m] for m in metrics)).where(
+                daily.c[entity] == row_id, daily.c.date.between(first, end)
+            )
+        rows = conn.execute(statement).mappings().all()
+
+        block = np.zeros((len(metrics), len(period_starts(first, end, grain))))
+        if rows:
+            days = np.array([row["period_start"] for row in rows], dtype="datetime64[D]")
+            values = np.array([[row[m] for m in metrics] for row in rows], dtype=np.float64)
+            index = bucket_index(days, first, grain)
+            for i in range(len(metrics)):
+                np.add.at(block[i], index, np.nan_to_num(values[:, i]))
+        return block
+
+    def series(
+        self,
+        kind: str,
+        entity_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        grain: str = "day",
+        window: int = 7,
+        metrics: Optional[Sequence[str]] = None,
+        days: int = 30
+    ) -> Optional[Dict[str, Any]]:
+        """Resampled series of one entity, or ``None`` if it does not exist.
+
+        ``end`` defaults to the entity's latest analytics date and ``start``
+        to ``days`` before it. Week and month buckets are whole periods, so
+        ``start`` moves back to the first bucket's start; the last bucket
+        stops at ``end`` and ``days`` says how many days each covers.
+        ``window`` is in periods of ``grain``.
+        """
+        available = SERIES_SOURCES[kind][2]
+        metrics = list(metrics or available)
+        with self.engine.connect() as conn:
+            row_id = self._row_id(conn, kind, entity_id)
+            if row_id is None:
+                return None
+            end = end or self._latest_date(conn, kind, row_id)
+            first = period_start(start or end - timedelta(days=days - 1), grain)
+            lookback = max(window - 1, 1)
+            block = self._block(conn, kind, row_id, shift_periods(first, grain, lookback), end, grain)
+
+        starts = period_starts(first, end, grain)
+        visible = slice(lookback, lookback + len(starts))
+        columns = dict(zip(available, block))
+        series = {}
+        for metric in metrics:
+            values = columns[metric]
+            series[metric] = {
+                "values": _metric_values(values[visible], metric),
+                "rolling_avg": _rounded(rolling_mean(values, window)[visible], 2),
+                "growth": _rounded(growth(values)[visible], 4),
+                "cumulative": _metric_values(np.cumsum(values[visible]), metric)
+            }
+
+        totals = {metric: _metric_values(np.array([columns[metric][visible].sum()]), metric)[0] for metric in metrics}
+        result = {
+            "kind": kind,
+            "id": entity_id,
+            "grain": grain,
+            "window": window,
+            "start": first.isoformat(),
+            "end": end.isoformat(),
+            "periods": [period.isoformat() for period in starts],
+            "days": [(min(period_after(period, grain), end + timedelta(days=1)) - period).days for period in starts],
+            "series": series,
+            "totals": totals
+        }
+        if "sales" in columns and "views" in columns and "revenue" in columns:
+            views, sales, revenue = columns["views"][visible], columns["sales"][visible], columns["revenue"][visible]
+            result["rates"] = {
+                "conversion_rate": _rounded(_ratio(sales, views), 4),
+                "avg_order_value": _rounded(_ratio(revenue, sales), 2)
+            }
+            totals["conversion_rate"] = round(float(_ratio(sales.sum(), views.sum())), 4)
+            totals["avg_order_value"] = round(float(_ratio(revenue.sum(), sales.sum())), 2)
+        return result
+
+    def _totals(self, conn: Connection, kind: str, row_id: int, start: date, end: date) -> Dict[str, Any]:
+        daily, entity = ANALYTICS_TABLES[kind]
+        metrics = SERIES_SOURCES[kind][2]
+        if kind in ROLLUPS:
+            totals = range_totals(conn, kind, start, end, [row_id]).get(row_id)
+            return totals or {"days": 0, **{m: 0 for m in metrics}, "conversion_rate": 0.0, "avg_order_value": 0.0}
+        row = conn.execute(
+            select(*(func.coalesce(func.sum(daily.c[m]), 0).label(m) for m in metrics))
+            .where(daily.c[entity] == row_id, daily.c.date.between(start, end))
+        ).mappings().one()
+        return dict(row)
+
+    def _compare(self, conn: Connection, kind: str, row_id: int, days: int, end: date) -> Dict[str, Any]:
+        start = end - timedelta(days=days - 1)
+        current = self._totals(conn, kind, row_id, start, end)
+        previous = self._totals(conn, kind, row_id, start - timedelta(days=days), start - timedelta(days=1))
+        if kind in AVERAGED_METRICS:
+            daily, entity = ANALYTICS_TABLES[kind]
+            averages = conn.execute(
+                select(*(func.avg(daily.c[m]).label(m) for m in AVERAGED_METRICS[kind]))
+                .where(daily.c[entity] == row_id, daily.c.date.between(start, end))
+            ).mappings().one()
+            current.update({m: round(float(v or 0), 2) for m, v in averages.items()})
+
+        changes = {}
+        for metric in SERIES_SOURCES[kind][2]:
+            before = float(previous.get(metric) or 0)
+            changes[metric] = round(float(current[metric] or 0) / before - 1, 4) if before else None
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "current": current,
+            "previous": previous,
+            "growth": changes
+        }
+
+    def compare_windows(
+        self,
+        kind: str,
+        entity_id: str,
+        windows: Sequence[int],
+        end: Optional[date] = None
+    ) -> Optional[Dict[int, Dict[str, Any]]]:
+        """``compare`` for several window lengths, sharing one connection and id lookup."""
+        with self.engine.connect() as conn:
+            row_id = self._row_id(conn, kind, entity_id)
+            if row_id is None:
+                return None
+            end = end or self._latest_date(conn, kind, row_id)
+            return {days: self._compare(conn, kind, row_id, days, end) for days in windows}
+
+    def compare(
+        self,
+        kind: str,
+        entity_id: str,
+        days: int,
+        end: Optional[date] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Totals of the last ``days`` days against the ``days`` before, with growth per metric."""
+        comparisons = self.compare_windows(kind, entity_id, (days,), end)
+        return None if comparisons is None else comparisons[days]
+
+    def top_products(self, shop_id: str, start: date, end: date, limit: int = 3) -> List[Dict[str, Any]]:
+        """A shop's best-selling products over ``start..end``."""
+        products = schema.products
+        with self.engine.connect() as conn:
+            catalog = {
+                row.id: row for row in conn.execute(
+                    select(products.c.id, products.c.product_id, products.c.name)
+                    .join(schema.shops, products.c.shop_id == schema.shops.c.id)
+                    .where(schema.shops.c.shop_id == shop_id)
+                )
+            }
+            totals = range_totals(conn, "products", start, end, list(catalog)) if catalog else {}
+        best = sorted(totals.items(), key=lambda item: (-item[1]["sales"], item[0]))[:limit]
+        return [
+            {
+                "id": catalog[row_id].product_id,
+                "name": catalog[row_id].name,
+                "sales": totals["sales"],
+                "revenue": totals["revenue"]
+            }
+            for row_id, totals in best
+        ]
+
+
+def load_timeseries_repository():
+    """Time series over the application database."""
+    from app.core.database import engine
+    return TimeSeriesRepository(engine)
+
+
+# Global time series repository (built on first use)
+timeseries_repository = providers.register("timeseries", load_timeseries_repository)
@@ -0,0 +1,513 @@
+"""
+Streaming trend detection over product engagement events.
+"""
+
+from typing import List, Dict, Any, Iterable, Mapping, Optional, Sequence, Tuple
+from collections import Counter, defaultdict
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+import weakref
+
+import numpy as np
+
+from app.catalog.store import CatalogStore
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Activity each event type counts for, in views
+EVENT_WEIGHTS: Dict[str, float] = {
+    "view": 1.0,
+    "click": 2.0,
+    "like": 3.0,
+    "comment": 4.0,
+    "save": 4.0,
+    "share": 5.0,
+    "add_to_cart": 8.0,
+    "sale": 20.0
+}
+
+# Other names accepted for an event type
+EVENT_ALIASES: Dict[str, str] = {"purchase": "sale"}
+
+HLL_PRECISION = 10  # 1024 registers per window bucket, ~3% error
+WINDOW_BUCKETS = 4  # sliding distinct-count windows advance in quarters
+SKETCH_WIDTH = 4096
+SKETCH_DEPTH = 4
+MAX_MOMENTUM = 10.0
+TREND_SCALE = 5.0  # trend activity that maps to a stream score of 50
+_RESCALE_EXPONENT = 30.0  # move the decay landmark before weights overflow
+
+
+def stable_hash(value: str) -> int:
+    """64-bit hash that is the same in every process (unlike ``hash``)."""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little")
+
+
+def blend(prior: float, stream_score: float) -> float:
+    """Catalog trend score lifted by a 0-100 stream score.
+
+    The stream score closes that share of the gap between ``prior`` and
+    100, so the result never drops below ``prior``, never exceeds 100, and
+    grows with activity.
+    """
+    return round(prior + (100 - prior) * stream_score / 100, 2)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Exact bit length of each ``uint64``."""
+    values = values.copy()
+    length = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        wide = (values >> np.uint64(shift)) > 0
+        length += wide * shift
+        values = np.where(wide, values >> np.uint64(shift), values)
+    return length + (values > 0)
+
+
+class SlidingHyperLogLog:
+    """Distinct count over a sliding time window (HyperLogLog).
+
+    The window is split into ``buckets`` slots of registers; a slot is
+    cleared when time moves past it, and the estimate takes the register
+    maximum over the live slots, so the count covers the last ``window``
+    seconds to within one slot. ``totals`` counts all additions per slot,
+    for the ratio of distinct to total.
+    """
+
+    def __init__(self, window: float, precision: int = HLL_PRECISION, buckets: int = WINDOW_BUCKETS):
+        self.precision = precision
+        self.slot_seconds = window / buckets
+        self.registers = np.zeros((buckets, 1 << precision), dtype=np.uint8)
+        self.epochs = np.full(buckets, -1, dtype=np.int64)
+        self.totals = np.zeros(buckets, dtype=np.int64)
+
+    def _slot(self, epoch: int) -> Optional[int]:
+        slot = epoch % len(self.epochs)
+        if self.epochs[slot] < epoch:
+            self.registers[slot] = 0
+            self.totals[slot] = 0
+            self.epochs[slot] = epoch
+        elif self.epochs[slot] > epoch:
+            return None  # older than the window
+        return slot
+
+    def add(self, hashes: np.ndarray, timestamp: float):
+        """Add 64-bit hashes of values seen at ``timestamp``."""
+        slot = self._slot(int(timestamp // self.slot_seconds))
+        if slot is None or not len(hashes):
+            return
+        suffix_bits = 64 - self.precision
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+        suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+        ranks = (suffix_bits - _bit_length(suffix) + 1).astype(np.uint8)
+        np.maximum.at(self.registers[slot], index, ranks)
+        self.totals[slot] += len(hashes)
+
+    def _live(self, now: float) -> np.ndarray:
+        epoch = int(now // self.slot_seconds)
+        return self.epochs > epoch - len(self.epochs)
+
+    def count(self, now: float) -> float:
+        """Estimated distinct values in the window ending at ``now``."""
+        live = self._live(now)
+        if not live.any():
+            return 0.0
+        registers = self.registers[live].max(axis=0).astype(np.float64)
+        m = len(registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.exp2(-registers))
+        zeros = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small sets
+        return float(estimate)
+
+    def total(self, now: float) -> int:
+        """Values added (with repeats) in the window ending at ``now``."""
+        return int(self.totals[self._live(now)].sum())
+
+    @property
+    def nbytes(self) -> int:
+        return self.registers.nbytes + self.epochs.nbytes + self.totals.nbytes
+
+
+class CountMinSketch:
+    """Approximate per-key sums in fixed memory (Count-Min).
+
+    Estimates never undercount; the overcount is at most ``e / width`` of
+    the total with probability ``1 - exp(-depth)``. Being linear, the
+    table can be scaled in place, which is how decayed counts are rebased.
+    """
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH):
+        self.width = width
+        self.table = np.zeros((depth, width), dtype=np.float64)
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        # Double hashing: row i uses h1 + i * h2
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = hashes >> np.uint64(32)
+        rows = np.arange(len(self.table), dtype=np.uint64)[:, None]
+        return ((low[None, :] + rows * high[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, hashes: np.ndarray, weights: np.ndarray):
+        for row, columns in zip(self.table, self._columns(hashes)):
+            np.add.at(row, columns, weights)
+
+    def estimate(self, hashes: np.ndarray) -> np.ndarray:
+        columns = self._columns(hashes)
+        return np.min(np.take_along_axis(self.table, columns, axis=1), axis=0)
+
+    def scale(self, factor: float):
+        self.table *= factor
+
+    def merge(self, other: "CountMinSketch"):
+        self.table += other.table
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+
+class SpaceSaving:
+    """The ``capacity`` heaviest keys of a weighted stream (SpaceSaving).
+
+    A new key replaces the lightest tracked one and inherits its count as
+    the error bound, so any key whose true weight exceeds ``total /
+    capacity`` is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, List[float]] = {}  # key -> [count, error]
+
+    def offer(self, key: str, weight: float) -> Optional[str]:
+        """Add ``weight`` to ``key``; returns the key evicted to make room, if any."""
+        entry = self.counts.get(key)
+        if entry is not None:
+            entry[0] += weight
+            return None
+        if len(self.counts) < self.capacity:
+            self.counts[key] = [weight, 0.0]
+            return None
+        evicted = min(self.counts, key=lambda k: self.counts[k][0])
+        floor = self.counts.pop(evicted)[0]
+        self.counts[key] = [floor + weight, floor]
+        return evicted
+
+    def scale(self, factor: float):
+        for entry in self.counts.values():
+            entry[0] *= factor
+            entry[1] *= factor
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+class TrendTracker:
+    """Turns a stream of product events into ``trend_score`` in bounded memory.
+
+    Activity (events weighted by ``EVENT_WEIGHTS``) is counted with
+    exponential decay at two half-lives: a short one for recent activity
+    and a long one as the baseline. Both use forward decay, so an event is
+    added once with a weight growing with its timestamp and nothing is
+    touched as time passes; the landmark moves (rescaling every structure)
+    before the weights overflow. Two Count-Min sketches hold the decayed
+    activity of every product, a SpaceSaving summary per category keeps
+    the ``top_k`` products with the most recent activity, and only those
+    get sliding-window HyperLogLogs of distinct users and buyers.
+
+    A product's stream score grows with its recent activity, its momentum
+    (recent rate over baseline rate) and the share of distinct users in
+    its events, mapped to 0-100. ``publish`` writes ``blend(prior, stream
+    score)`` into the catalog's ``trend_score``, where ``/trending-products``
+    sorts on it. ``prior`` is the product's catalog score from before its
+    first event. Products without events keep that score, so activity can
+    only move a product up the listing. Once a product's activity has
+    decayed, it is published back at its prior and forgotten.
+
+    All of this state lives in one process, so the app only feeds and
+    publishes the tracker when it runs a single worker (``WEB_CONCURRENCY``).
+    """
+
+    def __init__(
+        self,
+        top_k: Optional[int] = None,
+        half_life: Optional[float] = None,
+        baseline_half_life: Optional[float] = None,
+        window: Optional[float] = None
+    ):
+        self.top_k = top_k or settings.TRENDING_TOP_K
+        self.half_life = half_life or settings.TRENDING_HALF_LIFE_SECONDS
+        self.baseline_half_life = baseline_half_life or settings.TRENDING_BASELINE_HALF_LIFE_SECONDS
+        self.window = window or settings.TRENDING_WINDOW_SECONDS
+        self._tau = self.half_life / math.log(2)
+        self._baseline_tau = self.baseline_half_life / math.log(2)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._last: Optional[Dict[str, Any]] = None
+        self._table: Optional[weakref.ref] = None  # product table the priors were read from
+        self.reset()
+
+    def reset(self, now: Optional[float] = None):
+        """Forget all events."""
+        with self._lock:
+            self.started = self.landmark = time.time() if now is None else now
+            self.recent = CountMinSketch()
+            self.baseline = CountMinSketch()
+            self.heavy: Dict[str, SpaceSaving] = {}
+            # product id -> (category, users, buyers) for tracked products
+            self.audiences: Dict[str, Tuple[str, SlidingHyperLogLog, SlidingHyperLogLog]] = {}
+            self.dirty: Dict[str, str] = {}  # product id -> category, changed since publish
+            # product id -> catalog trend score before events lifted it
+            self.priors: Dict[str, float] = {}
+            self.stats: Counter = Counter()
+
+    def _rescale(self, timestamp: float):
+        shift = timestamp - self.landmark
+        self.recent.scale(math.exp(-shift / self._tau))
+        self.baseline.scale(math.exp(-shift / self._baseline_tau))
+        for summary in self.heavy.values():
+            summary.scale(math.exp(-shift / self._tau))
+        self.landmark = timestamp
+
+    def record(self, events: Iterable[Mapping[str, Any]], store: CatalogStore, now: Optional[float] = None) -> int:
+        """Count a batch of events; returns how many were accepted.
+
+        Each event has a ``product_id``, a ``type`` from ``EVENT_WEIGHTS``
+        (default ``view``), an optional ``user_id`` and an optional epoch
+        ``timestamp`` (default now; future times are clamped to now).
+        Events for products missing from ``store`` are skipped.
+        """
+        now = time.time() if now is None else now
+        table = store.products
+        accepted: List[Tuple[Mapping[str, Any], str]] = []
+        positions: List[int] = []
+        skipped: Counter = Counter()
+        for event in events:
+            kind = event.get("type") or "view"
+            kind = EVENT_ALIASES.get(kind, kind)
+            if kind not in EVENT_WEIGHTS:
+                skipped["rejected"] += 1
+                continue
+            position = table.positions.get(event.get("product_id"))
+            if position is None:
+                skipped["unknown_product"] += 1
+                continue
+            accepted.append((event, kind))
+            positions.append(position)
+
+        # Categories from the coded column, without materializing rows
+        names = {code: name for name, code in table.vocab.get("category", {}).items()}
+        codes = table.codes["category"][positions].tolist() if positions else []
+        parsed: List[Tuple[str, str, float, str, Optional[str]]] = [
+            (
+                event["product_id"],
+                names[code],
+                min(float(event.get("timestamp") or now), now),
+                kind,
+                None if event.get("user_id") is None else str(event["user_id"])
+            )
+            for (event, kind), code in zip(accepted, codes)
+        ]
+
+        with self._lock:
+            self.stats.update(skipped)
+            if not parsed:
+                return 0
+            latest = max(event[2] for event in parsed)
+            if (latest - self.landmark) / self._tau > _RESCALE_EXPONENT:
+                self._rescale(latest)
+            self._count(parsed)
+            self.stats["events"] += len(parsed)
+        return len(parsed)
+
+    def _count(self, parsed: Sequence[Tuple[str, str, float, str, Optional[str]]]):
+        hashes = {product_id: stable_hash(product_id) for product_id, *_ in parsed}
+        keys = np.array([hashes[event[0]] for event in parsed], dtype=np.uint64)
+        offsets = np.array([event[2] - self.landmark for event in parsed])
+        weights = np.array([EVENT_WEIGHTS[event[3]] for event in parsed])
+        recent = weights * np.exp(offsets / self._tau)
+        self.recent.add(keys, recent)
+        self.baseline.add(keys, weights * np.exp(offsets / self._baseline_tau))
+
+        # Heavy hitters per category, offered the batch's total per product
+        totals: Dict[str, float] = defaultdict(float)
+        categories: Dict[str, str] = {}
+        for (product_id, category, *_), value in zip(parsed, recent.tolist()):
+            totals[product_id] += value
+            categories[product_id] = category
+        for product_id, value in totals.items():
+            category = categories[product_id]
+            self.dirty[product_id] = category
+            summary = self.heavy.get(category)
+            if summary is None:
+                summary = self.heavy[category] = SpaceSaving(self.top_k)
+            evicted = summary.offer(product_id, value)
+            if evicted is not None:
+                self.audiences.pop(evicted, None)
+                self.dirty[evicted] = category
+            if product_id not in self.audiences:
+                self.audiences[product_id] = (
+                    category, SlidingHyperLogLog(self.window), SlidingHyperLogLog(self.window)
+                )
+
+        # Distinct users and buyers of tracked products, grouped by window slot
+        slot_seconds = self.window / WINDOW_BUCKETS
+        users: Dict[Tuple[str, int, float], List[int]] = defaultdict(list)
+        for product_id, _, timestamp, kind, user in parsed:
+            if user is None or product_id not in self.audiences:
+                continue
+            slot = timestamp // slot_seconds * slot_seconds
+            users[(product_id, 1, slot)].append(stable_hash(user))
+            if kind == "sale":
+                users[(product_id, 2, slot)].append(stable_hash(user))
+        for (product_id, sketch, slot), user_hashes in users.items():
+            self.audiences[product_id][sketch].add(np.array(user_hashes, dtype=np.uint64), slot)
+
+    def _scores(self, product_ids: Sequence[str], now: float) -> List[Dict[str, Any]]:
+        """Trend components and score of each product, as of ``now``."""
+        if not product_ids:
+            return []
+        keys = np.array([stable_hash(product_id) for product_id in product_ids], dtype=np.uint64)
+        elapsed = now - self.landmark
+        recent = self.recent.estimate(keys) * math.exp(-elapsed / self._tau)
+        baseline = self.baseline.estimate(keys) * math.exp(-elapsed / self._baseline_tau)
+        # Rates divide by the decayed time actually observed, so a baseline
+        # younger than its half-life isn't mistaken for a slow one
+        age = max(now - self.started, 1.0)
+        recent_span = self._tau * -math.expm1(-age / self._tau)
+        baseline_span = self._baseline_tau * -math.expm1(-age / self._baseline_tau)
+        prior = 1.0 / self._tau  # one event per recent period
+        momentum = np.minimum((recent / recent_span + prior) / (baseline / baseline_span + prior), MAX_MOMENTUM)
+
+        results = []
+        for product_id, activity, change in zip(product_ids, recent.tolist(), momentum.tolist()):
+            entry = self.audiences.get(product_id)
+            users = buyers = None
+            breadth = 1.0
+            if entry is not None:
+                users, buyers = entry[1].count(now), entry[2].count(now)
+                events = entry[1].total(now)
+                if events:
+                    breadth = min(users / events, 1.0)
+            trend = math.log1p(activity) * change * math.sqrt(breadth)
+            results.append({
+                "product_id": product_id,
+                "activity": round(activity, 2),
+                "momentum": round(change, 4),
+                "unique_users": None if users is None else round(users),
+                "unique_buyers": None if buyers is None else round(buyers),
+                "stream_score": round(100 * trend / (trend + TREND_SCALE), 2)
+            })
+        return results
+
+    def top(self, category: Optional[str] = None, limit: int = 20, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Tracked products of ``category`` (default all) by stream score."""
+        now = time.time() if now is None else now
+        with self._lock:
+            candidates: Dict[str, str] = {}
+            for name, summary in self.heavy.items():
+                if category is None or name.lower() == category.lower():
+                    candidates.update((product_id, name) for product_id in summary.counts)
+            scores = self._scores(list(candidates), now)
+            decay = math.exp(-(now - self.landmark) / self._tau)
+            for score in scores:
+                name = candidates[score["product_id"]]
+                score["category"] = name
+                score["error_bound"] = round(self.heavy[name].counts[score["product_id"]][1] * decay, 2)
+        scores.sort(key=lambda score: (-score["stream_score"], score["product_id"]))
+        return scores[:limit]
+
+    def publish(self, store: CatalogStore, now: Optional[float] = None) -> Dict[str, Any]:
+        """Write current trend scores into the catalog's product rows.
+
+        Covers every tracked product, every product with events since the
+        last publish and every product still above its prior (their scores
+        move as activity decays), as one batch update of the
+        ``trend_score`` column. Priors are read from the catalog before a
+        product is first written, and dropped when the catalog is reloaded.
+        """
+        now = time.time() if now is None else now
+        started = time.perf_counter()
+        table = store.products
+        values: Dict[str, float] = {}
+        with self._lock:
+            if self._table is None or self._table() is not table:
+                self.priors = {}
+                self._table = weakref.ref(table)
+            product_ids = sorted(set(self.audiences) | set(self.dirty) | set(self.priors))
+            scores = self._scores(product_ids, now)
+            self.dirty = {}
+            for score in scores:
+                product_id = score["product_id"]
+                prior = self.priors.get(product_id)
+                if prior is None:
+                    position = table.positions.get(product_id)
+                    if position is None:
+                        continue
+                    prior = self.priors[product_id] = float(table.numeric["trend_score"][position])
+                values[product_id] = blend(prior, score["stream_score"])
+                if values[product_id] == round(prior, 2) and product_id not in self.audiences:
+                    del self.priors[product_id]
+
+        updated = store.set_values("products", "trend_score", values)
+        self._last = {
+            "products": len(values),
+            "updated": updated,
+            "seconds": round(time.perf_counter() - started, 4),
+            "finished_at": time.time()
+        }
+        return self._last
+
+    def start(self, store: CatalogStore, interval: float):
+        """Publish every ``interval`` seconds on the running event loop.
+
+        Catalog tables are read by request handlers on the loop, so the
+        updates are applied there too rather than from a thread.
+        """
+        if self._task is not None and not self._task.done():
+            return
+
+        async def loop():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    self.publish(store)
+                except Exception as e:
+                    logger.error(f"Trend publish failed: {e}")
+
+        self._task = asyncio.get_running_loop().create_task(loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def report(self) -> Dict[str, Any]:
+        """Event counts, tracked products, memory use and the last publish."""
+        with self._lock:
+            audience_bytes = sum(users.nbytes + buyers.nbytes for _, users, buyers in self.audiences.values())
+            return {
+                "scheduled": self._task is not None and not self._task.done(),
+                "events": dict(self.stats),
+                "categories": len(self.heavy),
+                "tracked_products": len(self.audiences),
+                "lifted_products": len(self.priors),
+                "top_k": self.top_k,
+                "half_life_seconds": self.half_life,
+                "baseline_half_life_seconds": self.baseline_half_life,
+                "window_seconds": self.window,
+                "memory_bytes": self.recent.nbytes + self.baseline.nbytes + audience_bytes,
+                "last_publish": self._last
+            }
+
+
+# Global trend tracker instance
+trend_tracker = TrendTracker()
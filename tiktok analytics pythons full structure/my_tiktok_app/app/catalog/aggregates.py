@@ -0,0 +1,124 @@
+"""
+Incrementally maintained aggregates behind the dashboard overview.
+"""
+
+from typing import List, Dict, Any, Sequence
+from collections import Counter
+
+import numpy as np
+
+from .columns import ColumnBlock, RecordSequence
+from .sketches import DISTRIBUTION_FIELDS, CatalogDistributions
+
+# Row fields the totals and distributions depend on, per kind
+_TRACKED_FIELDS = {
+    "products": ("sales_count", "price", "country", "category"),
+    "shops": ("total_revenue", "country", "category"),
+    "creators": ("country", "category")
+}
+
+
+class CatalogAggregates:
+    """Running totals, counts and means over the catalog.
+
+    Every insert, update and delete adjusts the totals by the row's own
+    contribution, so serving the overview never iterates the catalog.
+    Per-segment quantile sketches and histograms (``distributions``) are
+    maintained the same way.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear all totals."""
+        self.counts: Counter = Counter()
+        self.total_sales = 0
+        self.total_revenue = 0.0
+        self.price_sum = 0.0
+        self.country_counts: Counter = Counter()
+        self.category_counts: Counter = Counter()
+        self.distributions = CatalogDistributions()
+
+    def load(
+        self,
+        products: Sequence[Dict[str, Any]],
+        shops: Sequence[Dict[str, Any]],
+        creators: Sequence[Dict[str, Any]]
+    ):
+        """Recompute all totals from full row lists."""
+        self.reset()
+        for kind, rows in (("products", products), ("shops", shops), ("creators", creators)):
+            if isinstance(rows, RecordSequence) and not rows.modified:
+                self._add_block(kind, rows.block)
+                continue
+            for row in rows:
+                self.add(kind, row)
+
+    def _add_block(self, kind: str, block: ColumnBlock):
+        """Account for a whole column block without materializing rows."""
+        self.counts[kind] += block.size
+        self.distributions.add_block(kind, block)
+        if kind == "products":
+            self.total_sales += int(block.numeric["sales_count"].sum())
+            self.price_sum += float(block.numeric["price"].sum())
+            for field, counter in (("country", self.country_counts), ("category", self.category_counts)):
+                counts = np.bincount(block.codes[field], minlength=len(block.vocab[field]))
+                for term, count in zip(block.vocab[field], counts.tolist()):
+                    if count:
+                        counter[term] += count
+        elif kind == "shops":
+            self.total_revenue += float(block.numeric["total_revenue"].sum())
+
+    def add(self, kind: str, row: Dict[str, Any], sign: int = 1):
+        """Account for an inserted row (or remove it with ``sign=-1``)."""
+        self.counts[kind] += sign
+        self.distributions.add(kind, row, sign)
+
+        if kind == "products":
+            self.total_sales += sign * row.get("sales_count", 0)
+            self.price_sum += sign * row.get("price", 0.0)
+            self._bump(self.country_counts, row.get("country"), sign)
+            self._bump(self.category_counts, row.get("category"), sign)
+        elif kind == "shops":
+            self.total_revenue += sign * row.get("total_revenue", 0.0)
+
+    def tracks(self, kind: str, field: str) -> bool:
+        """Whether changing ``field`` of a ``kind`` row changes any total."""
+        return field in _TRACKED_FIELDS.get(kind, ()) or field in DISTRIBUTION_FIELDS.get(kind, ())
+
+    def remove(self, kind: str, row: Dict[str, Any]):
+        """Account for a deleted row."""
+        self.add(kind, row, sign=-1)
+
+    def update(self, kind: str, old_row: Dict[str, Any], new_row: Dict[str, Any]):
+        """Account for a row replaced in place."""
+        self.remove(kind, old_row)
+        self.add(kind, new_row)
+
+    @staticmethod
+    def _bump(counter: Counter, key: Any, sign: int):
+        if key is None:
+            return
+        counter[key] += sign
+        if counter[key] <= 0:
+            del counter[key]
+
+    @staticmethod
+    def _top(counter: Counter, n: int) -> List[str]:
+        ranked = sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+        return [key for key, _ in ranked[:n]]
+
+    def overview(self, top_n: int = 5) -> Dict[str, Any]:
+        """Totals and means in the shape of the ``/stats/overview`` payload."""
+        product_count = self.counts["products"]
+        return {
+            "total_products": product_count,
+            "total_shops": self.counts["shops"],
+            "total_creators": self.counts["creators"],
+            "total_sales": self.total_sales,
+            "total_revenue": round(self.total_revenue, 2),
+            "avg_product_price": round(self.price_sum / product_count, 2) if product_count else 0.0,
+            "top_countries": self._top(self.country_counts, top_n),
+            "trending_categories": self._top(self.category_counts, top_n)
+        }
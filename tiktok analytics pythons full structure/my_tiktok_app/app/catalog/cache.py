@@ -0,0 +1,158 @@
+"""
+Query result cache for the catalog listing endpoints.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+from collections import Counter, OrderedDict
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Redis-backed cache; eviction follows the server's maxmemory policy.
+
+    ``client`` may be any object with Redis ``get``/``setex`` semantics, which
+    lets a local fake stand in for a server. Redis errors are logged and
+    treated as cache misses so the API keeps serving.
+    """
+
+    def __init__(self, url: Optional[str] = None, client: Any = None, prefix: str = "query:"):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Query cache read failed: {e}")
+            return None
+
+    def set(self, key: str, value: bytes, ttl: int):
+        try:
+            self.client.setex(self.prefix + key, ttl, value)
+        except Exception as e:
+            logger.warning(f"Query cache write failed: {e}")
+
+    def clear(self):
+        try:
+            for key in self.client.scan_iter(match=self.prefix + "*"):
+                self.client.delete(key)
+        except Exception as e:
+            logger.warning(f"Query cache clear failed: {e}")
+
+
+class QueryCache:
+    """Caches encoded listing responses keyed on normalized query parameters.
+
+    Keys embed the catalog state token of the entity kind (its dataset
+    generation and version), so any load or upsert invalidates every cached
+    page of that kind at once; stale entries are simply never read again
+    and age out through TTL/LRU eviction.
+    """
+
+    def __init__(self, backend: Any, ttls: Optional[Dict[str, int]] = None, default_ttl: int = 30):
+        self.backend = backend
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    @staticmethod
+    def make_key(kind: str, version: str, params: Dict[str, Any]) -> str:
+        """Stable cache key for a normalized parameter set."""
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{kind}:{version}:{digest}"
+
+    def get_or_compute(
+        self,
+        kind: str,
+        version: str,
+        params: Dict[str, Any],
+        compute: Callable[[], bytes]
+    ) -> bytes:
+        """Return the cached body for ``params`` or compute and store it."""
+        key = self.make_key(kind, version, params)
+        body = self.backend.get(key)
+        if body is not None:
+            self.hits[kind] += 1
+            return body
+
+        self.misses[kind] += 1
+        body = compute()
+        self.backend.set(key, body, self.ttls.get(kind, self.default_ttl))
+        return body
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per entity kind."""
+        kinds = sorted(set(self.hits) | set(self.misses))
+        return {
+            "backend": type(self.backend).__name__,
+            "kinds": {
+                kind: {
+                    "hits": self.hits[kind],
+                    "misses": self.misses[kind],
+                    "hit_rate": round(self.hits[kind] / (self.hits[kind] + self.misses[kind]), 4)
+                }
+                for kind in kinds
+            }
+        }
+
+
+def create_query_cache() -> QueryCache:
+    """Build the query cache selected by ``settings.QUERY_CACHE_BACKEND``."""
+    if settings.QUERY_CACHE_BACKEND == "redis":
+        backend = RedisCacheBackend(settings.REDIS_URL)
+    else:
+        backend = MemoryCacheBackend(settings.QUERY_CACHE_MAX_ENTRIES)
+    return QueryCache(backend, ttls=settings.QUERY_CACHE_TTL_SECONDS)
+
+
+# Global query cache instance
+query_cache = create_query_cache()
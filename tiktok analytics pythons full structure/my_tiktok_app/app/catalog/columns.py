@@ -0,0 +1,250 @@
+"""
+Column blocks and lazily materialized record sequences.
+"""
+
+from typing import List, Dict, Any, Optional, Iterator, Union
+from collections import OrderedDict
+from collections.abc import Sequence as SequenceABC
+import threading
+
+import numpy as np
+
+from .indexes import IdIndex
+from .records import CatalogRecord, Creator, Product, Shop
+
+# Records kept per block by ``ColumnBlock.record``
+RECORD_CACHE_SIZE = 65536
+
+
+class ColumnBlock:
+    """Columns of one catalog entity kind.
+
+    ``ids`` and ``numeric`` are fixed-width arrays, and ``codes``/``vocab``
+    hold string columns as integer codes into a string table. ``id_order``
+    is the argsort of ``ids``, used to look ids up by binary search. Free
+    text derived from the row index (names, URLs) is not stored; it is
+    produced when a row is materialized. Arrays may be memory-mapped
+    read-only, and are never written once the block is built.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        ids: np.ndarray,
+        numeric: Dict[str, np.ndarray],
+        codes: Dict[str, np.ndarray],
+        vocab: Dict[str, List[str]],
+        id_order: Optional[np.ndarray] = None,
+        cache_size: int = RECORD_CACHE_SIZE
+    ):
+        self.kind = kind
+        self.size = len(ids)
+        self.ids = ids
+        self.id_order = np.argsort(ids, kind="stable") if id_order is None else id_order
+        self.numeric = numeric
+        self.codes = codes
+        self.vocab = vocab
+        self.cache_size = cache_size
+        self._records: "OrderedDict[int, CatalogRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, i: int) -> CatalogRecord:
+        """Row ``i`` as a catalog record.
+
+        The most recently used ``cache_size`` records are kept, so a row
+        served again returns the same record, along with the JSON fragment
+        cached on it.
+        """
+        with self._lock:
+            record = self._records.get(i)
+            if record is not None:
+                self._records.move_to_end(i)
+                return record
+        numeric = {field: column[i].item() for field, column in self.numeric.items()}
+        coded = {field: self.vocab[field][column[i]] for field, column in self.codes.items()}
+        record = _MATERIALIZERS[self.kind](i, numeric, coded)
+        with self._lock:
+            record = self._records.setdefault(i, record)
+            if len(self._records) > self.cache_size:
+                self._records.popitem(last=False)
+        return record
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> List[CatalogRecord]:
+        """Materialize rows ``start:stop`` as catalog records."""
+        stop = self.size if stop is None else min(stop, self.size)
+        numeric = {field: column[start:stop].tolist() for field, column in self.numeric.items()}
+        coded = {
+            field: [self.vocab[field][code] for code in column[start:stop].tolist()]
+            for field, column in self.codes.items()
+        }
+        build = _MATERIALIZERS[self.kind]
+        return [
+            build(start + offset, {field: values[offset] for field, values in numeric.items()},
+                  {field: values[offset] for field, values in coded.items()})
+            for offset in range(stop - start)
+        ]
+
+    def rows(self) -> "RecordSequence":
+        """All rows as a lazily materialized sequence."""
+        return RecordSequence(self)
+
+    def nbytes(self) -> int:
+        """Bytes held by the block's arrays."""
+        return self.ids.nbytes + self.id_order.nbytes + sum(c.nbytes for c in self.numeric.values()) + sum(
+            c.nbytes for c in self.codes.values()
+        )
+
+
+class RecordSequence(SequenceABC):
+    """List-like view of a column block that builds records on access.
+
+    Nothing is materialized up front, so a process serving a mapped
+    snapshot only pays for the rows it actually returns. Replaced and
+    appended rows are kept in small per-sequence overlays, which lets the
+    store apply upserts without touching the shared columns.
+    """
+
+    def __init__(
+        self,
+        block: ColumnBlock,
+        overrides: Optional[Dict[int, CatalogRecord]] = None,
+        extra: Optional[List[CatalogRecord]] = None
+    ):
+        self.block = block
+        self._overrides = dict(overrides or {})
+        self._extra = list(extra or [])
+
+    @property
+    def ids(self) -> List[str]:
+        """Ids of all rows, in order."""
+        return self.block.ids.tolist() + [row["id"] for row in self._extra]
+
+    @property
+    def modified(self) -> bool:
+        """Whether rows were replaced or appended since the sequence was made."""
+        return bool(self._overrides or self._extra)
+
+    def id_index(self) -> IdIndex:
+        """Position of each row id, searched through the block's id order."""
+        index = IdIndex(self.block.ids, self.block.id_order)
+        for offset, row in enumerate(self._extra):
+            index[row["id"]] = self.block.size + offset
+        return index
+
+    def copy(self) -> "RecordSequence":
+        """Independent sequence over the same block."""
+        return RecordSequence(self.block, self._overrides, self._extra)
+
+    def __len__(self) -> int:
+        return self.block.size + len(self._extra)
+
+    def _index(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("record index out of range")
+        return index
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[CatalogRecord, List[CatalogRecord]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = self._index(int(index))
+        if index >= self.block.size:
+            return self._extra[index - self.block.size]
+        row = self._overrides.get(index)
+        return row if row is not None else self.block.record(index)
+
+    def __setitem__(self, index: int, row: CatalogRecord):
+        index = self._index(int(index))
+        if index >= self.block.size:
+            self._extra[index - self.block.size] = row
+        else:
+            self._overrides[index] = row
+
+    def __iter__(self) -> Iterator[CatalogRecord]:
+        # Materialize in chunks so full scans use the bulk column path
+        chunk = 4096
+        for start in range(0, self.block.size, chunk):
+            for offset, row in enumerate(self.block.records(start, start + chunk)):
+                yield self._overrides.get(start + offset, row)
+        yield from self._extra
+
+    def append(self, row: CatalogRecord):
+        self._extra.append(row)
+
+
+def _product(i: int, numeric: Dict[str, Any], coded: Dict[str, str]) -> Product:
+    return Product(
+        id=f"prod_{i + 1:06d}",
+        name=f"Amazing Product {i + 1}",
+        shop_name=coded["shop_name"],
+        shop_id=coded["shop_id"],
+        price=numeric["price"],
+        currency="USD",
+        category=coded["category"],
+        subcategory=coded["subcategory"],
+        country=coded["country"],
+        sales_count=numeric["sales_count"],
+        views=numeric["views"],
+        likes=numeric["likes"],
+        shares=numeric["shares"],
+        comments=numeric["comments"],
+        conversion_rate=numeric["conversion_rate"],
+        trend_score=numeric["trend_score"],
+        image_url=f"https://picsum.photos/300/300?random={i}",
+        created_at=numeric["created_at"]
+    )
+
+
+def _shop(i: int, numeric: Dict[str, Any], coded: Dict[str, str]) -> Shop:
+    return Shop(
+        id=f"shop_{i + 1:03d}",
+        name=f"Amazing Shop {i + 1}",
+        owner_name=f"Owner {i + 1}",
+        country=coded["country"],
+        category=coded["category"],
+        follower_count=numeric["follower_count"],
+        product_count=numeric["product_count"],
+        total_orders=numeric["total_orders"],
+        total_revenue=numeric["total_revenue"],
+        avg_order_value=numeric["avg_order_value"],
+        conversion_rate=numeric["conversion_rate"],
+        is_verified=bool(numeric["is_verified"]),
+        rating=numeric["rating"],
+        created_at=numeric["created_at"]
+    )
+
+
+def _creator(i: int, numeric: Dict[str, Any], coded: Dict[str, str]) -> Creator:
+    return Creator(
+        id=f"creator_{i + 1:06d}",
+        username=f"creator{i + 1}",
+        display_name=f"Creator {i + 1}",
+        country=coded["country"],
+        category=coded["category"],
+        follower_count=numeric["follower_count"],
+        following_count=numeric["following_count"],
+        video_count=numeric["video_count"],
+        like_count=numeric["like_count"],
+        avg_views=numeric["avg_views"],
+        avg_likes=numeric["avg_likes"],
+        avg_shares=numeric["avg_shares"],
+        engagement_rate=numeric["engagement_rate"],
+        is_verified=bool(numeric["is_verified"]),
+        collaboration_price=numeric["collaboration_price"],
+        created_at=numeric["created_at"]
+    )
+
+
+_MATERIALIZERS = {"products": _product, "shops": _shop, "creators": _creator}
+
+# Id formats, kept in step with the materializers above
+ID_FORMATS = {"products": ("prod_", 6), "shops": ("shop_", 3), "creators": ("creator_", 6)}
+
+
+def format_ids(kind: str, count: int) -> np.ndarray:
+    """Fixed-width id column for rows ``0..count-1`` of ``kind``."""
+    prefix, width = ID_FORMATS[kind]
+    numbers = np.char.zfill(np.arange(1, count + 1).astype(str), width)
+    return np.char.add(prefix, numbers)
@@ -0,0 +1,131 @@
+"""
+Side-by-side comparison of catalog entities within their categories.
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import logging
+import threading
+import weakref
+
+import numpy as np
+
+from .store import ColumnarTable
+
+logger = logging.getLogger(__name__)
+
+# Metrics compared when the request names none
+COMPARE_METRICS: Dict[str, Tuple[str, ...]] = {
+    "products": ("sales_count", "views", "price", "conversion_rate", "trend_score"),
+    "shops": ("total_revenue", "total_orders", "follower_count", "avg_order_value", "conversion_rate", "rating"),
+    "creators": ("follower_count", "engagement_rate", "avg_views", "avg_likes", "video_count")
+}
+
+# Numeric columns that are flags rather than measures
+_EXCLUDED = ("is_verified",)
+
+
+class CatalogComparator:
+    """Values, ranks and percentiles of many entities in one pass over columns.
+
+    For each metric the table's column is sorted once by category and value
+    (and the order kept until the table changes); comparing ``k`` entities
+    is then a fancy-indexed read of their values plus two binary searches
+    each in their category's sorted slice. Ranks are competition ranks
+    within the category (1 = highest value), percentiles the mid-rank share
+    of the category at or below the value.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (kind, field) -> (table ref, version, sorted values, category bounds)
+        self._orders: Dict[Tuple[str, str], Tuple[Any, int, np.ndarray, np.ndarray]] = {}
+
+    @staticmethod
+    def metrics(table: ColumnarTable) -> List[str]:
+        """Numeric fields of ``table`` that can be compared."""
+        return [field for field in table.numeric if field not in _EXCLUDED]
+
+    def _category_order(
+        self,
+        kind: str,
+        table: ColumnarTable,
+        version: int,
+        field: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """``field`` values sorted by (category code, value) and each category's slice bounds."""
+        key = (kind, field)
+        cached = self._orders.get(key)
+        if cached is not None and cached[0]() is table and cached[1] == version:
+            return cached[2], cached[3]
+
+        values = np.asarray(table.numeric[field], dtype=np.float64)
+        categories = table.codes["category"]
+        order = np.lexsort((values, categories))
+        bounds = np.searchsorted(categories[order], np.arange(len(table.vocab["category"]) + 1))
+        with self._lock:
+            self._orders[key] = (weakref.ref(table), version, values[order], bounds)
+        return values[order], bounds
+
+    def compare(
+        self,
+        kind: str,
+        table: ColumnarTable,
+        ids: Sequence[str],
+        metrics: Sequence[str],
+        version: int = 0
+    ) -> Dict[str, Any]:
+        """Comparison matrix of ``ids`` over ``metrics``.
+
+        Lists under ``values``, ``ranks`` and ``percentiles`` are per metric
+        and aligned with ``ids`` (unknown ids are listed under ``missing``
+        and left out). ``version`` identifies the table state, so cached
+        orders are rebuilt after it changes.
+        """
+        found, missing, seen = [], [], set()
+        for record_id in ids:
+            if record_id in seen:
+                continue
+            seen.add(record_id)
+            (found if record_id in table.positions else missing).append(record_id)
+
+        positions = np.fromiter((table.positions[record_id] for record_id in found), dtype=np.int64, count=len(found))
+        categories = table.codes["category"][positions]
+        names = {code: name for name, code in table.vocab["category"].items()}
+        result: Dict[str, Any] = {
+            "ids": found,
+            "missing": missing,
+            "metrics": list(metrics),
+            "category": [names[code] for code in categories.tolist()],
+            "values": {},
+            "ranks": {},
+            "percentiles": {}
+        }
+
+        sizes = None
+        for field in metrics:
+            column = table.numeric[field]
+            values = column[positions]
+            ordered, bounds = self._category_order(kind, table, version, field)
+            if sizes is None:
+                sizes = np.diff(bounds)[categories]
+                result["category_size"] = sizes.tolist()
+
+            below = np.zeros(len(found), dtype=np.int64)
+            at_or_below = np.zeros(len(found), dtype=np.int64)
+            for code in np.unique(categories).tolist():
+                members = categories == code
+                segment = ordered[bounds[code]:bounds[code + 1]]
+                targets = values[members].astype(np.float64)
+                below[members] = np.searchsorted(segment, targets, side="left")
+                at_or_below[members] = np.searchsorted(segment, targets, side="right")
+
+            result["values"][field] = values.tolist()
+            result["ranks"][field] = (sizes - at_or_below + 1).tolist()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                percentiles = np.where(sizes > 0, 100.0 * (below + at_or_below) / (2 * sizes), 0.0)
+            result["percentiles"][field] = np.round(percentiles, 1).tolist()
+        return result
+
+
+# Global catalog comparator instance
+catalog_comparator = CatalogComparator()
@@ -0,0 +1,171 @@
+"""
+Deterministic, vectorized synthetic catalog generator.
+"""
+
+from typing import List, Dict
+from datetime import datetime, timedelta
+import hashlib
+
+import numpy as np
+
+from .columns import ColumnBlock, format_ids
+
+# Fixed "now" so that generated dates are reproducible
+REFERENCE_DATE = datetime(2025, 7, 1)
+_REFERENCE_US = (REFERENCE_DATE - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+_DAY_US = 86_400_000_000
+
+SNAPSHOT_FORMAT = 3
+
+COUNTRIES = ["US", "UK", "DE", "FR", "IT", "ES", "CA", "AU", "JP", "KR"]
+COUNTRY_WEIGHTS = [0.30, 0.12, 0.10, 0.09, 0.07, 0.07, 0.08, 0.06, 0.06, 0.05]
+PRODUCT_CATEGORIES = [
+    "Electronics", "Fashion", "Beauty", "Home & Garden", "Sports",
+    "Toys", "Books", "Food", "Health", "Automotive"
+]
+SHOP_CATEGORIES = ["Electronics", "Fashion", "Beauty", "Home", "Sports"]
+CREATOR_CATEGORIES = [
+    "Lifestyle", "Tech", "Fashion", "Beauty", "Food",
+    "Travel", "Fitness", "Education", "Entertainment", "Business"
+]
+
+
+def _zipf_weights(n: int, s: float = 1.0) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return weights / weights.sum()
+
+
+class CatalogGenerator:
+    """Seeded NumPy generator for products, shops and creators.
+
+    Distributions are skewed like real marketplaces: product sales follow a
+    Zipf law over a random popularity rank, shop and creator audiences are
+    log-normal, and shop totals are aggregated from their own products.
+    The same seed and sizes always produce the same catalog.
+    """
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+
+    def _rng(self, kind: str) -> np.random.Generator:
+        # Independent stream per kind so sizes of one kind don't shift another
+        return np.random.default_rng([self.seed, sum(kind.encode())])
+
+    def _created_at(self, rng: np.random.Generator, size: int, low_days: int, high_days: int) -> np.ndarray:
+        days = rng.integers(low_days, high_days + 1, size)
+        jitter = rng.integers(0, _DAY_US, size)
+        return _REFERENCE_US - days * _DAY_US + jitter
+
+    @staticmethod
+    def _coded(rng: np.random.Generator, size: int, values: List[str], weights=None) -> np.ndarray:
+        return rng.choice(len(values), size=size, p=weights).astype(np.int16)
+
+    def products(self, count: int, shop_count: int) -> ColumnBlock:
+        rng = self._rng("products")
+        ranks = rng.permutation(count) + 1
+        sales = np.maximum(1, 500_000 / ranks ** 0.9 * rng.lognormal(0, 0.25, count)).astype(np.int64)
+        conversion = np.round(rng.uniform(0.01, 0.15, count), 4)
+        views = (sales / conversion * rng.uniform(0.5, 1.5, count)).astype(np.int64)
+        likes = (views * rng.uniform(0.01, 0.10, count)).astype(np.int64)
+        trend = np.clip(50 + 8 * np.log10(sales) + rng.normal(0, 5, count), 50, 100)
+
+        shop_index = rng.choice(shop_count, size=count, p=_zipf_weights(shop_count, 0.8)).astype(np.int32)
+
+        numeric = {
+            "price": np.round(np.clip(rng.lognormal(np.log(45), 0.8, count), 10, 500), 2),
+            "sales_count": sales,
+            "views": views,
+            "likes": likes,
+            "shares": (likes * rng.uniform(0.05, 0.20, count)).astype(np.int64),
+            "comments": (likes * rng.uniform(0.02, 0.10, count)).astype(np.int64),
+            "conversion_rate": conversion,
+            "trend_score": np.round(trend, 2),
+            "created_at": self._created_at(rng, count, 1, 365)
+        }
+        subcategories = [f"Subcategory {i}" for i in range(1, 6)]
+        codes = {
+            "category": self._coded(rng, count, PRODUCT_CATEGORIES, _zipf_weights(len(PRODUCT_CATEGORIES), 0.6)),
+            "subcategory": self._coded(rng, count, subcategories),
+            "country": self._coded(rng, count, COUNTRIES, COUNTRY_WEIGHTS),
+            # Both shop columns index the same string tables by shop
+            "shop_id": shop_index,
+            "shop_name": shop_index
+        }
+        vocab = {
+            "category": PRODUCT_CATEGORIES,
+            "subcategory": subcategories,
+            "country": COUNTRIES,
+            "shop_id": format_ids("shops", shop_count).tolist(),
+            "shop_name": [f"Amazing Shop {i}" for i in range(1, shop_count + 1)]
+        }
+        return ColumnBlock("products", format_ids("products", count), numeric, codes, vocab)
+
+    def shops(self, count: int, products: ColumnBlock) -> ColumnBlock:
+        rng = self._rng("shops")
+        shop_index = products.codes["shop_id"]
+        sales = products.numeric["sales_count"]
+        orders = np.bincount(shop_index, weights=sales, minlength=count).astype(np.int64)
+        revenue = np.round(np.bincount(shop_index, weights=sales * products.numeric["price"], minlength=count), 2)
+        aov = np.round(np.divide(revenue, orders, out=np.zeros(count), where=orders > 0), 2)
+
+        numeric = {
+            "follower_count": np.clip(rng.lognormal(np.log(50_000), 1.3, count), 1_000, 5_000_000).astype(np.int64),
+            "product_count": np.bincount(shop_index, minlength=count).astype(np.int64),
+            "total_orders": orders,
+            "total_revenue": revenue,
+            "avg_order_value": aov,
+            "conversion_rate": np.round(rng.uniform(0.02, 0.20, count), 4),
+            "is_verified": rng.random(count) < 0.4,
+            "rating": np.round(rng.uniform(3.5, 5.0, count), 1),
+            "created_at": self._created_at(rng, count, 30, 1000)
+        }
+        codes = {
+            "country": self._coded(rng, count, COUNTRIES, COUNTRY_WEIGHTS),
+            "category": self._coded(rng, count, SHOP_CATEGORIES)
+        }
+        vocab = {"country": COUNTRIES, "category": SHOP_CATEGORIES}
+        return ColumnBlock("shops", format_ids("shops", count), numeric, codes, vocab)
+
+    def creators(self, count: int) -> ColumnBlock:
+        rng = self._rng("creators")
+        followers = np.clip(rng.lognormal(np.log(100_000), 1.2, count), 1_000, 50_000_000).astype(np.int64)
+        avg_views = (followers * rng.uniform(0.05, 0.5, count)).astype(np.int64)
+        avg_likes = (avg_views * rng.uniform(0.02, 0.12, count)).astype(np.int64)
+        avg_shares = (avg_likes * rng.uniform(0.02, 0.10, count)).astype(np.int64)
+        engagement = np.round((avg_likes + avg_shares) / np.maximum(avg_views, 1), 4)
+
+        numeric = {
+            "follower_count": followers,
+            "following_count": rng.integers(100, 10_001, count),
+            "video_count": np.clip(rng.lognormal(np.log(300), 0.8, count), 10, 5_000).astype(np.int64),
+            "like_count": (followers * rng.uniform(1, 20, count)).astype(np.int64),
+            "avg_views": avg_views,
+            "avg_likes": avg_likes,
+            "avg_shares": avg_shares,
+            "engagement_rate": engagement,
+            # Bigger accounts are more likely to be verified
+            "is_verified": rng.random(count) < np.clip(np.log10(followers) / 8, 0, 0.95),
+            "collaboration_price": np.round(followers * rng.uniform(0.005, 0.02, count), 2),
+            "created_at": self._created_at(rng, count, 100, 2000)
+        }
+        codes = {
+            "country": self._coded(rng, count, COUNTRIES, COUNTRY_WEIGHTS),
+            "category": self._coded(rng, count, CREATOR_CATEGORIES, _zipf_weights(len(CREATOR_CATEGORIES), 0.5))
+        }
+        vocab = {"country": COUNTRIES, "category": CREATOR_CATEGORIES}
+        return ColumnBlock("creators", format_ids("creators", count), numeric, codes, vocab)
+
+    def generate(self, products: int, shops: int, creators: int) -> Dict[str, ColumnBlock]:
+        """Generate all three entity kinds."""
+        product_block = self.products(products, shops)
+        return {
+            "products": product_block,
+            "shops": self.shops(shops, product_block),
+            "creators": self.creators(creators)
+        }
+
+
+def snapshot_fingerprint(seed: int, products: int, shops: int, creators: int) -> str:
+    """Identifier of the catalog produced by a seed and sizes."""
+    key = f"{SNAPSHOT_FORMAT}:{seed}:{products}:{shops}:{creators}"
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
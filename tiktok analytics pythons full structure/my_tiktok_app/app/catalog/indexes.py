@@ -0,0 +1,122 @@
+"""
+Secondary indexes over coded catalog columns.
+"""
+
+from typing import List, Dict, Optional, Sequence
+
+import numpy as np
+
+EMPTY_POSTING = np.zeros(0, dtype=np.int64)
+
+
+class PostingIndex:
+    """Inverted index mapping each value of a coded column to its row ids.
+
+    Posting lists are sorted ``int64`` arrays, so they can be intersected
+    cheaply and preserve the original row order when materialized.
+    """
+
+    def __init__(self, codes: np.ndarray, vocab: Dict[str, int]):
+        order = np.argsort(codes, kind="stable").astype(np.int64)
+        counts = np.bincount(codes, minlength=len(vocab))
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+
+        self.postings: Dict[str, np.ndarray] = {
+            term: order[bounds[code]:bounds[code + 1]]
+            for term, code in vocab.items()
+        }
+        self.folded: Dict[str, List[str]] = {}
+        for term in vocab:
+            self.folded.setdefault(term.lower(), []).append(term)
+
+    def get(self, value: str) -> np.ndarray:
+        """Row ids whose column value equals ``value`` exactly."""
+        return self.postings.get(value, EMPTY_POSTING)
+
+    def get_ignore_case(self, value: str) -> np.ndarray:
+        """Row ids whose column value equals ``value`` ignoring case."""
+        terms = self.folded.get(value.lower(), [])
+        if len(terms) == 1:
+            return self.postings[terms[0]]
+        posting = EMPTY_POSTING
+        for term in terms:
+            posting = np.union1d(posting, self.postings[term])
+        return posting
+
+    def add(self, value: str, row_id: int):
+        """Add ``row_id`` to the posting list of ``value``."""
+        posting = self.postings.get(value, EMPTY_POSTING)
+        position = np.searchsorted(posting, row_id)
+        self.postings[value] = np.insert(posting, position, row_id)
+        folded = self.folded.setdefault(value.lower(), [])
+        if value not in folded:
+            folded.append(value)
+
+    def remove(self, value: str, row_id: int):
+        """Remove ``row_id`` from the posting list of ``value``."""
+        posting = self.postings.get(value, EMPTY_POSTING)
+        position = np.searchsorted(posting, row_id)
+        if position < len(posting) and posting[position] == row_id:
+            self.postings[value] = np.delete(posting, position)
+
+
+class IdIndex:
+    """Position of each id in an id column, without a per-id dict.
+
+    Lookups binary-search the column through ``order``, the argsort of the
+    ids, which mapped snapshots store next to the id column so every worker
+    shares it. Ids appended after the index was built go to a small dict
+    overlay.
+    """
+
+    def __init__(self, ids: np.ndarray, order: Optional[np.ndarray] = None):
+        self.ids = ids
+        self.order = np.argsort(ids, kind="stable") if order is None else order
+        self._extra: Dict[str, int] = {}
+
+    def get(self, record_id: str, default: Optional[int] = None) -> Optional[int]:
+        """Position of ``record_id``, or ``default`` if unknown."""
+        position = self._extra.get(record_id)
+        if position is not None:
+            return position
+        if not isinstance(record_id, str) or not len(self.order):
+            return default
+        i = int(np.searchsorted(self.ids, record_id, sorter=self.order))
+        if i < len(self.order):
+            position = int(self.order[i])
+            if self.ids[position] == record_id:
+                return position
+        return default
+
+    def __getitem__(self, record_id: str) -> int:
+        position = self.get(record_id)
+        if position is None:
+            raise KeyError(record_id)
+        return position
+
+    def __setitem__(self, record_id: str, position: int):
+        """Register an id appended after the index was built."""
+        self._extra[record_id] = position
+
+    def __contains__(self, record_id: object) -> bool:
+        return self.get(record_id) is not None
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self._extra)
+
+
+def intersect_postings(postings: Sequence[np.ndarray]) -> Optional[np.ndarray]:
+    """Intersect sorted posting lists, smallest first.
+
+    Returns ``None`` when no posting lists are given, meaning "no filter".
+    """
+    if not postings:
+        return None
+
+    ordered = sorted(postings, key=len)
+    result = ordered[0]
+    for posting in ordered[1:]:
+        if not len(result):
+            break
+        result = np.intersect1d(result, posting, assume_unique=True)
+    return result
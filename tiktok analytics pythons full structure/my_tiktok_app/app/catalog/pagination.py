@@ -0,0 +1,52 @@
+"""
+Opaque cursors for keyset pagination of catalog listings.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded or does not match the query."""
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, record_id: str) -> str:
+    """Encode the ``(sort value, id)`` position of the last row served.
+
+    ``value`` is a number (timestamps as epoch microseconds) or ``None``
+    for a row without a value.
+    """
+    payload = {"s": sort_by, "o": sort_order, "v": value, "id": record_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, str]:
+    """Decode a cursor into its ``(sort value, id)`` position.
+
+    The cursor must have been issued for the same sort field and order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload: Dict[str, Any] = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, record_id = payload["v"], payload["id"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor(f"Malformed cursor: {e}")
+
+    if payload.get("s") != sort_by or payload.get("o") != sort_order:
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    if not (value is None or isinstance(value, (int, float))) or not isinstance(record_id, str):
+        raise InvalidCursor("Malformed cursor position")
+    return value, record_id
+
+
+def optional_cursor(
+    position: Optional[Tuple[Any, str]],
+    sort_by: str,
+    sort_order: str
+) -> Optional[str]:
+    """Encode ``position`` if there is one, else ``None``."""
+    if position is None:
+        return None
+    return encode_cursor(sort_by, sort_order, position[0], position[1])
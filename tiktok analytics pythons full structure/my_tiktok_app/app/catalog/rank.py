@@ -0,0 +1,102 @@
+"""
+Pre-sorted rank orders over numeric catalog columns.
+"""
+
+from typing import Any, Sequence
+
+import numpy as np
+
+
+def _insert(array: np.ndarray, position: int, value: Any) -> np.ndarray:
+    """``np.insert`` that widens the dtype instead of truncating ``value``."""
+    dtype = np.result_type(array, np.asarray(value))
+    return np.insert(array.astype(dtype, copy=False), position, value)
+
+
+class RankOrder:
+    """Row ids of a table kept sorted by ``(value, id)`` for one field.
+
+    Descending orders store negated keys, so both directions are walked
+    front to back and ties always resolve by ascending id. Single-row
+    changes are applied by moving one entry instead of re-sorting.
+    """
+
+    def __init__(self, values: np.ndarray, ids: np.ndarray, descending: bool):
+        self.descending = descending
+        keys = -values if descending else values
+        self.order = np.lexsort((ids, keys))
+        self.keys = keys[self.order]
+        self.ids = ids[self.order]
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _key(self, value: Any) -> Any:
+        return -value if self.descending else value
+
+    def _search(self, value: Any, record_id: str, side: str) -> int:
+        key = self._key(value)
+        lo = np.searchsorted(self.keys, key, side="left")
+        hi = np.searchsorted(self.keys, key, side="right")
+        return int(lo + np.searchsorted(self.ids[lo:hi], record_id, side=side))
+
+    def seek(self, value: Any, record_id: str) -> int:
+        """Position of the first entry strictly after ``(value, record_id)``."""
+        return self._search(value, record_id, side="right")
+
+    def insert(self, row_id: int, value: Any, record_id: str):
+        """Insert a row at its sorted position."""
+        position = self._search(value, record_id, side="left")
+        self.order = _insert(self.order, position, row_id)
+        self.keys = _insert(self.keys, position, self._key(value))
+        self.ids = _insert(self.ids, position, record_id)
+
+    def remove(self, row_id: int, value: Any, record_id: str):
+        """Remove a row previously inserted with ``value``."""
+        position = self._search(value, record_id, side="left")
+        if position >= len(self.order) or self.order[position] != row_id:
+            raise KeyError(f"Row {record_id} not found in rank order")
+        self.order = np.delete(self.order, position)
+        self.keys = np.delete(self.keys, position)
+        self.ids = np.delete(self.ids, position)
+
+    def update(self, row_id: int, old_value: Any, new_value: Any, record_id: str):
+        """Move a row after its value changed."""
+        self.remove(row_id, old_value, record_id)
+        self.insert(row_id, new_value, record_id)
+
+    def update_many(
+        self,
+        row_ids: Sequence[int],
+        old_values: Sequence[Any],
+        new_values: Sequence[Any],
+        record_ids: Sequence[str]
+    ):
+        """Move many rows at once: one delete and one insert pass over the arrays."""
+        old_positions = [
+            self._search(value, record_id, side="left")
+            for value, record_id in zip(old_values, record_ids)
+        ]
+        if any(
+            position >= len(self.order) or self.order[position] != row_id
+            for position, row_id in zip(old_positions, row_ids)
+        ):
+            raise KeyError("Rows not found in rank order")
+        order = np.delete(self.order, old_positions)
+        keys = np.delete(self.keys, old_positions)
+        ids = np.delete(self.ids, old_positions)
+
+        new_keys = np.asarray([self._key(value) for value in new_values])
+        record_ids = np.asarray(record_ids)
+        moved = np.lexsort((record_ids, new_keys))
+        new_keys, record_ids = new_keys[moved], record_ids[moved]
+        # Insertion points in the reduced arrays; equal points keep the sorted order
+        lo = np.searchsorted(keys, new_keys, side="left")
+        hi = np.searchsorted(keys, new_keys, side="right")
+        positions = [
+            int(start + np.searchsorted(ids[start:end], record_id, side="left"))
+            for start, end, record_id in zip(lo.tolist(), hi.tolist(), record_ids.tolist())
+        ]
+        self.order = np.insert(order, positions, np.asarray(row_ids)[moved])
+        self.keys = np.insert(keys.astype(np.result_type(keys, new_keys), copy=False), positions, new_keys)
+        self.ids = np.insert(ids.astype(np.result_type(ids, record_ids), copy=False), positions, record_ids)
@@ -0,0 +1,137 @@
+"""
+Compact slotted record types for catalog entities.
+"""
+
+from typing import Dict, Any, Iterator, Mapping, Tuple
+from collections.abc import Mapping as MappingABC
+from datetime import datetime, timedelta
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_microseconds(value: datetime) -> int:
+    """Microseconds since the epoch of a naive UTC datetime."""
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_microseconds(value: int) -> datetime:
+    """Naive UTC datetime of microseconds since the epoch."""
+    return _EPOCH + int(value) * _MICROSECOND
+
+
+class CatalogRecord(MappingABC):
+    """Read-only, ``__slots__``-backed catalog row.
+
+    Records behave like the dicts they replace (``row["id"]``, ``row.get``,
+    ``dict(row)``), so routers and indexes use them unchanged and they
+    serialize to the same JSON shape. Datetime fields are stored as integer
+    microseconds since the epoch and converted back on access, which avoids
+    one ``datetime`` object per row. ``_fragment`` caches the row's encoded
+    JSON once it has been served (see ``app.catalog.serialization``).
+    """
+
+    __slots__ = ("_fragment",)
+    _fields: Tuple[str, ...] = ()
+    _datetime_fields: Tuple[str, ...] = ()
+
+    def __init__(self, **values: Any):
+        missing = set(self._fields) - values.keys()
+        if missing:
+            raise TypeError(f"{type(self).__name__} missing fields: {sorted(missing)}")
+        for field in self._fields:
+            value = values[field]
+            if field in self._datetime_fields and isinstance(value, datetime):
+                value = to_microseconds(value)
+            object.__setattr__(self, field, value)
+        object.__setattr__(self, "_fragment", None)
+
+    @classmethod
+    def from_dict(cls, row: Mapping[str, Any]) -> "CatalogRecord":
+        """Build a record from a row dict with the same keys."""
+        if isinstance(row, cls):
+            return row
+        return cls(**{field: row[field] for field in cls._fields})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The row as a plain dict, in field order."""
+        return {field: self[field] for field in self._fields}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if key in self._datetime_fields and value is not None:
+            return from_microseconds(value)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __setattr__(self, key: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} records are read-only")
+
+    def __reduce__(self):
+        return (type(self).from_dict, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Product(CatalogRecord):
+    """A product row as served by ``/trending-products``."""
+
+    _fields = (
+        "id", "name", "shop_name", "shop_id", "price", "currency", "category",
+        "subcategory", "country", "sales_count", "views", "likes", "shares",
+        "comments", "conversion_rate", "trend_score", "image_url", "created_at"
+    )
+    _datetime_fields = ("created_at",)
+    __slots__ = _fields
+
+
+class Shop(CatalogRecord):
+    """A shop row as served by ``/shops``."""
+
+    _fields = (
+        "id", "name", "owner_name", "country", "category", "follower_count",
+        "product_count", "total_orders", "total_revenue", "avg_order_value",
+        "conversion_rate", "is_verified", "rating", "created_at"
+    )
+    _datetime_fields = ("created_at",)
+    __slots__ = _fields
+
+
+class Creator(CatalogRecord):
+    """A creator row as served by ``/creators``."""
+
+    _fields = (
+        "id", "username", "display_name", "country", "category", "follower_count",
+        "following_count", "video_count", "like_count", "avg_views", "avg_likes",
+        "avg_shares", "engagement_rate", "is_verified", "collaboration_price",
+        "created_at"
+    )
+    _datetime_fields = ("created_at",)
+    __slots__ = _fields
+
+
+class Category(CatalogRecord):
+    """A category row as served by ``/categories``."""
+
+    _fields = (
+        "id", "name", "description", "product_count", "avg_price",
+        "trending_score", "growth_rate", "image_url"
+    )
+    __slots__ = _fields
+
+
+# Record type per catalog kind
+RECORD_TYPES = {
+    "products": Product,
+    "shops": Shop,
+    "creators": Creator,
+    "categories": Category
+}
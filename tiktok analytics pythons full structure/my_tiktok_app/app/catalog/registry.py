@@ -0,0 +1,67 @@
+"""
+Id-keyed registry of catalog records shared by the API and page routes.
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+import logging
+
+from .columns import RecordSequence
+from .indexes import IdIndex
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogRegistry:
+    """Primary-key lookup for catalog records, grouped by entity kind.
+
+    Each kind is rebuilt as a whole on ``load`` and swapped in with a single
+    assignment, so readers never observe a half-built index after a reload.
+    """
+
+    def __init__(self):
+        # kind -> (position by id, records in registration order)
+        self._kinds: Dict[str, Tuple[Union[Dict[str, int], IdIndex], List[Dict[str, Any]]]] = {}
+
+    def load(self, kind: str, rows: Sequence[Dict[str, Any]]):
+        """Register (or replace) all records of ``kind``.
+
+        Record sequences over column blocks are kept lazy and looked up
+        through the block's id order, so no per-id dict is built.
+        """
+        if isinstance(rows, RecordSequence):
+            rows = rows.copy()
+            positions = rows.id_index()
+        else:
+            rows = list(rows)
+            positions = {row["id"]: i for i, row in enumerate(rows)}
+        self._kinds[kind] = (positions, rows)
+        logger.info(f"Registered {len(positions)} {kind} records")
+
+    def put(self, kind: str, row: Dict[str, Any]):
+        """Insert or replace a single record of ``kind``."""
+        positions, rows = self._kinds.setdefault(kind, ({}, []))
+        position = positions.get(row["id"])
+        if position is None:
+            rows.append(row)
+            positions[row["id"]] = len(rows) - 1
+        else:
+            rows[position] = row
+
+    def get(self, kind: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a single record by id, or ``None`` if unknown."""
+        positions, rows = self._kinds.get(kind, ({}, []))
+        position = positions.get(record_id)
+        return rows[position] if position is not None else None
+
+    def list(self, kind: str) -> Sequence[Dict[str, Any]]:
+        """All records of ``kind`` in registration order."""
+        _, rows = self._kinds.get(kind, ({}, []))
+        return rows
+
+    def count(self, kind: str) -> int:
+        """Number of records registered for ``kind``."""
+        return len(self.list(kind))
+
+
+# Global catalog registry instance
+catalog_registry = CatalogRegistry()
@@ -0,0 +1,453 @@
+"""
+SQL-backed catalog listings over the PostgreSQL schema.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from decimal import Decimal
+import logging
+
+import numpy as np
+from sqlalchemy import DateTime, Numeric, and_, cast, func, insert, null, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import ColumnElement, Select
+from sqlalchemy.sql.elements import Null
+
+from app.core import schema
+
+from .columns import ColumnBlock
+from .records import RECORD_TYPES, from_microseconds, to_microseconds
+
+logger = logging.getLogger(__name__)
+
+TREND_SALES_SCALE = 1000  # units sold at which the listing trend score is 75
+
+
+def _primary_image(images, owner_column: str, owner_id: ColumnElement) -> ColumnElement:
+    return (
+        select(images.c.image_url)
+        .where(images.c[owner_column] == owner_id, images.c.is_primary.is_(True))
+        .order_by(images.c.sort_order)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _trend_score(sold: ColumnElement) -> ColumnElement:
+    """Trend score of a product from its units sold, on the catalog's 50-100 scale.
+
+    Rises with sales and saturates below 100, like the generated scores
+    of the in-memory catalog, using only portable arithmetic.
+    """
+    sold = func.coalesce(sold, 0)
+    return func.round(cast(50 + 50.0 * sold / (sold + TREND_SALES_SCALE), Numeric(10, 4)), 2)
+
+
+def _listing_specs() -> Dict[str, Dict[str, Any]]:
+    """How each listing kind maps onto the schema.
+
+    ``columns`` gives the SQL expression behind every record field (``NULL``
+    where the schema has no equivalent), ``sort`` the indexed fields that
+    keyset pagination is offered on, and ``aliases`` computed sort fields
+    that are served by the ordering of a column they increase with. Any
+    other field with a column can still be sorted on with page offsets.
+    """
+    p, s, c = schema.products, schema.shops, schema.categories
+    creators = schema.creators
+    return {
+        "products": {
+            "table": p,
+            "key": p.c.product_id,
+            "from": p.outerjoin(s, p.c.shop_id == s.c.id).outerjoin(c, p.c.category_id == c.c.id),
+            "category": p.c.category_id,
+            "columns": {
+                "id": p.c.product_id,
+                "name": p.c.name,
+                "shop_name": s.c.name,
+                "shop_id": s.c.shop_id,
+                "price": p.c.price,
+                "currency": p.c.currency,
+                "category": c.c.name,
+                "subcategory": null(),
+                "country": s.c.country,
+                "sales_count": p.c.sold_quantity,
+                "views": p.c.views_count,
+                "likes": p.c.likes_count,
+                "shares": p.c.shares_count,
+                "comments": null(),
+                "conversion_rate": func.round(
+                    cast(1.0 * p.c.sold_quantity / func.nullif(p.c.views_count, 0), Numeric(10, 6)), 4
+                ),
+                "trend_score": _trend_score(p.c.sold_quantity),
+                "image_url": _primary_image(schema.product_images, "product_id", p.c.id),
+                "created_at": p.c.created_at
+            },
+            "search": (p.c.name, s.c.name),
+            "sort": ("sales_count", "views", "price", "likes", "shares", "created_at"),
+            # trend_score increases with units sold, so the indexed column
+            # gives the same order (equal scores stay in sales order)
+            "aliases": {"trend_score": "sales_count"}
+        },
+        "shops": {
+            "table": s,
+            "key": s.c.shop_id,
+            "from": s.outerjoin(c, s.c.category_id == c.c.id),
+            "category": s.c.category_id,
+            "columns": {
+                "id": s.c.shop_id,
+                "name": s.c.name,
+                "owner_name": null(),
+                "country": s.c.country,
+                "category": c.c.name,
+                "follower_count": s.c.followers_count,
+                "product_count": s.c.products_count,
+                "total_orders": s.c.total_sales,
+                "total_revenue": s.c.total_revenue,
+                "avg_order_value": func.round(s.c.total_revenue / func.nullif(s.c.total_sales, 0), 2),
+                "conversion_rate": null(),
+                "is_verified": s.c.is_verified,
+                "rating": s.c.rating,
+                "created_at": s.c.created_at
+            },
+            "search": (s.c.name,),
+            "sort": (
+                "total_revenue", "follower_count", "product_count", "total_orders", "rating", "created_at"
+            ),
+            "aliases": {}
+        },
+        "creators": {
+            "table": creators,
+            "key": creators.c.creator_id,
+            "from": creators.outerjoin(c, creators.c.category_id == c.c.id),
+            "category": creators.c.category_id,
+            "columns": {
+                "id": creators.c.creator_id,
+                "username": creators.c.username,
+                "display_name": creators.c.display_name,
+                "country": creators.c.country,
+                "category": c.c.name,
+                "follower_count": creators.c.followers_count,
+                "following_count": creators.c.following_count,
+                "video_count": creators.c.videos_count,
+                "like_count": creators.c.likes_count,
+                "avg_views": creators.c.avg_views_per_video,
+                "avg_likes": creators.c.avg_likes_per_video,
+                "avg_shares": null(),
+                "engagement_rate": creators.c.engagement_rate,
+                "is_verified": creators.c.is_verified,
+                "collaboration_price": null(),
+                "created_at": creators.c.created_at
+            },
+            "search": (creators.c.username, creators.c.display_name),
+            "sort": (
+                "follower_count", "engagement_rate", "following_count", "video_count", "like_count",
+                "avg_views", "avg_likes", "created_at"
+            ),
+            "aliases": {}
+        }
+    }
+
+
+class SQLCatalogTable:
+    """Listing queries for one catalog kind, run in the database.
+
+    Offers the same ``query``/``query_after``/``cursor_position`` interface
+    as ``ColumnarTable``, so the listing endpoints page through either one.
+    Filters, search, ordering and pagination are compiled into a single
+    statement plus a count: country is an equality on the ``country``
+    column, category a case-insensitive name match resolved to
+    ``category_id`` (so the ``idx_*_category_id`` indexes apply), search a
+    case-insensitive substring match, and pages use ``LIMIT``/``OFFSET`` or
+    a keyset predicate on ``(sort column, external id)``. Rows come back as
+    the same record types the in-memory store serves, ordered the same way:
+    by sort value, ties by ascending id, with ``NULL`` values last in both
+    directions. Cursor positions carry timestamps as epoch microseconds
+    (as the record columns store them) and ``NULL`` as ``None``.
+    """
+
+    def __init__(self, engine: Engine, kind: str, spec: Dict[str, Any]):
+        self.engine = engine
+        self.kind = kind
+        self.record_type = RECORD_TYPES[kind]
+        self._table = spec["table"]
+        self._key = spec["key"]
+        self._from = spec["from"]
+        self._category = spec["category"]
+        self._columns: Dict[str, ColumnElement] = spec["columns"]
+        self._search = spec["search"]
+        self._sort = spec["sort"]
+        self._aliases: Dict[str, str] = spec["aliases"]
+        self._select = select(*(
+            expression.label(field) for field, expression in self._columns.items()
+        )).select_from(self._from)
+
+    def _sort_field(self, sort_by: str) -> Optional[str]:
+        sort_by = self._aliases.get(sort_by, sort_by)
+        return sort_by if sort_by in self._sort else None
+
+    def _sort_column(self, sort_by: str) -> Optional[ColumnElement]:
+        """Expression ``sort_by`` is ordered on, ``None`` if the schema has no column for it."""
+        column = self._columns.get(self._aliases.get(sort_by, sort_by))
+        return None if column is None or isinstance(column, Null) else column
+
+    def _where(
+        self,
+        equals: Optional[Dict[str, str]],
+        iequals: Optional[Dict[str, str]],
+        search: Optional[str]
+    ) -> List[ColumnElement]:
+        clauses = []
+        for field, value in (equals or {}).items():
+            clauses.append(self._columns[field] == value)
+        for field, value in (iequals or {}).items():
+            if field == "category":
+                category_ids = select(schema.categories.c.id).where(
+                    func.lower(schema.categories.c.name) == value.lower()
+                )
+                clauses.append(self._category.in_(category_ids))
+            else:
+                clauses.append(func.lower(self._columns[field]) == value.lower())
+        if search:
+            term = search.lower()
+            clauses.append(or_(*(
+                func.lower(column).contains(term, autoescape=True) for column in self._search
+            )))
+        return clauses
+
+    def _ordered(self, statement: Select, sort_by: str, descending: bool) -> Select:
+        column = self._sort_column(sort_by)
+        if column is None:
+            # Every value is missing, and the in-memory table's stable sort
+            # then keeps insertion order in both directions
+            return statement.order_by(self._table.c.id)
+        direction = column.desc() if descending else column.asc()
+        return statement.order_by(direction.nulls_last(), self._key.asc())
+
+    def _count(self, clauses: List[ColumnElement]) -> int:
+        source = self._from if clauses else self._table
+        statement = select(func.count()).select_from(source).where(*clauses)
+        with self.engine.connect() as conn:
+            return conn.execute(statement).scalar_one()
+
+    def _page(
+        self,
+        clauses: List[ColumnElement],
+        sort_by: str,
+        descending: bool,
+        offset: int,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        # Pick the page's keys first and join the display columns (shop,
+        # category, primary image) onto those rows only
+        keys = select(self._table.c.id).select_from(self._from).where(*clauses)
+        keys = self._ordered(keys, sort_by, descending).offset(offset).limit(limit).subquery()
+        statement = self._ordered(
+            self._select.join(keys, keys.c.id == self._table.c.id), sort_by, descending
+        )
+        with self.engine.connect() as conn:
+            result = conn.execute(statement)
+            return [self._record(row) for row in result.mappings()]
+
+    def _record(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return self.record_type(**{
+            field: float(value) if isinstance(value, Decimal) else value
+            for field, value in row.items()
+        })
+
+    def records(self, row_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Records for internal row ids (e.g. from ranking tables), keyed by row id."""
+        if not row_ids:
+            return {}
+        statement = self._select.add_columns(self._table.c.id.label("_row_id")).where(
+            self._table.c.id.in_(row_ids)
+        )
+        with self.engine.connect() as conn:
+            rows = conn.execute(statement).mappings().all()
+        return {
+            row["_row_id"]: self._record({field: row[field] for field in self._columns})
+            for row in rows
+        }
+
+    def query(
+        self,
+        equals: Optional[Dict[str, str]] = None,
+        iequals: Optional[Dict[str, str]] = None,
+        search: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = True,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Filter, sort and page the table; returns the page and the match count."""
+        clauses = self._where(equals, iequals, search)
+        total_count = self._count(clauses)
+        if offset >= total_count:
+            return [], total_count
+        return self._page(clauses, sort_by, descending, offset, limit), total_count
+
+    def supports_cursor(self, sort_by: str) -> bool:
+        """Whether keyset pagination is available for ``sort_by``."""
+        return self._sort_field(sort_by) is not None
+
+    def cursor_position(self, row: Dict[str, Any], sort_by: str) -> Tuple[Any, str]:
+        """The ``(sort value, id)`` keyset position of ``row``."""
+        value = row[self._sort_field(sort_by)]
+        if isinstance(value, datetime):
+            value = to_microseconds(value)
+        return value, row["id"]
+
+    def query_after(
+        self,
+        equals: Optional[Dict[str, str]] = None,
+        iequals: Optional[Dict[str, str]] = None,
+        search: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = True,
+        after: Optional[Tuple[Any, str]] = None,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Keyset-paginated variant of ``query``.
+
+        The page starts right after the ``after`` position. Ties on the sort
+        value are broken by ascending id in both directions and ``NULL``
+        values come last, so the seek is spelled out as ``value beyond v OR
+        value IS NULL OR (value = v AND id > i)`` rather than a row-value
+        comparison; past a ``NULL`` position only ``NULL`` rows with a
+        greater id follow.
+        """
+        clauses = self._where(equals, iequals, search)
+        total_count = self._count(clauses)
+
+        if after is not None:
+            column = self._columns[self._sort_field(sort_by)]
+            value, key = after
+            if value is None:
+                clauses.append(and_(column.is_(None), self._key > key))
+            else:
+                if isinstance(column.type, DateTime):
+                    value = from_microseconds(value)
+                elif isinstance(column.type, Numeric) and isinstance(value, float):
+                    # Compare numeric columns against numerics, not doubles
+                    value = Decimal(str(value))
+                beyond = column < value if descending else column > value
+                clauses.append(or_(beyond, column.is_(None), and_(column == value, self._key > key)))
+        rows = self._page(clauses, sort_by, descending, 0, limit + 1)
+        return rows[:limit], total_count, len(rows) > limit
+
+
+class SQLCatalogRepository:
+    """SQL listing tables for products, shops and creators.
+
+    Exposes ``products``/``shops``/``creators`` attributes like
+    ``CatalogStore``, so listing code can take either as its source.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        for kind, spec in _listing_specs().items():
+            setattr(self, kind, SQLCatalogTable(engine, kind, spec))
+
+
+def _timestamps(column: np.ndarray) -> List[Any]:
+    return column.astype("datetime64[us]").tolist()
+
+
+def load_fixture(engine: Engine, blocks: Dict[str, ColumnBlock], batch_size: int = 10_000):
+    """Create the schema on ``engine`` and fill it from generated column blocks.
+
+    Meant for local databases (e.g. SQLite) used to exercise and benchmark
+    the SQL listings against the same seeded catalog the in-memory store
+    serves. Fields without a schema column are dropped; products take
+    their country from their shop, as they do in the schema.
+    """
+    schema.metadata.create_all(engine)
+    products, shops, creators = blocks["products"], blocks["shops"], blocks["creators"]
+
+    names = sorted({name for block in blocks.values() for name in block.vocab["category"]})
+    category_ids = {name: i for i, name in enumerate(names, start=1)}
+
+    def category_column(block: ColumnBlock) -> List[int]:
+        lookup = np.array([category_ids[name] for name in block.vocab["category"]])
+        return lookup[block.codes["category"]].tolist()
+
+    def country_column(block: ColumnBlock) -> List[str]:
+        return [block.vocab["country"][code] for code in block.codes["country"].tolist()]
+
+    def insert_rows(conn, table, columns: Dict[str, List[Any]], size: int):
+        fields = list(columns)
+        for start in range(0, size, batch_size):
+            stop = min(start + batch_size, size)
+            conn.execute(insert(table), [
+                dict(zip(fields, values))
+                for values in zip(*(columns[field][start:stop] for field in fields))
+            ])
+
+    with engine.begin() as conn:
+        conn.execute(insert(schema.categories), [
+            {"id": category_id, "name": name, "slug": name.lower().replace(" & ", "-").replace(" ", "-")}
+            for name, category_id in category_ids.items()
+        ])
+
+        numbers = range(1, shops.size + 1)
+        numeric = shops.numeric
+        insert_rows(conn, schema.shops, {
+            "id": list(numbers),
+            "shop_id": shops.ids.tolist(),
+            "name": [f"Amazing Shop {i}" for i in numbers],
+            "category_id": category_column(shops),
+            "country": country_column(shops),
+            "is_verified": numeric["is_verified"].tolist(),
+            "followers_count": numeric["follower_count"].tolist(),
+            "products_count": numeric["product_count"].tolist(),
+            "total_sales": numeric["total_orders"].tolist(),
+            "total_revenue": numeric["total_revenue"].tolist(),
+            "rating": numeric["rating"].tolist(),
+            "created_at": _timestamps(numeric["created_at"])
+        }, shops.size)
+
+        numbers = range(1, products.size + 1)
+        numeric = products.numeric
+        insert_rows(conn, schema.products, {
+            "id": list(numbers),
+            "product_id": products.ids.tolist(),
+            "shop_id": (products.codes["shop_id"].astype(np.int64) + 1).tolist(),
+            "name": [f"Amazing Product {i}" for i in numbers],
+            "category_id": category_column(products),
+            "price": numeric["price"].tolist(),
+            "currency": ["USD"] * products.size,
+            "sold_quantity": numeric["sales_count"].tolist(),
+            "views_count": numeric["views"].tolist(),
+            "likes_count": numeric["likes"].tolist(),
+            "shares_count": numeric["shares"].tolist(),
+            "created_at": _timestamps(numeric["created_at"])
+        }, products.size)
+        insert_rows(conn, schema.product_images, {
+            "product_id": list(numbers),
+            "image_url": [f"https://picsum.photos/300/300?random={i}" for i in range(products.size)],
+            "image_type": ["main"] * products.size,
+            "is_primary": [True] * products.size
+        }, products.size)
+
+        numbers = range(1, creators.size + 1)
+        numeric = creators.numeric
+        insert_rows(conn, schema.creators, {
+            "id": list(numbers),
+            "creator_id": creators.ids.tolist(),
+            "username": [f"creator{i}" for i in numbers],
+            "display_name": [f"Creator {i}" for i in numbers],
+            "category_id": category_column(creators),
+            "country": country_column(creators),
+            "is_verified": numeric["is_verified"].tolist(),
+            "followers_count": numeric["follower_count"].tolist(),
+            "following_count": numeric["following_count"].tolist(),
+            "videos_count": numeric["video_count"].tolist(),
+            "likes_count": numeric["like_count"].tolist(),
+            "engagement_rate": numeric["engagement_rate"].tolist(),
+            "avg_views_per_video": numeric["avg_views"].tolist(),
+            "avg_likes_per_video": numeric["avg_likes"].tolist(),
+            "created_at": _timestamps(numeric["created_at"])
+        }, creators.size)
+
+    logger.info(
+        f"Loaded catalog fixture: {products.size} products, {shops.size} shops, {creators.size} creators"
+    )
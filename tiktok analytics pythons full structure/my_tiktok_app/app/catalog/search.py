@@ -0,0 +1,112 @@
+"""
+Character n-gram search index for the catalog ``search`` parameter.
+"""
+
+from typing import List, Dict, Any, Optional, Iterable, Sequence, Set, Tuple
+import threading
+
+import numpy as np
+
+from .indexes import EMPTY_POSTING, intersect_postings
+
+
+class NGramIndex:
+    """Inverted index from character n-grams to row ids.
+
+    Every 1..``n``-gram of each lower-cased search field is indexed, so a
+    query of up to ``n`` characters is answered by a single posting list and
+    longer queries intersect their ``n``-grams and verify the few remaining
+    candidates with a substring check. Results are identical to
+    ``query.lower() in field.lower()`` on any of the fields.
+
+    Postings are built on the first search rather than at load, so workers
+    that never serve a search don't materialize every row for it. Until
+    then the index reads the row list it was loaded with, which the table
+    keeps updating in place.
+    """
+
+    def __init__(self, fields: Iterable[str], n: int = 3):
+        self.fields = tuple(fields)
+        self.n = n
+        self.texts: List[Tuple[str, ...]] = []
+        self.postings: Dict[str, np.ndarray] = {}
+        self._rows: Optional[Sequence[Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        """Whether the postings have been built."""
+        return self._rows is None
+
+    def _grams(self, texts: Tuple[str, ...]) -> Set[str]:
+        grams = set()
+        for text in texts:
+            for size in range(1, self.n + 1):
+                grams.update(text[i:i + size] for i in range(len(text) - size + 1))
+        return grams
+
+    def _texts(self, row: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(row.get(field, "")).lower() for field in self.fields)
+
+    def load(self, rows: Sequence[Dict[str, Any]]):
+        """Index ``rows``, a list of row dicts; postings are built on first search."""
+        with self._lock:
+            self.texts = []
+            self.postings = {}
+            self._rows = rows
+
+    def _build(self):
+        with self._lock:
+            if self._rows is None:
+                return
+            texts = [self._texts(row) for row in self._rows]
+            postings: Dict[str, List[int]] = {}
+            for row_id, row_texts in enumerate(texts):
+                for gram in self._grams(row_texts):
+                    postings.setdefault(gram, []).append(row_id)
+            self.texts = texts
+            self.postings = {
+                gram: np.asarray(ids, dtype=np.int64) for gram, ids in postings.items()
+            }
+            self._rows = None
+
+    def put(self, row_id: int, row: Dict[str, Any]):
+        """Index a new row or re-index a changed one."""
+        with self._lock:
+            if not self.built:
+                # Not built yet: the row list already holds the change
+                return
+            texts = self._texts(row)
+            if row_id < len(self.texts):
+                old_grams = self._grams(self.texts[row_id])
+                self.texts[row_id] = texts
+            else:
+                old_grams = set()
+                self.texts.append(texts)
+            new_grams = self._grams(texts)
+
+            for gram in old_grams - new_grams:
+                posting = self.postings[gram]
+                self.postings[gram] = np.delete(posting, np.searchsorted(posting, row_id))
+            for gram in new_grams - old_grams:
+                posting = self.postings.get(gram, EMPTY_POSTING)
+                self.postings[gram] = np.insert(posting, np.searchsorted(posting, row_id), row_id)
+
+    def search(self, query: str, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """Sorted row ids whose fields contain ``query``, within ``candidates``."""
+        if not self.built:
+            self._build()
+        query = query.lower()
+        if len(query) <= self.n:
+            hits = self.postings.get(query, EMPTY_POSTING)
+        else:
+            grams = {query[i:i + self.n] for i in range(len(query) - self.n + 1)}
+            hits = intersect_postings([self.postings.get(gram, EMPTY_POSTING) for gram in grams])
+            hits = np.asarray(
+                [i for i in hits if any(query in text for text in self.texts[i])],
+                dtype=np.int64
+            )
+
+        if candidates is not None:
+            hits = np.intersect1d(hits, candidates, assume_unique=True)
+        return hits
@@ -0,0 +1,69 @@
+"""
+Fast JSON serialization for catalog responses.
+"""
+
+from typing import Any
+from datetime import date, datetime
+import json
+
+from fastapi.responses import JSONResponse
+
+from .records import CatalogRecord
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, CatalogRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Same output settings as starlette's JSONResponse
+_encoder = json.JSONEncoder(
+    ensure_ascii=False,
+    allow_nan=False,
+    separators=(",", ":"),
+    default=_default
+)
+
+
+def encode_record(record: CatalogRecord) -> bytes:
+    """Encoded JSON for a record, computed once per record object.
+
+    Records are immutable and a changed row is upserted as a new record,
+    so the cached fragment can never go stale.
+    """
+    fragment = record._fragment
+    if fragment is None:
+        fragment = _encoder.encode(record.to_dict()).encode("utf-8")
+        object.__setattr__(record, "_fragment", fragment)
+    return fragment
+
+
+def encode(obj: Any) -> bytes:
+    """Encode ``obj`` to JSON, splicing in cached record fragments."""
+    if isinstance(obj, CatalogRecord):
+        return encode_record(obj)
+    if isinstance(obj, dict):
+        return b"{" + b",".join(
+            _encoder.encode(str(key)).encode("utf-8") + b":" + encode(value)
+            for key, value in obj.items()
+        ) + b"}"
+    if isinstance(obj, (list, tuple)):
+        return b"[" + b",".join(encode(item) for item in obj) + b"]"
+    return _encoder.encode(obj).encode("utf-8")
+
+
+class CatalogJSONResponse(JSONResponse):
+    """JSON response assembled from cached catalog record fragments.
+
+    Skips ``jsonable_encoder`` entirely: returning this response from a route
+    hands the content straight to ``render``. Already encoded ``bytes`` (e.g.
+    a cached body) are sent as-is.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return encode(content)
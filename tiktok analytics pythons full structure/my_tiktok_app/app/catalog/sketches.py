@@ -0,0 +1,303 @@
+"""
+Mergeable quantile sketches and histograms per catalog segment.
+"""
+
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
+from collections import Counter
+import math
+
+import numpy as np
+
+from .columns import ColumnBlock
+
+# Fields with distributions per kind
+DISTRIBUTION_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "products": ("price", "conversion_rate"),
+    "shops": ("conversion_rate", "follower_count"),
+    "creators": ("engagement_rate", "follower_count")
+}
+
+# Histogram bin edges per field; the last bin is open-ended
+HISTOGRAM_EDGES: Dict[str, Tuple[float, ...]] = {
+    "price": (0, 10, 25, 50, 100, 250, 500, 1000, 2500),
+    "conversion_rate": (0, 0.01, 0.02, 0.05, 0.1, 0.15, 0.2, 0.3),
+    "engagement_rate": (0, 0.01, 0.02, 0.05, 0.1, 0.15, 0.2, 0.3),
+    "follower_count": (0, 1e3, 1e4, 1e5, 1e6, 1e7)
+}
+
+RELATIVE_ACCURACY = 0.01
+
+_MIN_INDEXABLE = 1e-9  # magnitudes below this count as zero
+
+
+class QuantileSketch:
+    """Quantile sketch with a relative-error guarantee (DDSketch).
+
+    Values are counted in logarithmic buckets, so every quantile is
+    returned within ``relative_accuracy`` of a true value of that rank,
+    using a few hundred buckets for data spanning several orders of
+    magnitude. Two sketches with the same accuracy merge exactly by adding
+    bucket counts, and a value is removed by subtracting its count, which
+    is what lets catalog updates replace a row's old value.
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: Counter = Counter()
+        self.negative: Counter = Counter()
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def key(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def keys(self, magnitudes: np.ndarray) -> np.ndarray:
+        """Bucket keys of positive magnitudes, vectorized."""
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def _value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def _store(self, sign: int) -> Optional[Counter]:
+        return self.positive if sign > 0 else self.negative if sign < 0 else None
+
+    def add_counts(self, sign: int, keys: Iterable[int], counts: Iterable[int]):
+        """Add ``counts`` (negative to remove) to the buckets ``keys`` on one side of zero."""
+        store = self._store(sign)
+        for key, count in zip(keys, counts):
+            if store is None:
+                self.zeros += count
+            else:
+                store[key] += count
+                if store[key] <= 0:
+                    del store[key]
+            self.count += count
+
+    def add(self, value: float, weight: int = 1):
+        """Count ``value`` ``weight`` times (``weight=-1`` removes it)."""
+        sign = 0 if abs(value) < _MIN_INDEXABLE else (1 if value > 0 else -1)
+        self.add_counts(sign, [self.key(abs(value)) if sign else 0], [weight])
+        self.sum += weight * value
+
+    def merge(self, other: "QuantileSketch"):
+        """Fold ``other`` (same accuracy) into this sketch."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """Values at quantiles ``qs`` (0..1), ``None`` for an empty sketch."""
+        if self.count <= 0:
+            return [None] * len(qs)
+        # Buckets in ascending value order: negatives, zero, positives
+        buckets = [(-self._value(k), c) for k, c in sorted(self.negative.items(), reverse=True)]
+        if self.zeros:
+            buckets.append((0.0, self.zeros))
+        buckets += [(self._value(k), c) for k, c in sorted(self.positive.items())]
+
+        values = []
+        for q in qs:
+            rank, seen = q * (self.count - 1), 0
+            for value, count in buckets:
+                seen += count
+                if seen > rank:
+                    break
+            values.append(value)
+        return values
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": dict(self.positive),
+            "negative": dict(self.negative),
+            "zeros": self.zeros,
+            "count": self.count,
+            "sum": self.sum
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.positive.update({int(k): v for k, v in data["positive"].items()})
+        sketch.negative.update({int(k): v for k, v in data["negative"].items()})
+        sketch.zeros, sketch.count, sketch.sum = data["zeros"], data["count"], data["sum"]
+        return sketch
+
+
+class Histogram:
+    """Exact counts over fixed bins; mergeable and reversible like the sketch."""
+
+    def __init__(self, edges: Sequence[float]):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges), dtype=np.int64)
+
+    def bins(self, values: np.ndarray) -> np.ndarray:
+        """Bin of each value; values below the first edge go to the first bin."""
+        return np.clip(np.searchsorted(self.edges, values, side="right") - 1, 0, len(self.edges) - 1)
+
+    def add(self, value: float, weight: int = 1):
+        self.counts[self.bins(np.asarray([value]))[0]] += weight
+
+    def merge(self, other: "Histogram"):
+        self.counts += other.counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"edges": self.edges.tolist(), "counts": self.counts.tolist()}
+
+
+class CatalogDistributions:
+    """Sketches and histograms per (kind, category, country) and field.
+
+    Segments are keyed by lower-cased category and upper-cased country.
+    A question about a category, a country or the whole catalog merges
+    the matching segments, so the cost depends on the number of segments
+    and buckets, never on the number of rows.
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        # kind -> (category, country) -> field -> (sketch, histogram)
+        self.segments: Dict[str, Dict[Tuple[str, str], Dict[str, Tuple[QuantileSketch, Histogram]]]] = {
+            kind: {} for kind in DISTRIBUTION_FIELDS
+        }
+
+    def _segment(self, kind: str, category: Any, country: Any) -> Dict[str, Tuple[QuantileSketch, Histogram]]:
+        key = (str(category or "").lower(), str(country or "").upper())
+        segment = self.segments[kind].get(key)
+        if segment is None:
+            segment = self.segments[kind][key] = {
+                field: (QuantileSketch(self.relative_accuracy), Histogram(HISTOGRAM_EDGES[field]))
+                for field in DISTRIBUTION_FIELDS[kind]
+            }
+        return segment
+
+    def add(self, kind: str, row: Dict[str, Any], sign: int = 1):
+        """Account for one row (or remove it with ``sign=-1``)."""
+        if kind not in DISTRIBUTION_FIELDS:
+            return
+        segment = self._segment(kind, row.get("category"), row.get("country"))
+        for field, (sketch, histogram) in segment.items():
+            value = row.get(field)
+            if value is None:
+                continue
+            sketch.add(float(value), sign)
+            histogram.add(float(value), sign)
+
+    def add_block(self, kind: str, block: ColumnBlock):
+        """Account for a whole column block with one bucketing pass per field."""
+        if kind not in DISTRIBUTION_FIELDS or block.size == 0:
+            return
+        categories, countries = block.codes["category"], block.codes["country"]
+        group_count = len(block.vocab["country"])
+        groups = categories.astype(np.int64) * group_count + countries
+        segments = {
+            group: self._segment(kind, block.vocab["category"][group // group_count], block.vocab["country"][group % group_count])
+            for group in np.unique(groups).tolist()
+        }
+
+        for field in DISTRIBUTION_FIELDS[kind]:
+            values = np.asarray(block.numeric[field], dtype=np.float64)
+            prototype, histogram = QuantileSketch(self.relative_accuracy), Histogram(HISTOGRAM_EDGES[field])
+            signs = np.where(np.abs(values) < _MIN_INDEXABLE, 0, np.sign(values)).astype(np.int64)
+            keys = np.zeros(len(values), dtype=np.int64)
+            indexable = signs != 0
+            keys[indexable] = prototype.keys(np.abs(values[indexable]))
+
+            # Pack (group, sign, key) into one integer so a 1-d unique counts the buckets
+            lowest = int(keys.min())
+            span = int(keys.max()) - lowest + 1
+            packed, counts = np.unique((groups * 3 + signs + 1) * span + (keys - lowest), return_counts=True)
+            for value, count in zip(packed.tolist(), counts.tolist()):
+                group_sign, key = divmod(value, span)
+                group, sign = divmod(group_sign, 3)
+                segments[group][field][0].add_counts(sign - 1, [key + lowest], [count])
+            sums = np.bincount(groups, weights=values)
+
+            bins = histogram.bins(values)
+            bin_count = len(histogram.edges)
+            per_group = np.bincount(groups * bin_count + bins, minlength=(groups.max() + 1) * bin_count)
+            for group, segment in segments.items():
+                sketch, group_histogram = segment[field]
+                sketch.sum += float(sums[group])
+                group_histogram.counts += per_group[group * bin_count:(group + 1) * bin_count]
+
+    def merge(self, other: "CatalogDistributions"):
+        """Fold another worker's or partition's distributions into these."""
+        for kind, segments in other.segments.items():
+            for (category, country), fields in segments.items():
+                segment = self._segment(kind, category, country)
+                for field, (sketch, histogram) in fields.items():
+                    segment[field][0].merge(sketch)
+                    segment[field][1].merge(histogram)
+
+    def describe(
+        self,
+        kind: str,
+        field: str,
+        category: Optional[str] = None,
+        country: Optional[str] = None,
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99)
+    ) -> Dict[str, Any]:
+        """Count, mean, quantiles and histogram of ``field`` over the matching segments."""
+        category = category.lower() if category else None
+        country = country.upper() if country else None
+        sketch, histogram = QuantileSketch(self.relative_accuracy), Histogram(HISTOGRAM_EDGES[field])
+        segments = 0
+        for (segment_category, segment_country), fields in self.segments[kind].items():
+            if category is not None and segment_category != category:
+                continue
+            if country is not None and segment_country != country:
+                continue
+            sketch.merge(fields[field][0])
+            histogram.merge(fields[field][1])
+            segments += 1
+
+        return {
+            "kind": kind,
+            "field": field,
+            "category": category,
+            "country": country,
+            "count": sketch.count,
+            "mean": round(sketch.sum / sketch.count, 6) if sketch.count > 0 else None,
+            "quantiles": {
+                f"p{q * 100:g}": None if value is None else round(value, 6)
+                for q, value in zip(quantiles, sketch.quantiles(quantiles))
+            },
+            "histogram": histogram.to_dict(),
+            "relative_accuracy": self.relative_accuracy,
+            "segments": segments
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            kind: [
+                {
+                    "category": category,
+                    "country": country,
+                    "fields": {
+                        field: {"sketch": sketch.to_dict(), "histogram": histogram.counts.tolist()}
+                        for field, (sketch, histogram) in fields.items()
+                    }
+                }
+                for (category, country), fields in segments.items()
+            ]
+            for kind, segments in self.segments.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], relative_accuracy: float = RELATIVE_ACCURACY) -> "CatalogDistributions":
+        distributions = cls(relative_accuracy)
+        for kind, segments in data.items():
+            for entry in segments:
+                segment = distributions._segment(kind, entry["category"], entry["country"])
+                for field, state in entry["fields"].items():
+                    segment[field] = (QuantileSketch.from_dict(state["sketch"]), Histogram(HISTOGRAM_EDGES[field]))
+                    segment[field][1].counts += np.asarray(state["histogram"], dtype=np.int64)
+        return distributions
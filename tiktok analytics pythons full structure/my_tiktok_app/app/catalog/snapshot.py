@@ -0,0 +1,278 @@
+"""
+Memory-mapped binary catalog snapshots shared by all worker processes.
+"""
+
+from typing import Dict, Any, Iterator, Optional
+from contextlib import contextmanager
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from .columns import ColumnBlock
+from .generator import SNAPSHOT_FORMAT, CatalogGenerator, snapshot_fingerprint
+
+logger = logging.getLogger(__name__)
+
+CURRENT_POINTER = "CURRENT"
+MANIFEST = "manifest.json"
+PUBLISH_LOCK = ".publish.lock"
+
+# Snapshot layout, one directory per published version:
+#
+#   <root>/CURRENT                          name of the active version
+#   <root>/.publish.lock                    held while a worker generates one
+#   <root>/<version>/manifest.json          fingerprint, sizes, column names
+#   <root>/<version>/<kind>.id.npy          fixed-width id strings
+#   <root>/<version>/<kind>.id.order.npy    argsort of the ids, for lookups
+#   <root>/<version>/<kind>.<field>.npy     fixed-width numeric column
+#   <root>/<version>/<kind>.<field>.codes.npy    string column codes
+#   <root>/<version>/<kind>.<field>.strings.npy  string table for the codes
+#
+# ``.npy`` files are a small header followed by the raw array, so workers
+# map them read-only and share the same page-cache pages.
+
+
+def _write_block(directory: str, block: ColumnBlock) -> Dict[str, Any]:
+    np.save(os.path.join(directory, f"{block.kind}.id.npy"), block.ids)
+    np.save(os.path.join(directory, f"{block.kind}.id.order.npy"), block.id_order)
+    for field, column in block.numeric.items():
+        np.save(os.path.join(directory, f"{block.kind}.{field}.npy"), column)
+    for field, column in block.codes.items():
+        np.save(os.path.join(directory, f"{block.kind}.{field}.codes.npy"), column)
+        np.save(os.path.join(directory, f"{block.kind}.{field}.strings.npy"), np.asarray(block.vocab[field]))
+    return {"size": block.size, "numeric": list(block.numeric), "coded": list(block.codes)}
+
+
+def _read_block(directory: str, kind: str, spec: Dict[str, Any], mmap_mode: Optional[str]) -> ColumnBlock:
+    def column(name: str) -> np.ndarray:
+        return np.load(os.path.join(directory, f"{kind}.{name}.npy"), mmap_mode=mmap_mode)
+
+    return ColumnBlock(
+        kind,
+        ids=column("id"),
+        numeric={field: column(field) for field in spec["numeric"]},
+        codes={field: column(f"{field}.codes") for field in spec["coded"]},
+        vocab={field: column(f"{field}.strings").tolist() for field in spec["coded"]},
+        id_order=column("id.order")
+    )
+
+
+def current_version(root: str) -> Optional[str]:
+    """Name of the active snapshot version under ``root``, if any."""
+    try:
+        with open(os.path.join(root, CURRENT_POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_snapshot(root: str, blocks: Dict[str, ColumnBlock], fingerprint: str, keep: int = 2) -> str:
+    """Write ``blocks`` as the version named ``fingerprint`` and make it the active one.
+
+    The version is written to a staging directory, renamed into place and
+    only then published by atomically replacing the ``CURRENT`` pointer, so
+    readers see either the old or the new snapshot, never a partial one.
+    A version that already exists has the same contents and is reused.
+    Older versions beyond ``keep`` are removed; processes that still map
+    them keep their pages until they switch over.
+    """
+    os.makedirs(root, exist_ok=True)
+    version = fingerprint
+    directory = os.path.join(root, version)
+    if os.path.isdir(directory):
+        os.utime(directory)
+    else:
+        staging = tempfile.mkdtemp(dir=root, prefix=".staging-")
+        try:
+            manifest = {
+                "format": SNAPSHOT_FORMAT,
+                "fingerprint": fingerprint,
+                "kinds": {kind: _write_block(staging, block) for kind, block in blocks.items()}
+            }
+            with open(os.path.join(staging, MANIFEST), "w") as f:
+                json.dump(manifest, f)
+            os.rename(staging, directory)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    fd, pointer = tempfile.mkstemp(dir=root, prefix=".current-")
+    with os.fdopen(fd, "w") as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(root, CURRENT_POINTER))
+    logger.info(f"Published catalog snapshot {version} to {root}")
+
+    _prune(root, keep)
+    return version
+
+
+@contextmanager
+def publish_lock(
+    root: str,
+    timeout: float = 600.0,
+    stale_after: float = 3600.0,
+    poll: float = 0.1
+) -> Iterator[None]:
+    """Hold the lock file under ``root`` that serializes snapshot generation.
+
+    The file is created with ``O_EXCL``, so exactly one process holds it;
+    the others wait for it to go away. A lock older than ``stale_after``
+    was left behind by a crashed process and is broken. Raises
+    ``TimeoutError`` if the lock isn't acquired within ``timeout``.
+    """
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, PUBLISH_LOCK)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(path).st_mtime > stale_after:
+                    logger.warning(f"Breaking stale catalog snapshot lock {path}")
+                    os.unlink(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for catalog snapshot lock {path}")
+            time.sleep(poll)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        yield
+    finally:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _prune(root: str, keep: int):
+    active = current_version(root)
+    versions = sorted(
+        (entry for entry in os.scandir(root) if entry.is_dir() and not entry.name.startswith(".")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    for entry in versions[keep:]:
+        if entry.name != active:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def open_snapshot(root: str, version: Optional[str] = None, mmap_mode: Optional[str] = "r") -> Dict[str, Any]:
+    """Map a snapshot version (default: the active one) read-only.
+
+    Returns the version name, fingerprint and one ``ColumnBlock`` per kind
+    whose fixed-width columns are memory-mapped views of the files.
+    """
+    version = version or current_version(root)
+    if version is None:
+        raise FileNotFoundError(f"No catalog snapshot published under {root}")
+    directory = os.path.join(root, version)
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest["format"] != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported catalog snapshot format {manifest['format']}")
+    blocks = {
+        kind: _read_block(directory, kind, spec, mmap_mode)
+        for kind, spec in manifest["kinds"].items()
+    }
+    return {"version": version, "fingerprint": manifest["fingerprint"], "blocks": blocks}
+
+
+def _open_current(root: str, fingerprint: str, generate: bool) -> Optional[Dict[str, Any]]:
+    """The active snapshot if it is usable as is, else ``None``."""
+    try:
+        snapshot = open_snapshot(root)
+        if snapshot["fingerprint"] == fingerprint or not generate:
+            logger.info(f"Mapped catalog snapshot {snapshot['version']} from {root}")
+            return snapshot
+        logger.info(f"Catalog snapshot under {root} is stale, regenerating")
+    except FileNotFoundError:
+        if not generate:
+            raise
+    except Exception as e:
+        if not generate:
+            raise
+        logger.warning(f"Could not read catalog snapshot under {root}: {e}")
+    return None
+
+
+def load_or_generate(
+    root: str,
+    seed: int,
+    products: int,
+    shops: int,
+    creators: int,
+    generate: bool = True,
+    timeout: float = 600.0
+) -> Dict[str, Any]:
+    """Map the shared snapshot for these parameters, generating it if needed.
+
+    Every worker started with the same settings ends up mapping the same
+    files. Generation runs under ``publish_lock``, so on a cold start one
+    worker generates and publishes the snapshot while the others wait for
+    the lock and then map what it published. With ``generate=False`` the
+    active snapshot is used whatever its parameters (e.g. one published by
+    ``benchmarks/generate_catalog.py``).
+    """
+    fingerprint = snapshot_fingerprint(seed, products, shops, creators)
+    snapshot = _open_current(root, fingerprint, generate)
+    if snapshot is not None:
+        return snapshot
+
+    blocks = None
+    try:
+        with publish_lock(root, timeout=timeout):
+            # Another worker may have published it while this one waited
+            snapshot = _open_current(root, fingerprint, generate)
+            if snapshot is not None:
+                return snapshot
+            blocks = CatalogGenerator(seed).generate(products, shops, creators)
+            version = publish_snapshot(root, blocks, fingerprint)
+    except OSError as e:
+        logger.warning(f"Could not write catalog snapshot under {root}: {e}")
+        if blocks is None:
+            blocks = CatalogGenerator(seed).generate(products, shops, creators)
+        return {"version": fingerprint, "fingerprint": fingerprint, "blocks": blocks}
+    # Serve from the mapped files rather than this process's private copy
+    return open_snapshot(root, version)
+
+
+class SnapshotWatcher:
+    """Notices when another process publishes a new snapshot version.
+
+    ``poll()`` re-reads the ``CURRENT`` pointer at most every ``interval``
+    seconds and returns the new version exactly once per change, so only
+    one caller performs the reload.
+    """
+
+    def __init__(self, root: str, version: Optional[str] = None, interval: float = 5.0):
+        self.root = root
+        self.version = version
+        self.interval = interval
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+
+    def poll(self) -> Optional[str]:
+        """The newly published version, or ``None`` if unchanged."""
+        now = time.monotonic()
+        if now - self._checked < self.interval:
+            return None
+        with self._lock:
+            if now - self._checked < self.interval:
+                return None
+            self._checked = now
+            version = current_version(self.root)
+            if version is None or version == self.version:
+                return None
+            self.version = version
+            return version
@@ -0,0 +1,529 @@
+"""
+Columnar in-memory catalog store for the analytics listing endpoints.
+"""
+
+from typing import List, Dict, Any, Mapping, Optional, Iterable, Sequence, Tuple
+from collections import Counter
+import logging
+import time
+import uuid
+
+import numpy as np
+
+from .aggregates import CatalogAggregates
+from .columns import RecordSequence
+from .indexes import IdIndex, PostingIndex, intersect_postings
+from .pagination import InvalidCursor
+from .rank import RankOrder
+from .records import RECORD_TYPES
+from .registry import catalog_registry
+from .search import NGramIndex
+
+logger = logging.getLogger(__name__)
+
+
+def _read_only(column: np.ndarray) -> np.ndarray:
+    """Read-only view of a block column, so writes copy it instead."""
+    view = column.view()
+    view.flags.writeable = False
+    return view
+
+
+class ColumnarTable:
+    """Column-oriented view over a list of catalog rows.
+
+    Numeric fields are held as NumPy arrays, low-cardinality string fields
+    (country, category, ...) are interned into integer codes with a posting
+    index each, and the original row dicts are kept alongside so responses
+    keep their current shape. Sorted listings walk a maintained rank order
+    per field instead of sorting on every request.
+
+    Given a ``RecordSequence`` over a (memory-mapped) column block, the
+    block's ids, numeric and coded columns are used as they are, without
+    materializing rows; the first change to a block column copies it.
+    """
+
+    def __init__(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        coded_fields: Iterable[str] = ("country", "category"),
+        search_fields: Iterable[str] = ("name",),
+        rank_fields: Iterable[str] = ()
+    ):
+        self.coded_fields = tuple(coded_fields)
+        self.search_fields = tuple(search_fields)
+        self.rank_fields = tuple(rank_fields)
+        self.rows: List[Dict[str, Any]] = []
+        self.positions = IdIndex(np.zeros(0, dtype=str))
+        self.numeric: Dict[str, np.ndarray] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        self.vocab: Dict[str, Dict[str, int]] = {}
+        self.indexes: Dict[str, PostingIndex] = {}
+        self.ids: np.ndarray = np.zeros(0, dtype=str)
+        self.rank_orders: Dict[Tuple[str, bool], RankOrder] = {}
+        self.search_index = NGramIndex(self.search_fields)
+        self.load(rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def load(self, rows: Sequence[Dict[str, Any]]):
+        """(Re)build all columns from a list of row dicts or a record sequence."""
+        block = rows.block if isinstance(rows, RecordSequence) and not rows.modified else None
+        if block is not None:
+            self.rows = rows.copy()
+            self.ids = block.ids
+            self.positions = self.rows.id_index()
+        else:
+            self.rows = list(rows)
+            self.ids = np.asarray([row["id"] for row in self.rows], dtype=str)
+            self.positions = IdIndex(self.ids)
+        self.numeric = {}
+        self.codes = {}
+        self.vocab = {}
+        self.indexes = {}
+        self.rank_orders = {}
+        self.search_index.load(self.rows)
+
+        if not self.rows:
+            return
+
+        sample = self.rows[0]
+        for field, value in sample.items():
+            if field in self.coded_fields:
+                continue
+            if isinstance(value, (bool, int, float)):
+                if block is not None and field in block.numeric:
+                    column = _read_only(block.numeric[field])
+                else:
+                    column = np.asarray([row.get(field, 0) for row in self.rows])
+                if column.dtype == np.bool_:
+                    column = column.view(np.int8)
+                self.numeric[field] = column
+
+        for field in self.coded_fields:
+            if block is not None and field in block.codes:
+                vocab = {term: code for code, term in enumerate(block.vocab[field])}
+                self.codes[field] = _read_only(block.codes[field])
+            else:
+                vocab = {}
+                self.codes[field] = np.fromiter(
+                    (vocab.setdefault(row[field], len(vocab)) for row in self.rows),
+                    dtype=np.int32,
+                    count=len(self.rows)
+                )
+            self.vocab[field] = vocab
+            self.indexes[field] = PostingIndex(self.codes[field], vocab)
+
+        for field in self.rank_fields:
+            if field in self.numeric:
+                self.rank_order(field, descending=True)
+                self.rank_order(field, descending=False)
+
+        logger.info(
+            f"Loaded columnar table with {len(self.rows)} rows, "
+            f"{len(self.numeric)} numeric and {len(self.codes)} coded columns, "
+            f"{len(self.rank_orders)} rank orders"
+        )
+
+    def upsert(self, row: Dict[str, Any]):
+        """Insert a new row or replace the row with the same id.
+
+        Columns, posting lists, rank orders and the search index are updated
+        in place, so no index is rebuilt and no order is re-sorted.
+        """
+        if not self.rows:
+            self.load([row])
+            return
+
+        position = self.positions.get(row["id"])
+        if position is None:
+            self._append(row)
+        else:
+            self._replace(position, row)
+        self.search_index.put(self.positions[row["id"]], row)
+
+    def _append(self, row: Dict[str, Any]):
+        position = len(self.rows)
+        self.rows.append(row)
+        self.positions[row["id"]] = position
+        self.ids = np.append(self.ids, row["id"])
+
+        for field, column in self.numeric.items():
+            value = row.get(field, 0)
+            self.numeric[field] = np.append(column, value)
+            for descending in (True, False):
+                rank = self.rank_orders.get((field, descending))
+                if rank is not None:
+                    rank.insert(position, value, row["id"])
+
+        for field in self.coded_fields:
+            vocab = self.vocab[field]
+            code = vocab.setdefault(row[field], len(vocab))
+            self.codes[field] = np.append(self.codes[field], np.int32(code))
+            self.indexes[field].add(row[field], position)
+
+    def _replace(self, position: int, row: Dict[str, Any]):
+        old_row = self.rows[position]
+        self.rows[position] = row
+
+        for field, column in self.numeric.items():
+            old_value, value = column[position], row.get(field, 0)
+            if old_value == value:
+                continue
+            for descending in (True, False):
+                rank = self.rank_orders.get((field, descending))
+                if rank is not None:
+                    rank.update(position, old_value, value, row["id"])
+            dtype = np.result_type(column, np.asarray(value))
+            if dtype != column.dtype:
+                self.numeric[field] = column.astype(dtype)
+            self._writable(self.numeric, field)[position] = value
+
+        for field in self.coded_fields:
+            if old_row[field] == row[field]:
+                continue
+            vocab = self.vocab[field]
+            self._writable(self.codes, field)[position] = vocab.setdefault(row[field], len(vocab))
+            self.indexes[field].remove(old_row[field], position)
+            self.indexes[field].add(row[field], position)
+
+    def set_values(self, field: str, rows: Sequence[Dict[str, Any]]):
+        """Replace existing rows that differ from the current ones only in numeric ``field``.
+
+        The column is written in place and each rank order on the field
+        moves all changed rows in one pass instead of one row at a time.
+        """
+        positions = np.fromiter((self.positions[row["id"]] for row in rows), dtype=np.int64, count=len(rows))
+        column = self.numeric[field]
+        values = np.asarray([row.get(field, 0) for row in rows])
+        for descending in (True, False):
+            rank = self.rank_orders.get((field, descending))
+            if rank is not None:
+                rank.update_many(positions.tolist(), column[positions].tolist(), values.tolist(), [row["id"] for row in rows])
+        dtype = np.result_type(column, values)
+        if dtype != column.dtype:
+            self.numeric[field] = column.astype(dtype)
+        self._writable(self.numeric, field)[positions] = values
+        for position, row in zip(positions.tolist(), rows):
+            self.rows[position] = row
+
+    @staticmethod
+    def _writable(columns: Dict[str, np.ndarray], field: str) -> np.ndarray:
+        column = columns[field]
+        if not column.flags.writeable:
+            # Block columns are read-only (mapped, or shared with the
+            # block's cached records): copy on first write
+            column = columns[field] = column.copy()
+        return column
+
+    def rank_order(self, sort_by: str, descending: bool) -> RankOrder:
+        """Maintained ``(value, id)`` order for a numeric field.
+
+        Orders for ``rank_fields`` are built at load; any other numeric field
+        gets its order built on first use and maintained from then on.
+        """
+        rank = self.rank_orders.get((sort_by, descending))
+        if rank is None:
+            rank = RankOrder(self.numeric[sort_by], self.ids, descending)
+            self.rank_orders[(sort_by, descending)] = rank
+        return rank
+
+    def posting(self, field: str, value: str, ignore_case: bool = False) -> np.ndarray:
+        """Sorted row ids whose coded ``field`` equals ``value``."""
+        index = self.indexes.get(field)
+        if index is None:
+            return np.zeros(0, dtype=np.int64)
+        if ignore_case:
+            return index.get_ignore_case(value)
+        return index.get(value)
+
+    def rows_where(
+        self,
+        field: str,
+        value: str,
+        ignore_case: bool = False,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Rows whose coded ``field`` equals ``value``, in original row order."""
+        ids = self.posting(field, value, ignore_case=ignore_case)[:limit]
+        return [self.rows[i] for i in ids]
+
+    def filter_ids(
+        self,
+        equals: Optional[Dict[str, str]] = None,
+        iequals: Optional[Dict[str, str]] = None
+    ) -> Optional[np.ndarray]:
+        """Sorted row ids matching every equality filter, ``None`` if unfiltered."""
+        postings = [self.posting(field, value) for field, value in (equals or {}).items()]
+        postings += [
+            self.posting(field, value, ignore_case=True)
+            for field, value in (iequals or {}).items()
+        ]
+        return intersect_postings(postings)
+
+    def search_ids(self, candidates: Optional[np.ndarray], search: str) -> np.ndarray:
+        """Narrow ``candidates`` to rows whose search fields contain ``search``."""
+        return self.search_index.search(search, candidates)
+
+    def _candidates(
+        self,
+        equals: Optional[Dict[str, str]],
+        iequals: Optional[Dict[str, str]],
+        search: Optional[str]
+    ) -> Optional[np.ndarray]:
+        candidates = self.filter_ids(equals=equals, iequals=iequals)
+        if search:
+            candidates = self.search_ids(candidates, search)
+        return candidates
+
+    def query(
+        self,
+        equals: Optional[Dict[str, str]] = None,
+        iequals: Optional[Dict[str, str]] = None,
+        search: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = True,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Filter, sort and page the table.
+
+        Returns the rows for the requested page and the total number of
+        matching rows. Numeric fields are ordered by ``(value, id)``; other
+        fields fall back to a stable sort on ``row.get(sort_by, 0)``.
+        """
+        candidates = self._candidates(equals, iequals, search)
+        total_count = len(self.rows) if candidates is None else len(candidates)
+        if offset >= total_count:
+            return [], total_count
+
+        if sort_by not in self.numeric:
+            if candidates is None:
+                candidates = np.arange(len(self.rows), dtype=np.int64)
+            ordered = sorted(
+                candidates.tolist(),
+                key=lambda i: self.rows[i].get(sort_by, 0),
+                reverse=descending
+            )
+            return [self.rows[i] for i in ordered[offset:offset + limit]], total_count
+
+        rank = self.rank_order(sort_by, descending)
+        if candidates is None:
+            page = rank.order[offset:offset + limit]
+        elif (offset + limit) * len(self.rows) <= total_count * total_count:
+            # Expected walk length is below the candidate count: filter the
+            # maintained order instead of ranking the candidates.
+            page = self._walk(rank, candidates, 0, offset + limit)[offset:]
+        else:
+            page = self._top_k(candidates, sort_by, descending, offset + limit)[offset:]
+        return [self.rows[i] for i in page], total_count
+
+    def supports_cursor(self, sort_by: str) -> bool:
+        """Whether keyset pagination is available for ``sort_by``."""
+        return sort_by in self.numeric
+
+    def cursor_position(self, row: Dict[str, Any], sort_by: str) -> Tuple[Any, str]:
+        """The ``(sort value, id)`` keyset position of ``row``."""
+        return row[sort_by], row["id"]
+
+    def query_after(
+        self,
+        equals: Optional[Dict[str, str]] = None,
+        iequals: Optional[Dict[str, str]] = None,
+        search: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = True,
+        after: Optional[Tuple[Any, str]] = None,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Keyset-paginated variant of ``query``.
+
+        Rows are ordered by ``(sort value, id)`` and the page starts right
+        after the ``after`` position, seeking into the rank order instead of
+        counting an offset. Returns the page rows, the total number of
+        matching rows and whether more rows follow. Numeric columns hold no
+        ``NULL``s, so a position without a value is an ``InvalidCursor``.
+        """
+        if after is not None and after[0] is None:
+            raise InvalidCursor("Cursor position has no sort value")
+        candidates = self._candidates(equals, iequals, search)
+        total_count = len(self.rows) if candidates is None else len(candidates)
+
+        rank = self.rank_order(sort_by, descending)
+        start = 0 if after is None else rank.seek(after[0], after[1])
+        page = self._walk(rank, candidates, start, limit + 1)
+        return [self.rows[i] for i in page[:limit]], total_count, len(page) > limit
+
+    def _walk(
+        self,
+        rank: RankOrder,
+        candidates: Optional[np.ndarray],
+        start: int,
+        count: int
+    ) -> List[int]:
+        """First ``count`` candidate row ids in ``rank`` from ``start`` on."""
+        if candidates is None:
+            return rank.order[start:start + count].tolist()
+
+        member = np.zeros(len(self.rows), dtype=bool)
+        member[candidates] = True
+
+        # Stream through the order in growing chunks until enough rows match
+        found: List[int] = []
+        chunk = max(4 * count, 256)
+        while start < len(rank) and len(found) < count:
+            block = rank.order[start:start + chunk]
+            block = block[member[block]]
+            found.extend(block[:count - len(found)].tolist())
+            start += chunk
+            chunk *= 2
+        return found
+
+    def _top_k(self, candidates: np.ndarray, sort_by: str, descending: bool, k: int) -> np.ndarray:
+        """First ``k`` candidate row ids in ``(value, id)`` order, without a full sort."""
+        keys = self.numeric[sort_by][candidates]
+        if descending:
+            keys = -keys
+        ids = self.ids[candidates]
+
+        if k < len(candidates):
+            # argpartition picks an arbitrary subset of ties at the boundary;
+            # take everything strictly ahead of the k-th key, then fill with
+            # the lowest-id ties.
+            kth = keys[np.argpartition(keys, k - 1)[k - 1]]
+            ahead = np.flatnonzero(keys < kth)
+            ties = np.flatnonzero(keys == kth)
+            ties = ties[np.argsort(ids[ties], kind="stable")][:k - len(ahead)]
+            selected = np.concatenate([ahead, ties])
+        else:
+            selected = np.arange(len(candidates))
+
+        selected = selected[np.lexsort((ids[selected], keys[selected]))]
+        return candidates[selected]
+
+
+class CatalogStore:
+    """Columnar tables backing the products, shops and creators listings."""
+
+    # ColumnarTable options per kind
+    TABLES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+        "products": {
+            "coded_fields": ("country", "category", "shop_id"),
+            "search_fields": ("name", "shop_name"),
+            "rank_fields": ("trend_score", "sales_count", "views", "price")
+        },
+        "shops": {
+            "search_fields": ("name", "owner_name"),
+            "rank_fields": ("total_revenue", "follower_count")
+        },
+        "creators": {
+            "search_fields": ("username", "display_name"),
+            "rank_fields": ("follower_count", "engagement_rate")
+        }
+    }
+
+    def __init__(self):
+        self.products = self._new_table("products", [])
+        self.shops = self._new_table("shops", [])
+        self.creators = self._new_table("creators", [])
+        self.aggregates = CatalogAggregates()
+        # Bumped on every change so caches can key on the catalog state
+        self.versions: Counter = Counter()
+        self.generation = uuid.uuid4().hex[:12]
+        self.created_at = time.time()
+        self.modified_at: Dict[str, float] = {}
+
+    def load(
+        self,
+        products: Sequence[Dict[str, Any]],
+        shops: Sequence[Dict[str, Any]],
+        creators: Sequence[Dict[str, Any]],
+        categories: Sequence[Dict[str, Any]] = (),
+        generation: Optional[str] = None
+    ):
+        """Rebuild every table and the id registry from the given row lists.
+
+        New tables and totals are built first and then swapped in, so a
+        reload (e.g. onto a freshly published snapshot) never exposes a
+        half-built table to concurrent requests. ``generation`` identifies
+        the loaded dataset; workers that load the same snapshot pass the
+        same value so their state tokens agree.
+        """
+        tables = {
+            "products": self._new_table("products", products),
+            "shops": self._new_table("shops", shops),
+            "creators": self._new_table("creators", creators)
+        }
+        aggregates = CatalogAggregates()
+        aggregates.load(tables["products"].rows, tables["shops"].rows, tables["creators"].rows)
+
+        self.products, self.shops, self.creators = tables["products"], tables["shops"], tables["creators"]
+        self.aggregates = aggregates
+        if generation is not None:
+            self.generation = generation
+        for kind, table in tables.items():
+            catalog_registry.load(kind, table.rows)
+        catalog_registry.load("categories", categories)
+        for kind in ("products", "shops", "creators", "categories"):
+            self._touch(kind)
+
+    def _new_table(self, kind: str, rows: Sequence[Dict[str, Any]]) -> ColumnarTable:
+        return ColumnarTable(rows, **self.TABLES[kind])
+
+    def upsert(self, kind: str, row: Mapping[str, Any]):
+        """Insert or replace one product, shop or creator row."""
+        row = RECORD_TYPES[kind].from_dict(row)
+        table = getattr(self, kind)
+        position = table.positions.get(row["id"])
+        if position is None:
+            self.aggregates.add(kind, row)
+        else:
+            self.aggregates.update(kind, table.rows[position], row)
+        table.upsert(row)
+        catalog_registry.put(kind, row)
+        self._touch(kind)
+
+    def set_values(self, kind: str, field: str, values: Mapping[str, Any]) -> int:
+        """Set a numeric field of existing rows by id; returns how many rows changed.
+
+        Cheaper than one ``upsert`` per row for batch updates of one
+        column: rank orders move in one pass, the search index is left
+        alone and the version changes once. Unknown ids are ignored.
+        """
+        table = getattr(self, kind)
+        record_type = RECORD_TYPES[kind]
+        changed: Dict[str, Dict[str, Any]] = {}
+        for record_id, value in values.items():
+            position = table.positions.get(record_id)
+            if position is not None and table.rows[position][field] != value:
+                changed[record_id] = record_type.from_dict({**table.rows[position], field: value})
+        if not changed:
+            return 0
+        if field not in table.numeric:
+            raise ValueError(f"{field} is not a numeric {kind} field")
+
+        if self.aggregates.tracks(kind, field):
+            for record_id, row in changed.items():
+                self.aggregates.update(kind, table.rows[table.positions[record_id]], row)
+        table.set_values(field, list(changed.values()))
+        for row in changed.values():
+            catalog_registry.put(kind, row)
+        self._touch(kind)
+        return len(changed)
+
+    def _touch(self, kind: str):
+        self.versions[kind] += 1
+        self.modified_at[kind] = time.time()
+
+    def state_token(self, kinds: Iterable[str]) -> str:
+        """Opaque token that changes whenever any of ``kinds`` changes."""
+        return self.generation + "".join(f":{kind}{self.versions[kind]}" for kind in kinds)
+
+    def last_modified(self, kinds: Iterable[str]) -> float:
+        """Timestamp of the latest change to any of ``kinds``."""
+        return max([self.modified_at.get(kind, self.created_at) for kind in kinds], default=self.created_at)
+
+
+# Global catalog store instance
+catalog_store = CatalogStore()
@@ -0,0 +1,17 @@
+"""
+Per-response views over shared catalog records.
+"""
+
+from typing import Dict, Any, Mapping
+
+
+def overlay(record: Mapping[str, Any], **fields: Any) -> Dict[str, Any]:
+    """Return a response view of ``record`` with ``fields`` layered on top.
+
+    Catalog rows are shared by every request and by the store's indexes, so
+    they are treated as read-only; detail endpoints attach their extra
+    sections to this shallow per-response copy instead.
+    """
+    view = dict(record)
+    view.update(fields)
+    return view
@@ -1,25 +1,131 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, JSON, Float
+from sqlalchemy import create_engine, event, Column, Integer, String, DateTime, Boolean, Text, JSON, Float
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import func
+from typing import Dict, Any, AsyncIterator, Optional
+import threading
+import time
 import uuid
 from datetime import datetime
 from app.core.config import settings
 
-# Database engine
-engine = create_engine(settings.DATABASE_URL)
+# asyncio drivers used for each backend's async engine
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def async_url(url: str) -> URL:
+    """``url`` with its driver swapped for the backend's asyncio driver."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.drivername == driver:
+        return parsed
+    return parsed.set(drivername=driver)
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Connection pool settings for ``url`` (SQLite keeps its default pool)."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING
+    }
+
+class PoolMetrics:
+    """Connection pool counters for one engine, kept from pool events.
+
+    Tracks connections opened, checkouts, invalidations, how many
+    connections are checked out now and at peak, and how long they are
+    held per checkout. ``utilization`` is checked-out connections over
+    the pool's capacity (``pool_size + max_overflow``).
+    """
+
+    def __init__(self, engine: Engine, capacity: Optional[int] = None):
+        self.pool_class = type(engine.pool).__name__
+        self.capacity = capacity
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.held_seconds = 0.0
+        self._lock = threading.Lock()
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+        with self._lock:
+            self.checked_out -= 1
+            self.held_seconds += time.perf_counter() - started
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def report(self) -> Dict[str, Any]:
+        """Current pool counters."""
+        with self._lock:
+            returned = self.checkouts - self.checked_out
+            return {
+                "pool": self.pool_class,
+                "capacity": self.capacity,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "utilization": round(self.checked_out / self.capacity, 4) if self.capacity else None,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "invalidations": self.invalidations,
+                "avg_hold_ms": round(self.held_seconds / returned * 1000, 3) if returned else None
+            }
+
+def _capacity(url: str) -> Optional[int]:
+    options = engine_options(url)
+    return options["pool_size"] + max(options["max_overflow"], 0) if options else None
+
+# Database engines: the async one serves request handlers, the sync one
+# scripts and code that runs in worker threads
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(async_url(settings.DATABASE_URL), **engine_options(settings.DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Pool metrics per engine
+pool_metrics = {
+    "async": PoolMetrics(async_engine.sync_engine, _capacity(settings.DATABASE_URL)),
+    "sync": PoolMetrics(engine, _capacity(settings.DATABASE_URL))
+}
+
 # Base class for models
 Base = declarative_base()
 
 # Database dependency
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+def pool_report() -> Dict[str, Any]:
+    """Connection pool metrics of both engines."""
+    return {name: metrics.report() for name, metrics in pool_metrics.items()}
 
 # Models
 class User(Base):
@@ -60,4 +166,10 @@ class ChatMessage(Base):
 # Initialize database
 async def init_db():
     """Initialize database tables"""
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+async def close_db():
+    """Close every pooled connection"""
+    await async_engine.dispose()
+    engine.dispose() 
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Conditional request handling (ETag / Last-Modified) for catalog routes.
+"""
+
+from typing import Any, Callable, Optional, Sequence, Tuple
+from email.utils import formatdate, parsedate_to_datetime
+import hashlib
+import re
+
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.catalog.store import catalog_store
+from app.core.lazy import LazyProvider
+
+# (path pattern, catalog kinds the response depends on); first match wins.
+# ``None`` leaves the route alone; an empty tuple means the response only
+# changes on restart (template pages backed by static page data).
+CATALOG_ROUTE_KINDS: Sequence[Tuple[str, Optional[Tuple[str, ...]]]] = (
+    (r"/api/analytics/product/[^/]+/reviews$", None),
+    (r"/api/analytics/(trending-products|product/)", ("products",)),
+    (r"/api/analytics/(shops|shop/)", ("shops", "products")),
+    (r"/api/analytics/(creators|creator/)", ("creators",)),
+    (r"/api/analytics/(categories|category/)", ("categories", "products")),
+    (r"/api/analytics/stats/", ("products", "shops", "creators", "categories")),
+    (r"/(api|static|docs|redoc|openapi\.json|health)(/|$)", None),
+    (r"/", ()),
+)
+
+# Responses read from the database when CATALOG_BACKEND="database" (the
+# listings, and shop details with their sales analytics) change without
+# the catalog versions noticing; prepend this to leave them alone.
+DATABASE_ROUTES: Sequence[Tuple[str, Optional[Tuple[str, ...]]]] = (
+    (r"/api/analytics/(trending-products|shops|creators)$", None),
+    (r"/api/analytics/shop/[^/]+$", None),
+)
+
+
+def make_etag(request: Request, token: str) -> str:
+    """Weak ETag derived from the URL and the catalog state token."""
+    digest = hashlib.sha1(f"{request.url.path}?{request.url.query}|{token}".encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified_since(if_modified_since: str, last_modified: float) -> bool:
+    """Whether the resource is unchanged since an ``If-Modified-Since`` date."""
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(last_modified) <= since
+
+
+class CatalogETagMiddleware(BaseHTTPMiddleware):
+    """Adds catalog-version validators to GET routes and answers 304s early.
+
+    The ETag is computed from the catalog versions a route depends on, so a
+    matching ``If-None-Match`` is answered before the route runs any
+    filtering, sorting or templating. ``catalog`` is an optional lazy
+    provider that is loaded (off the event loop) before the first token is
+    computed, so validators always describe the loaded catalog. ``refresh``
+    (e.g. the route dependency that switches to a newly published
+    snapshot) runs off the event loop before every token, so a worker
+    doesn't answer 304 for a catalog it has not reloaded yet.
+    """
+
+    def __init__(
+        self,
+        app,
+        rules: Sequence[Tuple[str, Optional[Tuple[str, ...]]]] = CATALOG_ROUTE_KINDS,
+        max_age: int = 30,
+        catalog: Optional[LazyProvider] = None,
+        refresh: Optional[Callable[[], Any]] = None
+    ):
+        super().__init__(app)
+        self.rules = [(re.compile(pattern), kinds) for pattern, kinds in rules]
+        self.max_age = max_age
+        self.catalog = catalog
+        self.refresh = refresh
+
+    def _kinds(self, path: str) -> Optional[Tuple[str, ...]]:
+        for pattern, kinds in self.rules:
+            if pattern.match(path):
+                return kinds
+        return None
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method not in ("GET", "HEAD"):
+            return await call_next(request)
+
+        kinds = self._kinds(request.url.path)
+        if kinds is None:
+            return await call_next(request)
+
+        if kinds and self.catalog is not None and not self.catalog.ready:
+            await run_in_threadpool(self.catalog.get)
+        if kinds and self.refresh is not None:
+            await run_in_threadpool(self.refresh)
+
+        etag = make_etag(request, catalog_store.state_token(kinds))
+        last_modified = catalog_store.last_modified(kinds)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={self.max_age}, must-revalidate"
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_none_match is not None:
+            unchanged = etag_matches(if_none_match, etag)
+        else:
+            unchanged = if_modified_since is not None and not_modified_since(if_modified_since, last_modified)
+        if unchanged:
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
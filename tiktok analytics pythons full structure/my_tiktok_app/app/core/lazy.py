@@ -0,0 +1,131 @@
+"""
+Lazily initialized application components.
+"""
+
+from typing import List, Dict, Any, Optional, Callable, Iterable
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LazyProvider:
+    """Builds a component on first use instead of at import time.
+
+    ``get()`` runs the factory exactly once (concurrent callers wait for the
+    same build) and records how long it took. Attribute access is forwarded
+    to the built component, so a provider can stand in for the module-level
+    instance it replaces. A failed build is recorded and retried on the
+    next use.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._instance: Any = None
+        self._state = "pending"
+        self._seconds: Optional[float] = None
+        self._error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._state == "ready"
+
+    def get(self) -> Any:
+        """The component, building it if needed."""
+        if self._state == "ready":
+            return self._instance
+        with self._lock:
+            if self._state != "ready":
+                self._build()
+            return self._instance
+
+    def _build(self):
+        self._state = "initializing"
+        start = time.perf_counter()
+        try:
+            self._instance = self._factory()
+        except Exception as e:
+            self._seconds = time.perf_counter() - start
+            self._state = "failed"
+            self._error = str(e)
+            logger.error(f"Failed to initialize {self.name} after {self._seconds:.3f}s: {e}")
+            raise
+        self._seconds = time.perf_counter() - start
+        self._error = None
+        self._state = "ready"
+        logger.info(f"Initialized {self.name} in {self._seconds:.3f}s")
+
+    def warm(self) -> Optional[threading.Thread]:
+        """Build the component on a background thread."""
+        if self._state == "ready" or (self._thread is not None and self._thread.is_alive()):
+            return self._thread
+
+        def target():
+            try:
+                self.get()
+            except Exception:
+                pass  # already logged and recorded in the report
+
+        self._thread = threading.Thread(target=target, name=f"warm-{self.name}", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def report(self) -> Dict[str, Any]:
+        """State and initialization time of this component."""
+        return {
+            "state": self._state,
+            "seconds": round(self._seconds, 4) if self._seconds is not None else None,
+            "error": self._error
+        }
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes the provider itself doesn't define
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+
+class ProviderRegistry:
+    """Named lazy providers with background warm-up and a startup report."""
+
+    def __init__(self):
+        self._providers: Dict[str, LazyProvider] = {}
+        self.boot_seconds: Optional[float] = None
+
+    def register(self, name: str, factory: Callable[[], Any]) -> LazyProvider:
+        """Create (or return the existing) provider called ``name``."""
+        if name not in self._providers:
+            self._providers[name] = LazyProvider(name, factory)
+        return self._providers[name]
+
+    def get(self, name: str) -> LazyProvider:
+        return self._providers[name]
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> List[threading.Thread]:
+        """Start background builds for ``names`` (default: all providers)."""
+        names = self._providers if names is None else names
+        threads = []
+        for name in names:
+            provider = self._providers.get(name)
+            if provider is None:
+                logger.warning(f"Unknown component to warm: {name}")
+                continue
+            thread = provider.warm()
+            if thread is not None:
+                threads.append(thread)
+        return threads
+
+    def report(self) -> Dict[str, Any]:
+        """Boot time plus per-component state and initialization time."""
+        return {
+            "boot_seconds": round(self.boot_seconds, 4) if self.boot_seconds is not None else None,
+            "components": {name: provider.report() for name, provider in self._providers.items()}
+        }
+
+
+# Global provider registry instance
+providers = ProviderRegistry()
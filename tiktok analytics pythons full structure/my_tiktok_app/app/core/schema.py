@@ -0,0 +1,297 @@
+"""
+SQLAlchemy Core definitions of the catalog and analytics tables.
+
+Mirrors the relevant parts of ``database_schema.sql`` (columns, keys, index
+names and the monthly partitioning of the ``*_analytics`` tables), so
+queries built against these tables run on the production PostgreSQL schema
+and ``metadata.create_all`` can stand the same tables up in SQLite for
+local fixtures and benchmarks.
+"""
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Date, DateTime, ForeignKey, Index, Integer,
+    MetaData, Numeric, String, Table, Text, UniqueConstraint, func
+)
+
+metadata = MetaData()
+
+
+def _created_at() -> Column:
+    return Column("created_at", DateTime, server_default=func.current_timestamp())
+
+
+def _updated_at() -> Column:
+    return Column("updated_at", DateTime, server_default=func.current_timestamp())
+
+
+def _ranking(name: str, entity: str, parent: str) -> Table:
+    """Materialized per-category top lists of one entity kind."""
+    return Table(
+        name, metadata,
+        Column("id", Integer, primary_key=True),
+        Column(entity, Integer, ForeignKey(f"{parent}.id", ondelete="CASCADE")),
+        Column("category_id", Integer, ForeignKey("categories.id")),
+        Column("ranking_type", String(50), nullable=False),
+        Column("rank_position", Integer, nullable=False),
+        Column("score", Numeric(10, 4), default=0),
+        Column("date", Date, nullable=False),
+        _created_at(),
+        UniqueConstraint(entity, "ranking_type", "date"),
+        Index(f"idx_{name}_type_date", "ranking_type", "date", "category_id", "rank_position")
+    )
+
+
+def _rollup(name: str, entity: str, parent: str) -> Table:
+    """Weekly or monthly sums of a daily analytics table."""
+    return Table(
+        name, metadata,
+        Column(entity, Integer, ForeignKey(f"{parent}.id", ondelete="CASCADE"), primary_key=True),
+        Column("period_start", Date, primary_key=True),
+        Column("days", Integer, default=0),
+        Column("views", BigInteger, default=0),
+        Column("clicks", BigInteger, default=0),
+        Column("sales", BigInteger, default=0),
+        Column("revenue", Numeric(18, 2), default=0),
+        _updated_at()
+    )
+
+
+categories = Table(
+    "categories", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("slug", String(100), unique=True, nullable=False),
+    Column("description", Text),
+    Column("icon", String(50)),
+    Column("parent_category_id", Integer, ForeignKey("categories.id")),
+    Column("is_active", Boolean, default=True),
+    Column("sort_order", Integer, default=0),
+    _created_at(),
+    _updated_at()
+)
+
+shops = Table(
+    "shops", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("shop_id", String(100), unique=True, nullable=False),
+    Column("name", String(200), nullable=False),
+    Column("description", Text),
+    Column("category_id", Integer, ForeignKey("categories.id")),
+    Column("logo_url", String(500)),
+    Column("banner_url", String(500)),
+    Column("website_url", String(500)),
+    Column("location", String(200)),
+    Column("country", String(100)),
+    Column("is_verified", Boolean, default=False),
+    Column("is_active", Boolean, default=True),
+    Column("followers_count", Integer, default=0),
+    Column("products_count", Integer, default=0),
+    Column("total_sales", Integer, default=0),
+    Column("total_revenue", Numeric(15, 2), default=0),
+    Column("rating", Numeric(3, 2), default=0),
+    Column("review_count", Integer, default=0),
+    _created_at(),
+    _updated_at(),
+    Index("idx_shops_category_id", "category_id"),
+    Index("idx_shops_is_active", "is_active"),
+    Index("idx_shops_followers_count", "followers_count"),
+    Index("idx_shops_total_sales", "total_sales"),
+    Index("idx_shops_total_revenue", "total_revenue")
+)
+
+shop_images = Table(
+    "shop_images", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("shop_id", Integer, ForeignKey("shops.id", ondelete="CASCADE")),
+    Column("image_url", String(500), nullable=False),
+    Column("image_type", String(50), nullable=False),
+    Column("alt_text", String(200)),
+    Column("sort_order", Integer, default=0),
+    Column("is_primary", Boolean, default=False),
+    _created_at()
+)
+
+shop_analytics = Table(
+    "shop_analytics", metadata,
+    Column("shop_id", Integer, ForeignKey("shops.id", ondelete="CASCADE"), primary_key=True),
+    Column("date", Date, primary_key=True),
+    Column("views", Integer, default=0),
+    Column("clicks", Integer, default=0),
+    Column("sales", Integer, default=0),
+    Column("revenue", Numeric(15, 2), default=0),
+    Column("conversion_rate", Numeric(5, 4), default=0),
+    Column("avg_order_value", Numeric(10, 2), default=0),
+    Column("customer_acquisition_cost", Numeric(10, 2), default=0),
+    Column("return_on_ad_spend", Numeric(5, 2), default=0),
+    _created_at(),
+    postgresql_partition_by="RANGE (date)"
+)
+
+shop_analytics_weekly = _rollup("shop_analytics_weekly", "shop_id", "shops")
+shop_analytics_monthly = _rollup("shop_analytics_monthly", "shop_id", "shops")
+
+products = Table(
+    "products", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("product_id", String(100), unique=True, nullable=False),
+    Column("shop_id", Integer, ForeignKey("shops.id", ondelete="CASCADE")),
+    Column("name", String(300), nullable=False),
+    Column("description", Text),
+    Column("category_id", Integer, ForeignKey("categories.id")),
+    Column("price", Numeric(10, 2), nullable=False),
+    Column("original_price", Numeric(10, 2)),
+    Column("currency", String(3), default="USD"),
+    Column("sku", String(100)),
+    Column("brand", String(100)),
+    Column("is_active", Boolean, default=True),
+    Column("is_featured", Boolean, default=False),
+    Column("is_trending", Boolean, default=False),
+    Column("stock_quantity", Integer, default=0),
+    Column("sold_quantity", Integer, default=0),
+    Column("views_count", Integer, default=0),
+    Column("likes_count", Integer, default=0),
+    Column("shares_count", Integer, default=0),
+    Column("rating", Numeric(3, 2), default=0),
+    Column("review_count", Integer, default=0),
+    _created_at(),
+    _updated_at(),
+    Index("idx_products_shop_id", "shop_id"),
+    Index("idx_products_category_id", "category_id"),
+    Index("idx_products_price", "price"),
+    Index("idx_products_is_trending", "is_trending"),
+    Index("idx_products_views_count", "views_count"),
+    Index("idx_products_sold_quantity", "sold_quantity")
+)
+
+product_images = Table(
+    "product_images", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("product_id", Integer, ForeignKey("products.id", ondelete="CASCADE")),
+    Column("image_url", String(500), nullable=False),
+    Column("image_type", String(50), nullable=False),
+    Column("alt_text", String(200)),
+    Column("sort_order", Integer, default=0),
+    Column("is_primary", Boolean, default=False),
+    _created_at(),
+    Index("idx_product_images_product_id", "product_id")
+)
+
+product_analytics = Table(
+    "product_analytics", metadata,
+    Column("product_id", Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+    Column("date", Date, primary_key=True),
+    Column("views", Integer, default=0),
+    Column("clicks", Integer, default=0),
+    Column("sales", Integer, default=0),
+    Column("revenue", Numeric(15, 2), default=0),
+    Column("conversion_rate", Numeric(5, 4), default=0),
+    Column("avg_order_value", Numeric(10, 2), default=0),
+    _created_at(),
+    postgresql_partition_by="RANGE (date)"
+)
+
+product_analytics_weekly = _rollup("product_analytics_weekly", "product_id", "products")
+product_analytics_monthly = _rollup("product_analytics_monthly", "product_id", "products")
+
+creators = Table(
+    "creators", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("creator_id", String(100), unique=True, nullable=False),
+    Column("username", String(100), unique=True, nullable=False),
+    Column("display_name", String(200)),
+    Column("bio", Text),
+    Column("profile_image_url", String(500)),
+    Column("banner_image_url", String(500)),
+    Column("category_id", Integer, ForeignKey("categories.id")),
+    Column("location", String(200)),
+    Column("country", String(100)),
+    Column("language", String(50)),
+    Column("is_verified", Boolean, default=False),
+    Column("is_active", Boolean, default=True),
+    Column("followers_count", Integer, default=0),
+    Column("following_count", Integer, default=0),
+    Column("videos_count", Integer, default=0),
+    Column("likes_count", Integer, default=0),
+    Column("total_views", BigInteger, default=0),
+    Column("engagement_rate", Numeric(5, 4), default=0),
+    Column("avg_views_per_video", Integer, default=0),
+    Column("avg_likes_per_video", Integer, default=0),
+    _created_at(),
+    _updated_at(),
+    Index("idx_creators_category_id", "category_id"),
+    Index("idx_creators_followers_count", "followers_count"),
+    Index("idx_creators_engagement_rate", "engagement_rate")
+)
+
+creator_images = Table(
+    "creator_images", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("creator_id", Integer, ForeignKey("creators.id", ondelete="CASCADE")),
+    Column("image_url", String(500), nullable=False),
+    Column("image_type", String(50), nullable=False),
+    Column("alt_text", String(200)),
+    Column("sort_order", Integer, default=0),
+    Column("is_primary", Boolean, default=False),
+    _created_at()
+)
+
+creator_analytics = Table(
+    "creator_analytics", metadata,
+    Column("creator_id", Integer, ForeignKey("creators.id", ondelete="CASCADE"), primary_key=True),
+    Column("date", Date, primary_key=True),
+    Column("followers_gained", Integer, default=0),
+    Column("views", Integer, default=0),
+    Column("likes", Integer, default=0),
+    Column("comments", Integer, default=0),
+    Column("shares", Integer, default=0),
+    Column("engagement_rate", Numeric(5, 4), default=0),
+    _created_at(),
+    postgresql_partition_by="RANGE (date)"
+)
+
+videos = Table(
+    "videos", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("video_id", String(100), unique=True, nullable=False),
+    Column("creator_id", Integer, ForeignKey("creators.id", ondelete="CASCADE")),
+    Column("product_id", Integer, ForeignKey("products.id")),
+    Column("title", String(300)),
+    Column("description", Text),
+    Column("thumbnail_url", String(500)),
+    Column("video_url", String(500)),
+    Column("duration", Integer),
+    Column("category_id", Integer, ForeignKey("categories.id")),
+    Column("is_active", Boolean, default=True),
+    Column("is_featured", Boolean, default=False),
+    Column("is_trending", Boolean, default=False),
+    Column("views_count", Integer, default=0),
+    Column("likes_count", Integer, default=0),
+    Column("comments_count", Integer, default=0),
+    Column("shares_count", Integer, default=0),
+    Column("saves_count", Integer, default=0),
+    Column("engagement_rate", Numeric(5, 4), default=0),
+    _created_at(),
+    Column("published_at", DateTime),
+    Index("idx_videos_creator_id", "creator_id"),
+    Index("idx_videos_product_id", "product_id"),
+    Index("idx_videos_views_count", "views_count"),
+    Index("idx_videos_created_at", "created_at")
+)
+
+video_analytics = Table(
+    "video_analytics", metadata,
+    Column("video_id", Integer, ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True),
+    Column("date", Date, primary_key=True),
+    Column("views", Integer, default=0),
+    Column("likes", Integer, default=0),
+    Column("comments", Integer, default=0),
+    Column("shares", Integer, default=0),
+    Column("saves", Integer, default=0),
+    Column("engagement_rate", Numeric(5, 4), default=0),
+    _created_at(),
+    postgresql_partition_by="RANGE (date)"
+)
+
+product_rankings = _ranking("product_rankings", "product_id", "products")
+shop_rankings = _ranking("shop_rankings", "shop_id", "shops")
+creator_rankings = _ranking("creator_rankings", "creator_id", "creators")
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,10 +6,21 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import uvicorn
 from contextlib import asynccontextmanager
 import logging
+import time
+
+_BOOT_STARTED = time.perf_counter()
 
 from app.routers import analytics, rag_chat, auth
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import close_db, engine, init_db, pool_report
+from app.analytics.events import event_pipeline
+from app.analytics.ingest import ingest_metrics
+from app.analytics.rankings import ranking_job
+from app.analytics.trending import trend_tracker
+from app.core.http_cache import CATALOG_ROUTE_KINDS, DATABASE_ROUTES, CatalogETagMiddleware
+from app.core.lazy import providers
+from app.catalog.registry import catalog_registry
+from app.catalog.store import catalog_store
 from app.rag.vector_db import vector_db
 from app.rag.embeddings import embedding_manager
 from app.rag.scraper import tiktok_scraper
@@ -25,28 +36,38 @@ async def lifespan(app: FastAPI):
     logger.info("Starting TikTok Analytics + RAG Chatbot API...")
     await init_db()
     
-    # Initialize RAG components
-    logger.info("Initializing RAG components...")
-    try:
-        # Initialize vector database
-        vector_db._initialize_client()
-        logger.info("Vector database initialized successfully")
-        
-        # Initialize embeddings
-        logger.info("Embeddings manager initialized successfully")
-        
-        # Initialize scraper
-        logger.info("TikTok scraper initialized successfully")
-        
-    except Exception as e:
-        logger.error(f"Error initializing RAG components: {e}")
-    
-    logger.info("Database and RAG components initialized successfully")
+    # Heavy components (catalog, vector DB, embeddings, scraper) build on
+    # first use; warm the configured ones in the background so the worker
+    # is ready to serve immediately
+    providers.warm(settings.STARTUP_WARM_COMPONENTS)
+    if settings.RANKING_REFRESH_SECONDS > 0:
+        ranking_job.start(engine, settings.RANKING_REFRESH_SECONDS)
+    # Trend scores are kept in this worker's memory, so with several
+    # workers each would publish different scores under the same ETag
+    streaming_trends = settings.CATALOG_BACKEND == "memory" and settings.WEB_CONCURRENCY == 1
+    if settings.CATALOG_BACKEND == "memory" and not streaming_trends:
+        logger.warning(
+            f"Streaming trend scores are off with WEB_CONCURRENCY={settings.WEB_CONCURRENCY}; "
+            "events are only written to the analytics tables"
+        )
+    if settings.TRENDING_PUBLISH_SECONDS > 0 and streaming_trends:
+        trend_tracker.start(catalog_store, settings.TRENDING_PUBLISH_SECONDS)
+    event_pipeline.start(
+        engine if settings.EVENTS_WRITE_ANALYTICS else None,
+        catalog_store if streaming_trends else None,
+        settings.EVENTS_FLUSH_SECONDS
+    )
+    providers.boot_seconds = time.perf_counter() - _BOOT_STARTED
+    logger.info(f"Application ready in {providers.boot_seconds:.3f}s")
     
     yield
     
     # Shutdown
     logger.info("Shutting down TikTok Analytics + RAG Chatbot API...")
+    ranking_job.stop()
+    event_pipeline.stop()
+    trend_tracker.stop()
+    await close_db()
 
 def create_app() -> FastAPI:
     """Create and configure FastAPI application"""
@@ -60,6 +81,19 @@ def create_app() -> FastAPI:
         lifespan=lifespan
     )
     
+    # Conditional requests for catalog API routes and pages (added first so
+    # it runs innermost and 304s still pass through CORS)
+    etag_rules = CATALOG_ROUTE_KINDS
+    if settings.CATALOG_BACKEND == "database":
+        etag_rules = tuple(DATABASE_ROUTES) + tuple(CATALOG_ROUTE_KINDS)
+    app.add_middleware(
+        CatalogETagMiddleware,
+        rules=etag_rules,
+        max_age=settings.HTTP_CACHE_MAX_AGE,
+        catalog=analytics.catalog_provider,
+        refresh=analytics.require_catalog
+    )
+    
     # Security middleware
     app.add_middleware(
         TrustedHostMiddleware,
@@ -82,7 +116,12 @@ def create_app() -> FastAPI:
     templates = Jinja2Templates(directory="app/templates")
     
     # Include routers
-    app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+    app.include_router(
+        analytics.router,
+        prefix="/api/analytics",
+        tags=["analytics"],
+        dependencies=[Depends(analytics.require_catalog)]
+    )
     app.include_router(rag_chat.router, prefix="/api/chat", tags=["chat"])
     app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
     
@@ -149,6 +188,12 @@ def create_app() -> FastAPI:
             {"id": "3", "name": "BeautyGuru", "followers": "3.2M", "videos": "189", "engagement": "9.1"}
         ]
     
+    # Page datasets, registered once so detail routes do an id lookup
+    catalog_registry.load("page_products", get_dummy_products())
+    catalog_registry.load("page_shops", get_dummy_shops())
+    catalog_registry.load("page_creators", get_dummy_creators())
+    catalog_registry.load("page_categories", get_dummy_categories())
+    
     # Root route
     @app.get("/")
     async def root(request: Request):
@@ -167,7 +212,7 @@ def create_app() -> FastAPI:
             "trending_products": get_dummy_trending_products(),
             "top_shops": get_dummy_top_shops(),
             "popular_creators": get_dummy_popular_creators(),
-            "categories": get_dummy_categories()
+            "categories": catalog_registry.list("page_categories")
         })
     
     # Products page
@@ -175,15 +220,15 @@ def create_app() -> FastAPI:
     async def products(request: Request):
         return templates.TemplateResponse("products.html", {
             "request": request,
-            "products": get_dummy_products()
+            "products": catalog_registry.list("page_products")
         })
     
     # Product detail page
     @app.get("/product/{product_id}")
     async def product_detail(request: Request, product_id: str):
         # Find product by ID (in real app, this would be from database)
-        products = get_dummy_products()
-        product = next((p for p in products if p["id"] == product_id), products[0])
+        products = catalog_registry.list("page_products")
+        product = catalog_registry.get("page_products", product_id) or products[0]
         related_products = products[:4]  # First 4 as related
         
         return templates.TemplateResponse("product_detail.html", {
@@ -197,16 +242,16 @@ def create_app() -> FastAPI:
     async def shops(request: Request):
         return templates.TemplateResponse("shops.html", {
             "request": request,
-            "shops": get_dummy_shops()
+            "shops": catalog_registry.list("page_shops")
         })
     
     # Shop detail page
     @app.get("/shop/{shop_id}")
     async def shop_detail(request: Request, shop_id: str):
         # Find shop by ID (in real app, this would be from database)
-        shops = get_dummy_shops()
-        shop = next((s for s in shops if s["id"] == shop_id), shops[0])
-        shop_products = get_dummy_products()[:4]  # First 4 as shop products
+        shops = catalog_registry.list("page_shops")
+        shop = catalog_registry.get("page_shops", shop_id) or shops[0]
+        shop_products = catalog_registry.list("page_products")[:4]  # First 4 as shop products
         
         return templates.TemplateResponse("shop_detail.html", {
             "request": request,
@@ -219,15 +264,15 @@ def create_app() -> FastAPI:
     async def creators(request: Request):
         return templates.TemplateResponse("creators.html", {
             "request": request,
-            "creators": get_dummy_creators()
+            "creators": catalog_registry.list("page_creators")
         })
     
     # Creator detail page
     @app.get("/creator/{creator_id}")
     async def creator_detail(request: Request, creator_id: str):
         # Find creator by ID (in real app, this would be from database)
-        creators = get_dummy_creators()
-        creator = next((c for c in creators if c["id"] == creator_id), creators[0])
+        creators = catalog_registry.list("page_creators")
+        creator = catalog_registry.get("page_creators", creator_id) or creators[0]
         creator_videos = [
             {"title": "Latest Tech Review", "views": "45K", "likes": "2.3K", "comments": "156"},
             {"title": "Unboxing New Gadget", "views": "32K", "likes": "1.8K", "comments": "89"},
@@ -246,17 +291,17 @@ def create_app() -> FastAPI:
     async def categories(request: Request):
         return templates.TemplateResponse("categories.html", {
             "request": request,
-            "categories": get_dummy_categories()
+            "categories": catalog_registry.list("page_categories")
         })
     
     # Category detail page
     @app.get("/category/{category_id}")
     async def category_detail(request: Request, category_id: str):
         # Find category by ID (in real app, this would be from database)
-        categories = get_dummy_categories()
-        category = next((c for c in categories if c["id"] == category_id), categories[0])
-        category_products = get_dummy_products()[:4]  # First 4 as category products
-        category_shops = get_dummy_shops()[:3]  # First 3 as category shops
+        categories = catalog_registry.list("page_categories")
+        category = catalog_registry.get("page_categories", category_id) or categories[0]
+        category_products = catalog_registry.list("page_products")[:4]  # First 4 as category products
+        category_shops = catalog_registry.list("page_shops")[:3]  # First 3 as category shops
         
         return templates.TemplateResponse("category_detail.html", {
             "request": request,
@@ -305,6 +350,36 @@ def create_app() -> FastAPI:
     async def health_check():
         return {"status": "healthy", "service": "TikTok Analytics + RAG Chatbot"}
     
+    # Startup report: boot time and per-component initialization
+    @app.get("/health/startup")
+    async def startup_report():
+        return providers.report()
+    
+    # Connection pool utilization per database engine
+    @app.get("/health/database")
+    async def database_report():
+        return pool_report()
+    
+    # Bulk analytics ingestion throughput
+    @app.get("/health/ingest")
+    async def ingest_report():
+        return ingest_metrics.report()
+    
+    # Ranking job schedule and last run
+    @app.get("/health/rankings")
+    async def rankings_report():
+        return ranking_job.report()
+    
+    # Event ingestion rate, flush latency and buffer fill
+    @app.get("/health/events")
+    async def events_report():
+        return event_pipeline.report()
+    
+    # Streaming trend tracker state and last publish
+    @app.get("/health/trending")
+    async def trending_report():
+        return trend_tracker.report()
+    
     return app
 
 app = create_app()
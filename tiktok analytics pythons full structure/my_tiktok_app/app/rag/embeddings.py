@@ -2,14 +2,16 @@
 Embeddings module for RAG system.
 """
 
-from typing import List, Dict, Any, Optional
-from langchain.embeddings import HuggingFaceEmbeddings, OpenAIEmbeddings
-from langchain.schema import Document
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 import numpy as np
 import logging
 import json
 
 from ..core.config import settings
+from ..core.lazy import providers
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,9 @@ class EmbeddingManager:
     def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
         self.model_name = model_name
         
+        # Imported here so that importing this module stays cheap
+        from langchain.embeddings import HuggingFaceEmbeddings, OpenAIEmbeddings
+        
         # Initialize embeddings model
         if settings.OPENAI_API_KEY:
             self.embeddings = OpenAIEmbeddings(
@@ -50,7 +55,7 @@ class EmbeddingManager:
             logger.error(f"Error embedding documents: {e}")
             return []
     
-    def embed_langchain_documents(self, documents: List[Document]) -> List[List[float]]:
+    def embed_langchain_documents(self, documents: List["Document"]) -> List[List[float]]:
         """Embed LangChain documents."""
         texts = [doc.page_content for doc in documents]
         return self.embed_documents(texts)
@@ -58,9 +63,9 @@ class EmbeddingManager:
     def similarity_search(
         self,
         query: str,
-        documents: List[Document],
+        documents: List["Document"],
         k: int = 5
-    ) -> List[Document]:
+    ) -> List["Document"]:
         """Find most similar documents to query."""
         try:
             # Get query embedding
@@ -128,5 +133,5 @@ class EmbeddingManager:
         return all_embeddings
 
 
-# Global embedding manager instance
-embedding_manager = EmbeddingManager() 
\ No newline at end of file
+# Global embedding manager instance (built on first use)
+embedding_manager = providers.register("embeddings", EmbeddingManager) 
\ No newline at end of file
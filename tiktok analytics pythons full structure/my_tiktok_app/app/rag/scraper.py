@@ -6,11 +6,13 @@ from typing import List, Dict, Any, Optional
 import requests
 import json
 import logging
-from datetime import datetime
+from datetime import date, datetime
 import time
 import random
 
+from ..analytics.timeseries import parse_date_range, timeseries_repository
 from ..core.config import settings
+from ..core.lazy import providers
 
 logger = logging.getLogger(__name__)
 
@@ -187,30 +189,40 @@ class TikTokShopScraper:
             return []
     
     def scrape_analytics_data(self, shop_id: str, date_range: str = "30d") -> Optional[Dict[str, Any]]:
-        """Scrape analytics data for a shop."""
+        """Summarize a shop's analytics over ``date_range`` against the period before it."""
         try:
-            # Simulate analytics data
+            comparison = timeseries_repository.compare("shops", shop_id, parse_date_range(date_range))
+            if comparison is None:
+                logger.warning(f"No analytics for unknown shop: {shop_id}")
+                return None
+            current, changes = comparison["current"], comparison["growth"]
+            
+            def percent(change):
+                return None if change is None else round(change * 100, 1)
+            
             analytics_data = {
                 "shop_id": shop_id,
                 "period": date_range,
+                "start": comparison["start"],
+                "end": comparison["end"],
                 "metrics": {
-                    "total_sales": 12345,
-                    "total_revenue": 234567,
-                    "conversion_rate": 3.2,
-                    "average_order_value": 19.99,
-                    "customer_acquisition_cost": 5.50,
-                    "return_on_ad_spend": 4.2
+                    "total_sales": current["sales"],
+                    "total_revenue": current["revenue"],
+                    "conversion_rate": round(current["conversion_rate"] * 100, 2),
+                    "average_order_value": current["avg_order_value"],
+                    "customer_acquisition_cost": current["customer_acquisition_cost"],
+                    "return_on_ad_spend": current["return_on_ad_spend"]
                 },
                 "trends": {
-                    "sales_growth": 15.5,
-                    "revenue_growth": 12.8,
-                    "customer_growth": 8.3
+                    "sales_growth": percent(changes["sales"]),
+                    "revenue_growth": percent(changes["revenue"]),
+                    "traffic_growth": percent(changes["views"])
                 },
-                "top_products": [
-                    {"name": "Product A", "sales": 234, "revenue": 4680},
-                    {"name": "Product B", "sales": 189, "revenue": 3780},
-                    {"name": "Product C", "sales": 156, "revenue": 3120}
-                ]
+                "top_products": timeseries_repository.top_products(
+                    shop_id,
+                    date.fromisoformat(comparison["start"]),
+                    date.fromisoformat(comparison["end"])
+                )
             }
             
             logger.info(f"Scraped analytics data for shop: {shop_id}")
@@ -221,5 +233,5 @@ class TikTokShopScraper:
             return None
 
 
-# Global scraper instance
-tiktok_scraper = TikTokShopScraper() 
\ No newline at end of file
+# Global scraper instance (built on first use)
+tiktok_scraper = providers.register("scraper", TikTokShopScraper) 
\ No newline at end of file
@@ -3,13 +3,12 @@ Vector database module for RAG system.
 """
 
 from typing import List, Dict, Any, Optional
-import chromadb
-from chromadb.config import Settings
 import logging
 import json
 import os
 
 from ..core.config import settings
+from ..core.lazy import providers
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +25,10 @@ class VectorDatabase:
     def _initialize_client(self):
         """Initialize ChromaDB client."""
         try:
+            # Imported here so that importing this module stays cheap
+            import chromadb
+            from chromadb.config import Settings
+            
             # Use persistent storage
             persist_directory = "data/chroma_db"
             os.makedirs(persist_directory, exist_ok=True)
@@ -202,5 +205,5 @@ class VectorDatabase:
             return False
 
 
-# Global vector database instance
-vector_db = VectorDatabase() 
\ No newline at end of file
+# Global vector database instance (built on first use)
+vector_db = providers.register("vector_db", VectorDatabase) 
\ No newline at end of file
@@ -1,162 +1,176 @@
 from fastapi import APIRouter, Query, HTTPException, Depends, Request
+from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import random
 import json
 import requests
 import logging
 from fastapi.templating import Jinja2Templates
+from sqlalchemy.exc import OperationalError, ProgrammingError, SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+
+from app.analytics.events import event_pipeline
+from app.analytics.rankings import RANKING_TYPES, RankingRepository
+from app.analytics.timeseries import GRAINS, SERIES_SOURCES, parse_date_range, timeseries_repository
+from app.analytics.trending import trend_tracker
+from app.catalog.cache import query_cache
+from app.catalog.compare import COMPARE_METRICS, catalog_comparator
+from app.catalog.generator import CatalogGenerator
+from app.catalog.pagination import InvalidCursor, decode_cursor, optional_cursor
+from app.catalog.records import Category, Creator, Product, Shop
+from app.catalog.registry import catalog_registry
+from app.catalog.repository import SQLCatalogRepository
+from app.catalog.snapshot import SnapshotWatcher, load_or_generate, open_snapshot
+from app.catalog.serialization import CatalogJSONResponse, encode
+from app.catalog.sketches import DISTRIBUTION_FIELDS
+from app.catalog.store import ColumnarTable, catalog_store
+from app.catalog.views import overlay
+from app.core.config import settings
+from app.core.lazy import providers
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Jinja2 template setup (if not already present)
 templates = Jinja2Templates(directory="app/templates")
 
 # Dummy data generators
-def generate_dummy_products(count: int = 100):
+def generate_dummy_products(count: int = 100, seed: Optional[int] = None, shop_count: int = 50):
     """Generate dummy product data"""
-    categories = ["Electronics", "Fashion", "Beauty", "Home & Garden", "Sports", "Toys", "Books", "Food", "Health", "Automotive"]
-    countries = ["US", "UK", "DE", "FR", "IT", "ES", "CA", "AU", "JP", "KR"]
-    
-    products = []
-    for i in range(count):
-        product = {
-            "id": f"prod_{i+1:06d}",
-            "name": f"Amazing Product {i+1}",
-            "shop_name": f"Shop {random.randint(1, 50)}",
-            "shop_id": f"shop_{random.randint(1, 50):03d}",
-            "price": round(random.uniform(10, 500), 2),
-            "currency": "USD",
-            "category": random.choice(categories),
-            "subcategory": f"Subcategory {random.randint(1, 5)}",
-            "country": random.choice(countries),
-            "sales_count": random.randint(100, 50000),
-            "views": random.randint(1000, 1000000),
-            "likes": random.randint(50, 50000),
-            "shares": random.randint(10, 5000),
-            "comments": random.randint(5, 2000),
-            "conversion_rate": round(random.uniform(0.01, 0.15), 4),
-            "trend_score": round(random.uniform(50, 100), 2),
-            "image_url": f"https://picsum.photos/300/300?random={i}",
-            "created_at": datetime.now() - timedelta(days=random.randint(1, 365))
-        }
-        products.append(product)
-    return products
+    generator = CatalogGenerator(settings.CATALOG_SEED if seed is None else seed)
+    return generator.products(count, shop_count).records()
 
-def generate_dummy_shops(count: int = 50):
+def generate_dummy_shops(count: int = 50, seed: Optional[int] = None):
     """Generate dummy shop data"""
-    countries = ["US", "UK", "DE", "FR", "IT", "ES", "CA", "AU", "JP", "KR"]
-    
-    shops = []
-    for i in range(count):
-        shop = {
-            "id": f"shop_{i+1:03d}",
-            "name": f"Amazing Shop {i+1}",
-            "owner_name": f"Owner {i+1}",
-            "country": random.choice(countries),
-            "category": random.choice(["Electronics", "Fashion", "Beauty", "Home", "Sports"]),
-            "follower_count": random.randint(1000, 1000000),
-            "product_count": random.randint(10, 500),
-            "total_orders": random.randint(1000, 100000),
-            "total_revenue": round(random.uniform(10000, 1000000), 2),
-            "avg_order_value": round(random.uniform(20, 200), 2),
-            "conversion_rate": round(random.uniform(0.02, 0.20), 4),
-            "is_verified": random.choice([True, False]),
-            "rating": round(random.uniform(3.5, 5.0), 1),
-            "created_at": datetime.now() - timedelta(days=random.randint(30, 1000))
-        }
-        shops.append(shop)
-    return shops
+    generator = CatalogGenerator(settings.CATALOG_SEED if seed is None else seed)
+    return generator.shops(count, generator.products(count * 5, count)).records()
 
-def generate_dummy_creators(count: int = 100):
+def generate_dummy_creators(count: int = 100, seed: Optional[int] = None):
     """Generate dummy creator data"""
-    categories = ["Lifestyle", "Tech", "Fashion", "Beauty", "Food", "Travel", "Fitness", "Education", "Entertainment", "Business"]
-    countries = ["US", "UK", "DE", "FR", "IT", "ES", "CA", "AU", "JP", "KR"]
-    
-    creators = []
-    for i in range(count):
-        creator = {
-            "id": f"creator_{i+1:06d}",
-            "username": f"creator{i+1}",
-            "display_name": f"Creator {i+1}",
-            "country": random.choice(countries),
-            "category": random.choice(categories),
-            "follower_count": random.randint(10000, 5000000),
-            "following_count": random.randint(100, 10000),
-            "video_count": random.randint(50, 2000),
-            "like_count": random.randint(100000, 10000000),
-            "avg_views": random.randint(10000, 1000000),
-            "avg_likes": random.randint(1000, 100000),
-            "avg_shares": random.randint(100, 10000),
-            "engagement_rate": round(random.uniform(0.02, 0.15), 4),
-            "is_verified": random.choice([True, False]),
-            "collaboration_price": round(random.uniform(100, 10000), 2),
-            "created_at": datetime.now() - timedelta(days=random.randint(100, 2000))
-        }
-        creators.append(creator)
-    return creators
+    generator = CatalogGenerator(settings.CATALOG_SEED if seed is None else seed)
+    return generator.creators(count).records()
 
-def generate_dummy_categories():
+def generate_dummy_categories(seed: Optional[int] = None):
     """Generate dummy category data"""
+    rng = random.Random(settings.CATALOG_SEED if seed is None else seed)
     categories = [
         {
             "id": "electronics",
             "name": "Electronics",
             "description": "Electronic devices and gadgets",
-            "product_count": random.randint(1000, 10000),
-            "avg_price": round(random.uniform(50, 300), 2),
-            "trending_score": round(random.uniform(70, 95), 2),
-            "growth_rate": round(random.uniform(0.05, 0.30), 4),
+            "product_count": rng.randint(1000, 10000),
+            "avg_price": round(rng.uniform(50, 300), 2),
+            "trending_score": round(rng.uniform(70, 95), 2),
+            "growth_rate": round(rng.uniform(0.05, 0.30), 4),
             "image_url": "https://picsum.photos/400/300?random=1"
         },
         {
             "id": "fashion",
             "name": "Fashion",
             "description": "Clothing, accessories, and fashion items",
-            "product_count": random.randint(2000, 15000),
-            "avg_price": round(random.uniform(30, 200), 2),
-            "trending_score": round(random.uniform(75, 98), 2),
-            "growth_rate": round(random.uniform(0.08, 0.35), 4),
+            "product_count": rng.randint(2000, 15000),
+            "avg_price": round(rng.uniform(30, 200), 2),
+            "trending_score": round(rng.uniform(75, 98), 2),
+            "growth_rate": round(rng.uniform(0.08, 0.35), 4),
             "image_url": "https://picsum.photos/400/300?random=2"
         },
         {
             "id": "beauty",
             "name": "Beauty",
             "description": "Cosmetics, skincare, and beauty products",
-            "product_count": random.randint(800, 8000),
-            "avg_price": round(random.uniform(20, 150), 2),
-            "trending_score": round(random.uniform(80, 96), 2),
-            "growth_rate": round(random.uniform(0.10, 0.40), 4),
+            "product_count": rng.randint(800, 8000),
+            "avg_price": round(rng.uniform(20, 150), 2),
+            "trending_score": round(rng.uniform(80, 96), 2),
+            "growth_rate": round(rng.uniform(0.10, 0.40), 4),
             "image_url": "https://picsum.photos/400/300?random=3"
         },
         {
             "id": "home-garden",
             "name": "Home & Garden",
             "description": "Home decor, furniture, and garden items",
-            "product_count": random.randint(600, 6000),
-            "avg_price": round(random.uniform(40, 400), 2),
-            "trending_score": round(random.uniform(65, 90), 2),
-            "growth_rate": round(random.uniform(0.06, 0.25), 4),
+            "product_count": rng.randint(600, 6000),
+            "avg_price": round(rng.uniform(40, 400), 2),
+            "trending_score": round(rng.uniform(65, 90), 2),
+            "growth_rate": round(rng.uniform(0.06, 0.25), 4),
             "image_url": "https://picsum.photos/400/300?random=4"
         },
         {
             "id": "sports",
             "name": "Sports & Outdoors",
             "description": "Sports equipment and outdoor gear",
-            "product_count": random.randint(400, 4000),
-            "avg_price": round(random.uniform(50, 300), 2),
-            "trending_score": round(random.uniform(70, 92), 2),
-            "growth_rate": round(random.uniform(0.07, 0.28), 4),
+            "product_count": rng.randint(400, 4000),
+            "avg_price": round(rng.uniform(50, 300), 2),
+            "trending_score": round(rng.uniform(70, 92), 2),
+            "growth_rate": round(rng.uniform(0.07, 0.28), 4),
             "image_url": "https://picsum.photos/400/300?random=5"
         }
     ]
-    return categories
+    return [Category.from_dict(category) for category in categories]
+
+def _load_snapshot(snapshot: Dict[str, Any]):
+    """Point the store and registry at a mapped snapshot's columns."""
+    blocks = snapshot["blocks"]
+    catalog_store.load(
+        products=blocks["products"].rows(),
+        shops=blocks["shops"].rows(),
+        creators=blocks["creators"].rows(),
+        categories=generate_dummy_categories(),
+        generation=snapshot["version"]
+    )
+    catalog_watcher.version = snapshot["version"]
+
+def load_catalog():
+    """Map the shared catalog snapshot and load it into the store and registry."""
+    _load_snapshot(load_or_generate(
+        settings.CATALOG_SNAPSHOT_PATH,
+        seed=settings.CATALOG_SEED,
+        products=settings.CATALOG_PRODUCTS,
+        shops=settings.CATALOG_SHOPS,
+        creators=settings.CATALOG_CREATORS,
+        generate=settings.CATALOG_SNAPSHOT_AUTOGENERATE
+    ))
+    return catalog_store
+
+def load_catalog_repository():
+    """SQL listing tables over the application database."""
+    from app.core.database import engine
+    return SQLCatalogRepository(engine)
+
+def load_ranking_repository():
+    """Stored rankings, with records from the SQL catalog listings."""
+    return RankingRepository(catalog_repository.get())
+
+# Catalog built on first use (or warmed at startup) rather than at import
+catalog_provider = providers.register("catalog", load_catalog)
+catalog_repository = providers.register("catalog_repository", load_catalog_repository)
+ranking_repository = providers.register("ranking_repository", load_ranking_repository)
+catalog_watcher = SnapshotWatcher(settings.CATALOG_SNAPSHOT_PATH, interval=settings.CATALOG_REFRESH_SECONDS)
+
+def require_catalog():
+    """Dependency that makes sure the catalog is loaded and on the published snapshot."""
+    catalog_provider.get()
+    version = catalog_watcher.poll()
+    if version is not None:
+        try:
+            _load_snapshot(open_snapshot(settings.CATALOG_SNAPSHOT_PATH, version))
+            logger.info(f"Switched to catalog snapshot {version}")
+        except Exception as e:
+            logger.error(f"Error loading catalog snapshot {version}: {e}")
+    return catalog_store
+
+async def _read_analytics(function, *args):
+    """Run an analytics database read off the event loop; 503 if its tables are missing."""
+    try:
+        return await run_in_threadpool(function, *args)
+    except (OperationalError, ProgrammingError) as e:
+        logger.error(f"Analytics database read failed: {e}")
+        raise HTTPException(status_code=503, detail="Analytics schema not available")
 
-# Generate dummy data
-DUMMY_PRODUCTS = generate_dummy_products(500)
-DUMMY_SHOPS = generate_dummy_shops(100)
-DUMMY_CREATORS = generate_dummy_creators(200)
-DUMMY_CATEGORIES = generate_dummy_categories()
+class ComparisonRequest(BaseModel):
+    kind: str
+    ids: List[str]
+    metrics: Optional[List[str]] = None
 
 # Fallback dummy data for reviews
 DUMMY_REVIEWS = [
@@ -215,7 +229,147 @@ def get_product_reviews(product_id: str, region: str = "TH", count: int = 10, cu
         reviews = DUMMY_REVIEWS
     return reviews
 
-@router.get("/trending-products")
+def _related_product_ids(product_id: str, count: int) -> List[str]:
+    """Sample up to ``count`` product ids other than ``product_id``."""
+    products = catalog_registry.list("products")
+    picks = random.sample(range(len(products)), min(count + 1, len(products)))
+    related = [products[i]["id"] for i in picks if products[i]["id"] != product_id]
+    return related[:min(count, len(products) - 1)]
+
+def _listing_response(
+    table: ColumnarTable,
+    country: Optional[str],
+    category: Optional[str],
+    search: Optional[str],
+    sort_by: str,
+    sort_order: str,
+    limit: int,
+    page: int,
+    cursor: Optional[str]
+) -> Dict[str, Any]:
+    """Filter, sort and paginate a catalog table into a listing response.
+
+    Uses page/limit offsets by default; when ``cursor`` is given the page is
+    served by keyset pagination on ``(sort_by value, id)`` instead.
+    """
+    equals = {"country": country.upper()} if country else None
+    iequals = {"category": category} if category else None
+    sort_order = sort_order.lower()
+    descending = sort_order == "desc"
+
+    if cursor is not None:
+        if not table.supports_cursor(sort_by):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cursor pagination is not supported for sort field '{sort_by}'"
+            )
+        try:
+            rows, total_count, has_next = table.query_after(
+                equals=equals,
+                iequals=iequals,
+                search=search,
+                sort_by=sort_by,
+                descending=descending,
+                after=decode_cursor(cursor, sort_by, sort_order),
+                limit=limit
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        next_position = table.cursor_position(rows[-1], sort_by) if has_next else None
+        return {
+            "success": True,
+            "data": rows,
+            "meta": {
+                "total_count": total_count,
+                "limit": limit,
+                "has_next": has_next,
+                "has_prev": True,
+                "cursor": cursor,
+                "next_cursor": optional_cursor(next_position, sort_by, sort_order)
+            }
+        }
+
+    start_idx = (page - 1) * limit
+    end_idx = start_idx + limit
+    rows, total_count = table.query(
+        equals=equals,
+        iequals=iequals,
+        search=search,
+        sort_by=sort_by,
+        descending=descending,
+        offset=start_idx,
+        limit=limit
+    )
+    has_next = end_idx < total_count
+
+    next_position = None
+    if has_next and rows and table.supports_cursor(sort_by):
+        next_position = table.cursor_position(rows[-1], sort_by)
+
+    return {
+        "success": True,
+        "data": rows,
+        "meta": {
+            "total_count": total_count,
+            "page": page,
+            "limit": limit,
+            "total_pages": (total_count + limit - 1) // limit,
+            "has_next": has_next,
+            "has_prev": page > 1,
+            "next_cursor": optional_cursor(next_position, sort_by, sort_order)
+        }
+    }
+
+def _cached_listing(
+    kind: str,
+    country: Optional[str],
+    category: Optional[str],
+    search: Optional[str],
+    sort_by: str,
+    sort_order: str,
+    limit: int,
+    page: int,
+    cursor: Optional[str]
+) -> CatalogJSONResponse:
+    """Serve a listing page from the query cache, computing it on a miss.
+
+    Pages come from the in-memory store, or from the database when
+    ``CATALOG_BACKEND`` is ``"database"``. Database pages are not cached:
+    rows change there without bumping the store's versions, so a cached
+    page could never be invalidated.
+    """
+    database = settings.CATALOG_BACKEND == "database"
+    source = catalog_repository.get() if database else catalog_store
+
+    def compute() -> bytes:
+        return encode(_listing_response(
+            getattr(source, kind), country, category, search,
+            sort_by, sort_order, limit, page, cursor
+        ))
+
+    if database:
+        return CatalogJSONResponse(compute())
+    params = {
+        "backend": settings.CATALOG_BACKEND,
+        "country": country.upper() if country else None,
+        "category": category.lower() if category else None,
+        "search": search.lower() if search else None,
+        "sort_by": sort_by,
+        "sort_order": sort_order.lower(),
+        "limit": limit,
+        "page": page if cursor is None else None,
+        "cursor": cursor
+    }
+    body = query_cache.get_or_compute(kind, catalog_store.state_token([kind]), params, compute)
+    return CatalogJSONResponse(body)
+
+async def _listing(kind: str, *args) -> CatalogJSONResponse:
+    """``_cached_listing``, run off the event loop when it queries the database."""
+    if settings.CATALOG_BACKEND == "database":
+        return await run_in_threadpool(_cached_listing, kind, *args)
+    return _cached_listing(kind, *args)
+
+@router.get("/trending-products", response_class=CatalogJSONResponse)
 async def get_trending_products(
     country: Optional[str] = Query(None, description="Filter by country"),
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -223,50 +377,28 @@ async def get_trending_products(
     page: int = Query(1, ge=1, description="Page number"),
     search: Optional[str] = Query(None, description="Search term"),
     sort_by: str = Query("trend_score", description="Sort by field"),
-    sort_order: str = Query("desc", description="Sort order (asc/desc)")
+    sort_order: str = Query("desc", description="Sort order (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor from meta.next_cursor")
 ):
     """Get trending products with filters, search, and pagination"""
     
-    # Filter products
-    filtered_products = DUMMY_PRODUCTS.copy()
-    
-    if country:
-        filtered_products = [p for p in filtered_products if p["country"] == country.upper()]
-    
-    if category:
-        filtered_products = [p for p in filtered_products if p["category"].lower() == category.lower()]
-    
-    if search:
-        search_lower = search.lower()
-        filtered_products = [
-            p for p in filtered_products 
-            if search_lower in p["name"].lower() or search_lower in p["shop_name"].lower()
-        ]
-    
-    # Sort products
-    reverse = sort_order.lower() == "desc"
-    filtered_products.sort(key=lambda x: x.get(sort_by, 0), reverse=reverse)
-    
-    # Pagination
-    total_count = len(filtered_products)
-    start_idx = (page - 1) * limit
-    end_idx = start_idx + limit
-    paginated_products = filtered_products[start_idx:end_idx]
+    return await _listing(
+        "products", country, category, search, sort_by, sort_order, limit, page, cursor
+    )
+
+@router.get("/trending/top", response_class=CatalogJSONResponse)
+async def get_trending_top(
+    category: Optional[str] = Query(None, description="Filter by category"),
+    limit: int = Query(20, ge=1, le=100, description="Number of products to return")
+):
+    """Get the fastest-moving products from the event stream, per category or overall"""
     
-    return {
+    return CatalogJSONResponse({
         "success": True,
-        "data": paginated_products,
-        "meta": {
-            "total_count": total_count,
-            "page": page,
-            "limit": limit,
-            "total_pages": (total_count + limit - 1) // limit,
-            "has_next": end_idx < total_count,
-            "has_prev": page > 1
-        }
-    }
+        "data": trend_tracker.top(category, limit)
+    })
 
-@router.get("/shops")
+@router.get("/shops", response_class=CatalogJSONResponse)
 async def get_shops(
     country: Optional[str] = Query(None, description="Filter by country"),
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -274,50 +406,16 @@ async def get_shops(
     page: int = Query(1, ge=1, description="Page number"),
     search: Optional[str] = Query(None, description="Search term"),
     sort_by: str = Query("total_revenue", description="Sort by field"),
-    sort_order: str = Query("desc", description="Sort order (asc/desc)")
+    sort_order: str = Query("desc", description="Sort order (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor from meta.next_cursor")
 ):
     """Get shops with filters, search, and pagination"""
     
-    # Filter shops
-    filtered_shops = DUMMY_SHOPS.copy()
-    
-    if country:
-        filtered_shops = [s for s in filtered_shops if s["country"] == country.upper()]
-    
-    if category:
-        filtered_shops = [s for s in filtered_shops if s["category"].lower() == category.lower()]
-    
-    if search:
-        search_lower = search.lower()
-        filtered_shops = [
-            s for s in filtered_shops 
-            if search_lower in s["name"].lower() or search_lower in s["owner_name"].lower()
-        ]
-    
-    # Sort shops
-    reverse = sort_order.lower() == "desc"
-    filtered_shops.sort(key=lambda x: x.get(sort_by, 0), reverse=reverse)
-    
-    # Pagination
-    total_count = len(filtered_shops)
-    start_idx = (page - 1) * limit
-    end_idx = start_idx + limit
-    paginated_shops = filtered_shops[start_idx:end_idx]
-    
-    return {
-        "success": True,
-        "data": paginated_shops,
-        "meta": {
-            "total_count": total_count,
-            "page": page,
-            "limit": limit,
-            "total_pages": (total_count + limit - 1) // limit,
-            "has_next": end_idx < total_count,
-            "has_prev": page > 1
-        }
-    }
+    return await _listing(
+        "shops", country, category, search, sort_by, sort_order, limit, page, cursor
+    )
 
-@router.get("/creators")
+@router.get("/creators", response_class=CatalogJSONResponse)
 async def get_creators(
     country: Optional[str] = Query(None, description="Filter by country"),
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -325,67 +423,172 @@ async def get_creators(
     page: int = Query(1, ge=1, description="Page number"),
     search: Optional[str] = Query(None, description="Search term"),
     sort_by: str = Query("follower_count", description="Sort by field"),
-    sort_order: str = Query("desc", description="Sort order (asc/desc)")
+    sort_order: str = Query("desc", description="Sort order (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor from meta.next_cursor")
 ):
     """Get creators with filters, search, and pagination"""
     
-    # Filter creators
-    filtered_creators = DUMMY_CREATORS.copy()
-    
-    if country:
-        filtered_creators = [c for c in filtered_creators if c["country"] == country.upper()]
-    
-    if category:
-        filtered_creators = [c for c in filtered_creators if c["category"].lower() == category.lower()]
-    
-    if search:
-        search_lower = search.lower()
-        filtered_creators = [
-            c for c in filtered_creators 
-            if search_lower in c["username"].lower() or search_lower in c["display_name"].lower()
-        ]
-    
-    # Sort creators
-    reverse = sort_order.lower() == "desc"
-    filtered_creators.sort(key=lambda x: x.get(sort_by, 0), reverse=reverse)
-    
-    # Pagination
-    total_count = len(filtered_creators)
-    start_idx = (page - 1) * limit
-    end_idx = start_idx + limit
-    paginated_creators = filtered_creators[start_idx:end_idx]
-    
-    return {
+    return await _listing(
+        "creators", country, category, search, sort_by, sort_order, limit, page, cursor
+    )
+
+@router.get("/rankings/{kind}", response_class=CatalogJSONResponse)
+async def get_rankings(
+    kind: str,
+    ranking_type: Optional[str] = Query(None, description="Ranking type (defaults to the kind's first)"),
+    ranking_date: Optional[date] = Query(None, alias="date", description="Ranking date (defaults to the latest)"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    limit: int = Query(20, ge=1, le=100, description="Number of entries to return")
+):
+    """Get a precomputed ranking of products, shops or creators"""
+    if kind not in RANKING_TYPES:
+        raise HTTPException(status_code=404, detail=f"Unknown ranking kind '{kind}'")
+    ranking_type = ranking_type or RANKING_TYPES[kind][0]
+    if ranking_type not in RANKING_TYPES[kind]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {kind} ranking type '{ranking_type}' (expected one of {', '.join(RANKING_TYPES[kind])})"
+        )
+    
+    rows, day = await _read_analytics(
+        ranking_repository.get().lookup, kind, ranking_type, ranking_date, category, limit
+    )
+    if day is None:
+        raise HTTPException(status_code=404, detail=f"No {ranking_type} {kind} rankings have been computed")
+    
+    return CatalogJSONResponse({
         "success": True,
-        "data": paginated_creators,
+        "data": rows,
         "meta": {
-            "total_count": total_count,
-            "page": page,
-            "limit": limit,
-            "total_pages": (total_count + limit - 1) // limit,
-            "has_next": end_idx < total_count,
-            "has_prev": page > 1
+            "kind": kind,
+            "ranking_type": ranking_type,
+            "date": day.isoformat(),
+            "category": category,
+            "count": len(rows)
         }
-    }
+    })
+
+@router.get("/timeseries/{kind}/{entity_id}", response_class=CatalogJSONResponse)
+async def get_timeseries(
+    kind: str,
+    entity_id: str,
+    grain: str = Query("day", description="Bucket size (day/week/month)"),
+    start: Optional[date] = Query(None, description="First day (defaults to date_range before end)"),
+    end: Optional[date] = Query(None, description="Last day (defaults to the latest day with data)"),
+    date_range: str = Query("30d", description="Range when start is omitted, e.g. 30d, 12w, 6m, 2y"),
+    window: int = Query(7, ge=1, le=365, description="Rolling average window, in buckets"),
+    metrics: Optional[str] = Query(None, description="Comma-separated metrics (default all)")
+):
+    """Get an entity's analytics as resampled series with rolling averages, growth and cumulative sums"""
+    if kind not in SERIES_SOURCES:
+        raise HTTPException(status_code=404, detail=f"Unknown analytics kind '{kind}'")
+    if grain not in GRAINS:
+        raise HTTPException(status_code=400, detail=f"Unknown grain '{grain}' (expected one of {', '.join(GRAINS)})")
+    available = SERIES_SOURCES[kind][2]
+    selected = [m.strip() for m in metrics.split(",") if m.strip()] if metrics else None
+    unknown = [m for m in selected or [] if m not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {kind} metrics: {', '.join(unknown)} (expected {', '.join(available)})"
+        )
+    try:
+        days = parse_date_range(date_range)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    
+    data = await _read_analytics(
+        timeseries_repository.series, kind, entity_id, start, end, grain, window, selected, days
+    )
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"{kind[:-1].capitalize()} not found")
+    
+    return CatalogJSONResponse({
+        "success": True,
+        "data": data
+    })
+
+@router.post("/compare", response_class=CatalogJSONResponse)
+async def compare_entities(request: ComparisonRequest):
+    """Compare products, shops or creators side by side within their categories"""
+    if request.kind not in COMPARE_METRICS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown kind '{request.kind}' (expected one of {', '.join(COMPARE_METRICS)})"
+        )
+    if not request.ids or len(request.ids) > settings.COMPARE_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Between 1 and {settings.COMPARE_MAX_IDS} ids can be compared at once"
+        )
+    table = getattr(catalog_store, request.kind)
+    available = catalog_comparator.metrics(table)
+    metrics = request.metrics or list(COMPARE_METRICS[request.kind])
+    unknown = [m for m in metrics if m not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {request.kind} metrics: {', '.join(unknown)} (expected {', '.join(available)})"
+        )
+    
+    return CatalogJSONResponse({
+        "success": True,
+        "data": catalog_comparator.compare(
+            request.kind, table, request.ids, metrics, catalog_store.versions[request.kind]
+        )
+    })
+
+@router.post("/events", status_code=202, response_class=CatalogJSONResponse)
+async def ingest_events(request: Request):
+    """Accept engagement events (view, click, sale, like, ...): one JSON object, a JSON array, or NDJSON lines"""
+    body = await request.body()
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            payloads = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            payload = json.loads(body)
+            payloads = payload if isinstance(payload, list) else [payload]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    if not payloads:
+        raise HTTPException(status_code=400, detail="No events")
+    if len(payloads) > settings.EVENTS_MAX_PER_REQUEST:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.EVENTS_MAX_PER_REQUEST} events can be sent per request"
+        )
+    
+    events, errors = event_pipeline.parse(payloads)
+    if not events:
+        raise HTTPException(status_code=400, detail={"message": "No valid events", "errors": errors[:10]})
+    if not event_pipeline.submit(events):
+        raise HTTPException(status_code=429, detail="Event buffer is full, retry later", headers={"Retry-After": "1"})
+    
+    return CatalogJSONResponse({
+        "success": True,
+        "data": {"accepted": len(events), "rejected": len(errors), "errors": errors[:10]}
+    }, status_code=202)
 
-@router.get("/categories")
+@router.get("/categories", response_class=CatalogJSONResponse)
 async def get_categories():
     """Get all categories"""
-    return {
+    return CatalogJSONResponse({
         "success": True,
-        "data": DUMMY_CATEGORIES
-    }
+        "data": catalog_registry.list("categories")
+    })
 
-@router.get("/product/{product_id}")
+@router.get("/product/{product_id}", response_class=CatalogJSONResponse)
 async def get_product_details(product_id: str):
     """Get detailed product information"""
-    product = next((p for p in DUMMY_PRODUCTS if p["id"] == product_id), None)
+    product = catalog_registry.get("products", product_id)
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Add additional details
-    product["detailed_info"] = {
+    detailed_info = {
         "description": f"This is a detailed description of {product['name']}. It's an amazing product that customers love!",
         "specifications": {
             "brand": f"Brand {random.randint(1, 10)}",
@@ -399,48 +602,66 @@ async def get_product_details(product_id: str):
             "total_reviews": random.randint(50, 1000),
             "positive_percentage": random.randint(80, 98)
         },
-        "related_products": random.sample([p["id"] for p in DUMMY_PRODUCTS if p["id"] != product_id], min(5, len(DUMMY_PRODUCTS)-1))
+        "related_products": _related_product_ids(product_id, 5)
     }
     
-    return {
+    return CatalogJSONResponse({
         "success": True,
-        "data": product
-    }
+        "data": overlay(product, detailed_info=detailed_info)
+    })
 
-@router.get("/shop/{shop_id}")
+def _shop_analytics(shop: Shop) -> Dict[str, Any]:
+    """A shop's rating, plus recent sales from its daily analytics in database mode."""
+    analytics = {"customer_satisfaction": shop["rating"]}
+    if settings.CATALOG_BACKEND != "database":
+        return analytics
+    try:
+        comparisons = timeseries_repository.compare_windows("shops", shop["id"], (7, 30))
+    except SQLAlchemyError as e:
+        logger.warning(f"Error reading analytics for shop {shop['id']}: {e}")
+        return analytics
+    if comparisons is None:
+        return analytics
+    week, month = comparisons[7], comparisons[30]
+    analytics.update({
+        "daily_sales": round(week["current"]["sales"] / 7, 1),
+        "weekly_growth": week["growth"]["revenue"],
+        "monthly_revenue": month["current"]["revenue"],
+        "as_of": week["end"]
+    })
+    return analytics
+
+@router.get("/shop/{shop_id}", response_class=CatalogJSONResponse)
 async def get_shop_details(shop_id: str):
     """Get detailed shop information"""
-    shop = next((s for s in DUMMY_SHOPS if s["id"] == shop_id), None)
+    shop = catalog_registry.get("shops", shop_id)
     
     if not shop:
         raise HTTPException(status_code=404, detail="Shop not found")
     
     # Add shop products
-    shop_products = [p for p in DUMMY_PRODUCTS if p["shop_id"] == shop_id][:10]
+    shop_products = catalog_store.products.rows_where("shop_id", shop_id, limit=10)
     
-    shop["products"] = shop_products
-    shop["analytics"] = {
-        "daily_sales": random.randint(50, 500),
-        "weekly_growth": round(random.uniform(0.05, 0.30), 4),
-        "monthly_revenue": round(random.uniform(5000, 50000), 2),
-        "customer_satisfaction": round(random.uniform(4.0, 5.0), 1)
-    }
+    if settings.CATALOG_BACKEND == "database":
+        analytics = await run_in_threadpool(_shop_analytics, shop)
+    else:
+        analytics = _shop_analytics(shop)
     
-    return {
+    return CatalogJSONResponse({
         "success": True,
-        "data": shop
-    }
+        "data": overlay(shop, products=shop_products, analytics=analytics)
+    })
 
-@router.get("/creator/{creator_id}")
+@router.get("/creator/{creator_id}", response_class=CatalogJSONResponse)
 async def get_creator_details(creator_id: str):
     """Get detailed creator information"""
-    creator = next((c for c in DUMMY_CREATORS if c["id"] == creator_id), None)
+    creator = catalog_registry.get("creators", creator_id)
     
     if not creator:
         raise HTTPException(status_code=404, detail="Creator not found")
     
     # Add creator videos
-    creator["videos"] = [
+    videos = [
         {
             "id": f"video_{i}",
             "title": f"Amazing Video {i}",
@@ -452,31 +673,32 @@ async def get_creator_details(creator_id: str):
         for i in range(1, 11)
     ]
     
-    creator["collaboration_info"] = {
+    collaboration_info = {
         "availability": random.choice(["Available", "Limited", "Unavailable"]),
         "response_rate": random.randint(70, 100),
         "avg_response_time": f"{random.randint(1, 48)} hours",
         "preferred_categories": random.sample(["Electronics", "Fashion", "Beauty", "Home", "Sports"], 3)
     }
     
-    return {
+    return CatalogJSONResponse({
         "success": True,
-        "data": creator
-    }
+        "data": overlay(creator, videos=videos, collaboration_info=collaboration_info)
+    })
 
-@router.get("/category/{category_id}")
+@router.get("/category/{category_id}", response_class=CatalogJSONResponse)
 async def get_category_details(category_id: str):
     """Get detailed category information"""
-    category = next((c for c in DUMMY_CATEGORIES if c["id"] == category_id), None)
+    category = catalog_registry.get("categories", category_id)
     
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
     # Add category products
-    category_products = [p for p in DUMMY_PRODUCTS if p["category"].lower() == category["name"].lower()][:20]
+    category_products = catalog_store.products.rows_where(
+        "category", category["name"], ignore_case=True, limit=20
+    )
     
-    category["products"] = category_products
-    category["market_insights"] = {
+    market_insights = {
         "total_market_size": f"${random.randint(1000000, 10000000):,}",
         "growth_rate": round(random.uniform(0.05, 0.40), 4),
         "competition_level": random.choice(["Low", "Medium", "High"]),
@@ -484,27 +706,67 @@ async def get_category_details(category_id: str):
         "top_brands": [f"Brand {i}" for i in range(1, 6)]
     }
     
-    return {
+    return CatalogJSONResponse({
         "success": True,
-        "data": category
-    }
+        "data": overlay(category, products=category_products, market_insights=market_insights)
+    })
 
-@router.get("/stats/overview")
+@router.get("/stats/overview", response_class=CatalogJSONResponse)
 async def get_overview_stats():
     """Get overview statistics"""
-    return {
+    totals = catalog_store.aggregates.overview()
+    return CatalogJSONResponse({
         "success": True,
         "data": {
-            "total_products": len(DUMMY_PRODUCTS),
-            "total_shops": len(DUMMY_SHOPS),
-            "total_creators": len(DUMMY_CREATORS),
-            "total_categories": len(DUMMY_CATEGORIES),
-            "total_sales": sum(p["sales_count"] for p in DUMMY_PRODUCTS),
-            "total_revenue": sum(s["total_revenue"] for s in DUMMY_SHOPS),
-            "avg_product_price": round(sum(p["price"] for p in DUMMY_PRODUCTS) / len(DUMMY_PRODUCTS), 2),
-            "top_countries": ["US", "UK", "DE", "FR", "IT"],
-            "trending_categories": ["Fashion", "Beauty", "Electronics", "Home & Garden", "Sports"]
+            "total_products": totals["total_products"],
+            "total_shops": totals["total_shops"],
+            "total_creators": totals["total_creators"],
+            "total_categories": catalog_registry.count("categories"),
+            "total_sales": totals["total_sales"],
+            "total_revenue": totals["total_revenue"],
+            "avg_product_price": totals["avg_product_price"],
+            "top_countries": totals["top_countries"],
+            "trending_categories": totals["trending_categories"]
         }
+    })
+
+@router.get("/stats/distribution", response_class=CatalogJSONResponse)
+async def get_distribution(
+    field: str = Query(..., description="Field (price, conversion_rate, engagement_rate, follower_count)"),
+    kind: str = Query("products", description="products, shops or creators"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    country: Optional[str] = Query(None, description="Filter by country"),
+    quantiles: str = Query("0.5,0.9,0.99", description="Comma-separated quantiles between 0 and 1")
+):
+    """Get quantiles and a histogram of a field within a category and/or country"""
+    if kind not in DISTRIBUTION_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown kind '{kind}' (expected one of {', '.join(DISTRIBUTION_FIELDS)})"
+        )
+    if field not in DISTRIBUTION_FIELDS[kind]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No {field} distribution for {kind} (expected one of {', '.join(DISTRIBUTION_FIELDS[kind])})"
+        )
+    try:
+        qs = [float(q) for q in quantiles.split(",") if q.strip()]
+    except ValueError:
+        qs = []
+    if not qs or any(not 0 <= q <= 1 for q in qs):
+        raise HTTPException(status_code=400, detail="quantiles must be numbers between 0 and 1")
+    
+    return CatalogJSONResponse({
+        "success": True,
+        "data": catalog_store.aggregates.distributions.describe(kind, field, category, country, qs)
+    })
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Get query cache hit/miss statistics"""
+    return {
+        "success": True,
+        "data": query_cache.stats()
     }
 
 @router.get("/product/{product_id}/reviews")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Throughput of the bulk analytics loader against SQLite or PostgreSQL.
+
+Creates the schema (with catalog rows the analytics reference) in an empty
+database, streams synthetic daily rows through AnalyticsIngestor, then
+re-runs the same load to check it is idempotent and that the incrementally
+maintained rollups agree with the daily rows.
+
+Run from the project root:
+    python benchmarks/analytics_ingest.py --entities 2000 --days 365
+    python benchmarks/analytics_ingest.py --url postgresql+psycopg2://user:pw@localhost/bench --method copy
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from sqlalchemy import create_engine, func, select  # noqa: E402
+
+from app.analytics import rollups  # noqa: E402
+from app.analytics.ingest import ANALYTICS_TABLES, AnalyticsIngestor  # noqa: E402
+from app.catalog.generator import CatalogGenerator  # noqa: E402
+from app.catalog.repository import load_fixture  # noqa: E402
+
+
+def daily_rows(entity: str, entities: int, days: int, seed: int):
+    """Synthetic ``product_analytics`` rows, one entity-day at a time."""
+    rng = np.random.default_rng(seed)
+    start = date(2025, 7, 1) - timedelta(days=days)
+    for day in range(days):
+        views = rng.poisson(1_000, entities)
+        clicks = rng.binomial(views, 0.08)
+        sales = rng.binomial(clicks, 0.1)
+        revenue = np.round(sales * rng.uniform(10, 120, entities), 2)
+        current = start + timedelta(days=day)
+        for i in range(entities):
+            yield {
+                entity: i + 1,
+                "date": current,
+                "views": int(views[i]),
+                "clicks": int(clicks[i]),
+                "sales": int(sales[i]),
+                "revenue": float(revenue[i]),
+                "conversion_rate": round(sales[i] / views[i], 4) if views[i] else 0.0,
+                "avg_order_value": round(revenue[i] / sales[i], 2) if sales[i] else 0.0
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entities", type=int, default=2_000, help="Products with daily rows")
+    parser.add_argument("--days", type=int, default=100)
+    parser.add_argument("--url", default="sqlite:///data/analytics_bench.db", help="SQLAlchemy URL of an empty database")
+    parser.add_argument("--method", default="auto", choices=("auto", "copy", "values"))
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.url.startswith("sqlite:///"):
+        os.makedirs(os.path.dirname(os.path.abspath(args.url[len("sqlite:///"):])), exist_ok=True)
+    engine = create_engine(args.url)
+    load_fixture(engine, CatalogGenerator(args.seed).generate(args.entities, max(1, args.entities // 20), 1))
+
+    ingestor = AnalyticsIngestor(engine, batch_size=args.batch_size, method=args.method)
+    table, entity = ANALYTICS_TABLES["products"]
+    print(f"{engine.dialect.name} via {ingestor.method}, batches of {ingestor.batch_size}")
+    for run in ("initial", "re-run"):
+        stats = ingestor.ingest("products", daily_rows(entity, args.entities, args.days, args.seed))
+        with engine.connect() as conn:
+            stored = conn.execute(select(func.count()).select_from(table)).scalar_one()
+        print(
+            f"{run:<8} {stats['rows']:>12,} rows {stats['seconds']:>8.2f}s "
+            f"{stats['rows_per_second']:>12,.0f} rows/s  blocked {stats['backpressure_seconds']:.2f}s  "
+            f"table has {stored:,} rows"
+        )
+
+    # Range totals read through the rollups vs summed from the daily rows
+    end = date(2025, 7, 1) - timedelta(days=1)
+    begin = end - timedelta(days=args.days - 1)
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        totals = rollups.range_totals(conn, "products", begin, end)
+        rollup_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        daily = {
+            row[0]: (row[1], row[2])
+            for row in conn.execute(
+                select(table.c[entity], func.sum(table.c.views), func.sum(table.c.sales)).group_by(table.c[entity])
+            )
+        }
+        daily_seconds = time.perf_counter() - start
+    same = daily == {key: (value["views"], value["sales"]) for key, value in totals.items()}
+    print(
+        f"range totals {rollup_seconds * 1e3:.1f} ms via rollups vs {daily_seconds * 1e3:.1f} ms "
+        f"from daily rows, same: {same}"
+    )
+
+
+if __name__ == "__main__":
+    main()
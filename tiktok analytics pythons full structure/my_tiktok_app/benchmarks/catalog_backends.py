@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Listing latency: in-memory columnar store vs SQL repository.
+
+Loads the same seeded catalog into both backends (SQLite by default, or any
+SQLAlchemy URL whose database has no catalog tables yet), checks that they
+return the same rows in the same order and times a mix of listing queries.
+
+Run from the project root:
+    python benchmarks/catalog_backends.py --products 100000
+    python benchmarks/catalog_backends.py --url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.catalog.generator import CatalogGenerator  # noqa: E402
+from app.catalog.repository import SQLCatalogRepository, load_fixture  # noqa: E402
+from app.catalog.store import CatalogStore, ColumnarTable  # noqa: E402
+
+# (kind, query kwargs); products are not filtered by country since the
+# schema takes a product's country from its shop
+QUERIES = [
+    ("products", {"sort_by": "sales_count"}),
+    ("products", {"sort_by": "price", "descending": False}),
+    ("products", {"sort_by": "views", "iequals": {"category": "beauty"}}),
+    ("products", {"sort_by": "sales_count", "search": "product 12"}),
+    ("products", {"sort_by": "views", "offset": 2000}),
+    ("shops", {"sort_by": "total_revenue"}),
+    ("shops", {"sort_by": "follower_count", "equals": {"country": "US"}}),
+    ("creators", {"sort_by": "follower_count"}),
+    ("creators", {"sort_by": "engagement_rate", "equals": {"country": "TH"}, "iequals": {"category": "Gaming"}}),
+    ("creators", {"sort_by": "follower_count", "search": "creator9"}),
+]
+
+
+def timed(run, repeat):
+    """Median seconds per call of ``run`` and its last result."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--shops", type=int, default=2_000)
+    parser.add_argument("--creators", type=int, default=20_000)
+    parser.add_argument("--url", default="sqlite://", help="SQLAlchemy URL of an empty database")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    blocks = CatalogGenerator(args.seed).generate(args.products, args.shops, args.creators)
+    memory = {
+        kind: ColumnarTable(block.rows(), **CatalogStore.TABLES[kind])
+        for kind, block in blocks.items()
+    }
+
+    if args.url.startswith("sqlite"):
+        engine = create_engine(args.url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(args.url)
+    start = time.perf_counter()
+    load_fixture(engine, blocks)
+    print(f"loaded fixture into {engine.dialect.name} in {time.perf_counter() - start:.2f}s")
+    database = SQLCatalogRepository(engine)
+
+    print(f"{'kind':<9} {'query':<62} {'memory ms':>10} {'sql ms':>10} {'same':>5}")
+    for kind, kwargs in QUERIES:
+        query = {"limit": 20, **kwargs}
+        memory_seconds, (memory_rows, memory_total) = timed(
+            lambda: memory[kind].query(**query), args.repeat
+        )
+        sql_seconds, (sql_rows, sql_total) = timed(
+            lambda: getattr(database, kind).query(**query), args.repeat
+        )
+        same = memory_total == sql_total and [r["id"] for r in memory_rows] == [r["id"] for r in sql_rows]
+        label = ", ".join(f"{k}={v}" for k, v in kwargs.items())
+        print(f"{kind:<9} {label[:62]:<62} {memory_seconds * 1e3:>10.3f} {sql_seconds * 1e3:>10.3f} {str(same):>5}")
+
+    # Keyset pagination: walk the same pages through both backends
+    def walk(table):
+        ids, after = [], None
+        for _ in range(10):
+            rows, _, _ = table.query_after(sort_by="sales_count", after=after, limit=50)
+            ids.extend(row["id"] for row in rows)
+            after = table.cursor_position(rows[-1], "sales_count")
+        return ids
+
+    memory_seconds, memory_ids = timed(lambda: walk(memory["products"]), max(1, args.repeat // 10))
+    sql_seconds, sql_ids = timed(lambda: walk(database.products), max(1, args.repeat // 10))
+    label = "10 keyset pages by sales_count, limit=50"
+    print(f"{'products':<9} {label:<62} {memory_seconds * 1e3:>10.3f} {sql_seconds * 1e3:>10.3f} "
+          f"{str(memory_ids == sql_ids):>5}")
+
+if __name__ == "__main__":
+    main()
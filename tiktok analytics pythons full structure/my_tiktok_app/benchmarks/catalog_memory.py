@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Memory report: plain dict rows vs slotted catalog records.
+
+Run from the project root:
+    python benchmarks/catalog_memory.py --rows 100000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.routers.analytics import (  # noqa: E402
+    generate_dummy_creators,
+    generate_dummy_products,
+    generate_dummy_shops,
+)
+
+
+def measure(build):
+    """Bytes allocated (and still held) by ``build()``."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows per entity")
+    args = parser.parse_args()
+
+    print(f"{'entity':<10} {'dict B/row':>12} {'record B/row':>14} {'saving':>8}")
+    for name, generate in (
+        ("products", generate_dummy_products),
+        ("shops", generate_dummy_shops),
+        ("creators", generate_dummy_creators),
+    ):
+        records = generate(args.rows)
+        record_type = type(records[0])
+
+        # Field values are shared by both representations; only the
+        # container and the created_at datetime/int differ.
+        dicts, dict_bytes = measure(lambda: [record.to_dict() for record in records])
+        _, record_bytes = measure(lambda: [record_type.from_dict(row) for row in dicts])
+
+        per_dict = dict_bytes / args.rows
+        per_record = record_bytes / args.rows
+        print(
+            f"{name:<10} {per_dict:>12.0f} {per_record:>14.0f} "
+            f"{1 - per_record / per_dict:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
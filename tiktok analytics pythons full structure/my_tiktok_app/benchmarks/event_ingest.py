@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Throughput of event validation, buffering and flushing against SQLite or PostgreSQL.
+
+Creates the schema (with the catalog rows events reference) in an empty
+database, validates and buffers synthetic product events the way
+POST /api/analytics/events does, then flushes them into the daily
+analytics tables, their rollups and the trend tracker, and checks the
+stored view counts against the events sent.
+
+Run from the project root:
+    python benchmarks/event_ingest.py --events 200000
+    python benchmarks/event_ingest.py --url postgresql+psycopg2://user:pw@localhost/bench
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from sqlalchemy import create_engine, func, select  # noqa: E402
+
+from app.analytics.events import EventPipeline  # noqa: E402
+from app.catalog.generator import CatalogGenerator  # noqa: E402
+from app.catalog.repository import load_fixture  # noqa: E402
+from app.catalog.store import CatalogStore  # noqa: E402
+from app.core import schema  # noqa: E402
+
+EVENT_MIX = ("view", "view", "view", "view", "click", "like", "share", "add_to_cart", "sale")
+
+
+def payloads(count: int, products: int, days: int, seed: int):
+    """Synthetic event payloads over the last ``days`` days, with Zipf-distributed products."""
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    ids = np.minimum(rng.zipf(1.3, count), products)
+    types = rng.choice(EVENT_MIX, count)
+    timestamps = now - rng.random(count) * days * 86400
+    users = rng.integers(0, count // 10 + 1, count)
+    for product, event_type, timestamp, user in zip(ids.tolist(), types.tolist(), timestamps.tolist(), users.tolist()):
+        event = {"product_id": f"prod_{product:06d}", "type": event_type, "user_id": f"u{user}", "timestamp": timestamp}
+        if event_type == "sale":
+            event["amount"] = 25.0
+        yield event
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--products", type=int, default=5_000)
+    parser.add_argument("--days", type=int, default=2, help="Days the event timestamps spread over")
+    parser.add_argument("--url", default="sqlite:///data/events_bench.db", help="SQLAlchemy URL of an empty database")
+    parser.add_argument("--request-size", type=int, default=1_000, help="Events per simulated request")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.url.startswith("sqlite:///"):
+        os.makedirs(os.path.dirname(os.path.abspath(args.url[len("sqlite:///"):])), exist_ok=True)
+    engine = create_engine(args.url)
+    blocks = CatalogGenerator(args.seed).generate(args.products, max(1, args.products // 20), 1)
+    load_fixture(engine, blocks)
+    store = CatalogStore()
+    store.load(blocks["products"].rows(), blocks["shops"].rows(), blocks["creators"].rows())
+
+    pipeline = EventPipeline(capacity=args.events, batch_size=args.batch_size)
+    pipeline.engine, pipeline.store = engine, store
+    sent = list(payloads(args.events, args.products, args.days, args.seed))
+
+    start = time.perf_counter()
+    for offset in range(0, len(sent), args.request_size):
+        events, errors = pipeline.parse(sent[offset:offset + args.request_size])
+        if errors or not pipeline.submit(events):
+            raise SystemExit(f"Request at offset {offset} was refused: {errors[:3]}")
+    accepted = time.perf_counter() - start
+    print(f"validated and buffered {len(sent):,} events in {accepted:.2f}s ({len(sent) / accepted:,.0f} events/s)")
+
+    start = time.perf_counter()
+    pipeline.flush()
+    flushed = time.perf_counter() - start
+    report = pipeline.report()
+    print(
+        f"flushed in {flushed:.2f}s ({len(sent) / flushed:,.0f} events/s), "
+        f"{report['flushes']} batches, mean {report['flush_seconds']['mean']}s, max {report['flush_seconds']['max']}s"
+    )
+
+    with engine.connect() as conn:
+        stored = conn.execute(select(func.coalesce(func.sum(schema.product_analytics.c.views), 0))).scalar_one()
+    expected = sum(1 for event in sent if event["type"] == "view")
+    print(f"product views stored {stored:,} of {expected:,} sent ({'ok' if stored == expected else 'MISMATCH'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Generate and publish a seeded synthetic catalog snapshot for load testing.
+
+Run from the project root:
+    python benchmarks/generate_catalog.py --products 10000000 --out data/catalog_10m
+
+Point CATALOG_SNAPSHOT_PATH at the output (with the matching CATALOG_*
+sizes/seed, or CATALOG_SNAPSHOT_AUTOGENERATE=false) to serve it from every
+worker. Publishing into a directory that workers already serve switches
+them over on their next refresh check.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.catalog.generator import CatalogGenerator, snapshot_fingerprint  # noqa: E402
+from app.catalog.snapshot import publish_snapshot  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--products", type=int, default=10_000_000)
+    parser.add_argument("--shops", type=int, default=100_000)
+    parser.add_argument("--creators", type=int, default=1_000_000)
+    parser.add_argument("--out", default="data/catalog_snapshot")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    blocks = CatalogGenerator(args.seed).generate(args.products, args.shops, args.creators)
+    generated = time.perf_counter()
+
+    fingerprint = snapshot_fingerprint(args.seed, args.products, args.shops, args.creators)
+    version = publish_snapshot(args.out, blocks, fingerprint)
+    written = time.perf_counter()
+
+    total = 0
+    for kind, block in blocks.items():
+        total += block.nbytes()
+        print(f"{kind:<10} {block.size:>12,} rows {block.nbytes() / block.size:>8.1f} B/row")
+    print(f"generated in {generated - start:.2f}s, written in {written - generated:.2f}s")
+    print(f"snapshot {version} -> {args.out} ({total / 1e6:.1f} MB of columns)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark: jsonable_encoder + JSONResponse vs CatalogJSONResponse.
+
+Run from the project root:
+    python benchmarks/json_serialization.py --page-size 100
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.catalog.registry import catalog_registry  # noqa: E402
+from app.catalog.serialization import CatalogJSONResponse  # noqa: E402
+from app.routers.analytics import catalog_provider  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page-size", type=int, default=100, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=200, help="Responses per measurement")
+    args = parser.parse_args()
+
+    catalog_provider.get()
+    print(f"{'entity':<10} {'default/s':>10} {'catalog/s':>10} {'speedup':>8}")
+    for name in ("products", "shops", "creators"):
+        rows = catalog_registry.list(name)
+        content = {
+            "success": True,
+            "data": rows[:args.page_size],
+            "meta": {"total_count": len(rows), "page": 1, "limit": args.page_size}
+        }
+        assert CatalogJSONResponse(content).body == JSONResponse(jsonable_encoder(content)).body
+
+        default = min(timeit.repeat(
+            lambda: JSONResponse(jsonable_encoder(content)), number=args.repeat, repeat=3
+        ))
+        catalog = min(timeit.repeat(
+            lambda: CatalogJSONResponse(content), number=args.repeat, repeat=3
+        ))
+        print(
+            f"{name:<10} {args.repeat / default:>10.0f} {args.repeat / catalog:>10.0f} "
+            f"{default / catalog:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Shared pytest fixtures: a small seeded catalog and a SQLite copy of it.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.catalog.generator import CatalogGenerator
+from app.catalog.repository import load_fixture
+
+
+@pytest.fixture(scope="session")
+def catalog_blocks():
+    """Column blocks of a small seeded catalog."""
+    return CatalogGenerator(7).generate(300, 20, 60)
+
+
+@pytest.fixture
+def sqlite_engine():
+    """Empty in-memory SQLite database shared by all connections."""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def fixture_engine(sqlite_engine, catalog_blocks):
+    """SQLite database holding the seeded catalog (see ``load_fixture``)."""
+    load_fixture(sqlite_engine, catalog_blocks)
+    return sqlite_engine
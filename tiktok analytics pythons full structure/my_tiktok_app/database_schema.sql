@@ -94,7 +94,7 @@ CREATE TABLE shop_images (
 );
 
 CREATE TABLE shop_analytics (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     shop_id INTEGER REFERENCES shops(id) ON DELETE CASCADE,
     date DATE NOT NULL,
     views INTEGER DEFAULT 0,
@@ -106,7 +106,37 @@ CREATE TABLE shop_analytics (
     customer_acquisition_cost DECIMAL(10,2) DEFAULT 0,
     return_on_ad_spend DECIMAL(5,2) DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(shop_id, date)
+    PRIMARY KEY (shop_id, date)
+) PARTITION BY RANGE (date);
+
+-- The *_analytics tables are partitioned by month (<table>_yYYYYmMM, created
+-- ahead of ingestion); rows outside those partitions land in the default one
+CREATE TABLE shop_analytics_default PARTITION OF shop_analytics DEFAULT;
+
+-- Weekly (ISO weeks, starting Monday) and monthly sums of the daily rows,
+-- kept up to date by the ingestion job; rates are recomputed from the sums
+CREATE TABLE shop_analytics_weekly (
+    shop_id INTEGER REFERENCES shops(id) ON DELETE CASCADE,
+    period_start DATE NOT NULL,
+    days INTEGER DEFAULT 0,
+    views BIGINT DEFAULT 0,
+    clicks BIGINT DEFAULT 0,
+    sales BIGINT DEFAULT 0,
+    revenue DECIMAL(18,2) DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (shop_id, period_start)
+);
+
+CREATE TABLE shop_analytics_monthly (
+    shop_id INTEGER REFERENCES shops(id) ON DELETE CASCADE,
+    period_start DATE NOT NULL,
+    days INTEGER DEFAULT 0,
+    views BIGINT DEFAULT 0,
+    clicks BIGINT DEFAULT 0,
+    sales BIGINT DEFAULT 0,
+    revenue DECIMAL(18,2) DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (shop_id, period_start)
 );
 
 -- =====================================================
@@ -170,7 +200,7 @@ CREATE TABLE product_variants (
 );
 
 CREATE TABLE product_analytics (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     product_id INTEGER REFERENCES products(id) ON DELETE CASCADE,
     date DATE NOT NULL,
     views INTEGER DEFAULT 0,
@@ -180,7 +210,33 @@ CREATE TABLE product_analytics (
     conversion_rate DECIMAL(5,4) DEFAULT 0,
     avg_order_value DECIMAL(10,2) DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(product_id, date)
+    PRIMARY KEY (product_id, date)
+) PARTITION BY RANGE (date);
+
+CREATE TABLE product_analytics_default PARTITION OF product_analytics DEFAULT;
+
+CREATE TABLE product_analytics_weekly (
+    product_id INTEGER REFERENCES products(id) ON DELETE CASCADE,
+    period_start DATE NOT NULL,
+    days INTEGER DEFAULT 0,
+    views BIGINT DEFAULT 0,
+    clicks BIGINT DEFAULT 0,
+    sales BIGINT DEFAULT 0,
+    revenue DECIMAL(18,2) DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (product_id, period_start)
+);
+
+CREATE TABLE product_analytics_monthly (
+    product_id INTEGER REFERENCES products(id) ON DELETE CASCADE,
+    period_start DATE NOT NULL,
+    days INTEGER DEFAULT 0,
+    views BIGINT DEFAULT 0,
+    clicks BIGINT DEFAULT 0,
+    sales BIGINT DEFAULT 0,
+    revenue DECIMAL(18,2) DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (product_id, period_start)
 );
 
 -- =====================================================
@@ -225,7 +281,7 @@ CREATE TABLE creator_images (
 );
 
 CREATE TABLE creator_analytics (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     creator_id INTEGER REFERENCES creators(id) ON DELETE CASCADE,
     date DATE NOT NULL,
     followers_gained INTEGER DEFAULT 0,
@@ -235,8 +291,10 @@ CREATE TABLE creator_analytics (
     shares INTEGER DEFAULT 0,
     engagement_rate DECIMAL(5,4) DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(creator_id, date)
-);
+    PRIMARY KEY (creator_id, date)
+) PARTITION BY RANGE (date);
+
+CREATE TABLE creator_analytics_default PARTITION OF creator_analytics DEFAULT;
 
 -- =====================================================
 -- VIDEOS AND VIDEO IMAGES
@@ -279,7 +337,7 @@ CREATE TABLE video_images (
 );
 
 CREATE TABLE video_analytics (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     video_id INTEGER REFERENCES videos(id) ON DELETE CASCADE,
     date DATE NOT NULL,
     views INTEGER DEFAULT 0,
@@ -289,8 +347,10 @@ CREATE TABLE video_analytics (
     saves INTEGER DEFAULT 0,
     engagement_rate DECIMAL(5,4) DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(video_id, date)
-);
+    PRIMARY KEY (video_id, date)
+) PARTITION BY RANGE (date);
+
+CREATE TABLE video_analytics_default PARTITION OF video_analytics DEFAULT;
 
 -- =====================================================
 -- LIVESTREAMS
@@ -457,6 +517,7 @@ CREATE INDEX idx_shops_category_id ON shops(category_id);
 CREATE INDEX idx_shops_is_active ON shops(is_active);
 CREATE INDEX idx_shops_followers_count ON shops(followers_count);
 CREATE INDEX idx_shops_total_sales ON shops(total_sales);
+CREATE INDEX idx_shops_total_revenue ON shops(total_revenue);
 
 -- Products
 CREATE INDEX idx_products_shop_id ON products(shop_id);
@@ -464,6 +525,8 @@ CREATE INDEX idx_products_category_id ON products(category_id);
 CREATE INDEX idx_products_price ON products(price);
 CREATE INDEX idx_products_is_trending ON products(is_trending);
 CREATE INDEX idx_products_views_count ON products(views_count);
+CREATE INDEX idx_products_sold_quantity ON products(sold_quantity);
+CREATE INDEX idx_product_images_product_id ON product_images(product_id);
 
 -- Creators
 CREATE INDEX idx_creators_category_id ON creators(category_id);
@@ -476,15 +539,13 @@ CREATE INDEX idx_videos_product_id ON videos(product_id);
 CREATE INDEX idx_videos_views_count ON videos(views_count);
 CREATE INDEX idx_videos_created_at ON videos(created_at);
 
--- Analytics
-CREATE INDEX idx_shop_analytics_shop_date ON shop_analytics(shop_id, date);
-CREATE INDEX idx_product_analytics_product_date ON product_analytics(product_id, date);
-CREATE INDEX idx_creator_analytics_creator_date ON creator_analytics(creator_id, date);
+-- Analytics: the (entity, date) primary keys serve per-entity lookups and
+-- monthly partitions prune date ranges
 
--- Rankings
-CREATE INDEX idx_product_rankings_type_date ON product_rankings(ranking_type, date);
-CREATE INDEX idx_shop_rankings_type_date ON shop_rankings(ranking_type, date);
-CREATE INDEX idx_creator_rankings_type_date ON creator_rankings(ranking_type, date);
+-- Rankings (lists are read by type and date, per category in rank order)
+CREATE INDEX idx_product_rankings_type_date ON product_rankings(ranking_type, date, category_id, rank_position);
+CREATE INDEX idx_shop_rankings_type_date ON shop_rankings(ranking_type, date, category_id, rank_position);
+CREATE INDEX idx_creator_rankings_type_date ON creator_rankings(ranking_type, date, category_id, rank_position);
 
 -- Chat
 CREATE INDEX idx_conversations_user_id ON conversations(user_id);
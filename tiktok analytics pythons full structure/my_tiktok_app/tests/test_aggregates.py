@@ -0,0 +1,71 @@
+"""
+Running overview totals against a recount of the catalog.
+"""
+
+from collections import Counter
+
+import pytest
+
+from app.catalog.store import CatalogStore
+
+
+def _recount(store):
+    products, shops = list(store.products.rows), list(store.shops.rows)
+
+    def top(field):
+        counts = Counter(row[field] for row in products)
+        return [key for key, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:5]]
+
+    return {
+        "total_products": len(products),
+        "total_shops": len(shops),
+        "total_creators": len(store.creators.rows),
+        "total_sales": sum(row["sales_count"] for row in products),
+        "total_revenue": round(sum(row["total_revenue"] for row in shops), 2),
+        "avg_product_price": round(sum(row["price"] for row in products) / len(products), 2),
+        "top_countries": top("country"),
+        "trending_categories": top("category")
+    }
+
+
+@pytest.fixture(params=["block", "dicts"])
+def store(request, catalog_blocks):
+    def rows(kind):
+        block_rows = catalog_blocks[kind].rows()
+        return block_rows if request.param == "block" else [row.to_dict() for row in block_rows]
+
+    store = CatalogStore()
+    store.load(products=rows("products"), shops=rows("shops"), creators=rows("creators"))
+    return store
+
+
+def _assert_matches(store):
+    overview = store.aggregates.overview()
+    expected = _recount(store)
+    assert overview.pop("total_revenue") == pytest.approx(expected.pop("total_revenue"), abs=0.011)
+    assert overview == expected
+
+
+def test_overview_after_load(store):
+    _assert_matches(store)
+
+
+def test_overview_follows_upserts(store):
+    for row in list(store.products.rows)[:40]:
+        # Enough moves into one country and category to change the top lists
+        store.upsert("products", {**row, "country": "KR", "category": "Toys", "sales_count": row["sales_count"] * 3})
+    first = store.products.rows[0]
+    store.upsert("products", {**first, "id": "prod_999999", "price": 499.0, "sales_count": 10 ** 7})
+    shop = store.shops.rows[0]
+    store.upsert("shops", {**shop, "total_revenue": shop["total_revenue"] + 1234.5})
+    store.upsert("creators", {**store.creators.rows[0], "id": "creator_999999"})
+    _assert_matches(store)
+    overview = store.aggregates.overview()
+    assert "KR" in overview["top_countries"] and "Toys" in overview["trending_categories"]
+
+
+def test_overview_follows_batch_updates(store):
+    ids = [row["id"] for row in list(store.products.rows)[::3]]
+    assert store.set_values("products", "sales_count", {product_id: 5 for product_id in ids}) == len(ids)
+    assert store.set_values("products", "price", {product_id: 1.0 for product_id in ids[:10]}) == 10
+    _assert_matches(store)
@@ -0,0 +1,97 @@
+"""
+Columnar table queries against a plain filter and sort over the same rows.
+"""
+
+import pytest
+
+from app.catalog.store import CatalogStore, ColumnarTable
+
+SEARCH_FIELDS = CatalogStore.TABLES["products"]["search_fields"]
+
+
+def _reference(rows, sort_by, descending, country=None, category=None, search=None):
+    """Ids of the matching rows ordered by ``(value, id)``, ties by ascending id."""
+    matched = [
+        row for row in rows
+        if (country is None or row["country"] == country)
+        and (category is None or row["category"].lower() == category.lower())
+        and (search is None or any(search.lower() in str(row[field]).lower() for field in SEARCH_FIELDS))
+    ]
+    matched.sort(key=lambda row: row["id"])
+    matched.sort(key=lambda row: row[sort_by], reverse=descending)
+    return [row["id"] for row in matched]
+
+
+@pytest.fixture(params=["dicts", "block"])
+def products(request, catalog_blocks):
+    """Products table over plain row dicts, or over the column block itself."""
+    rows = catalog_blocks["products"].rows()
+    if request.param == "dicts":
+        rows = [row.to_dict() for row in rows]
+    return ColumnarTable(rows, **CatalogStore.TABLES["products"])
+
+
+FILTERS = [
+    {},
+    {"country": "US"},
+    {"category": "FASHION"},
+    {"country": "US", "category": "beauty"},
+    {"search": "product 1"},
+    {"category": "electronics", "search": "amazing shop 3"},
+    {"country": "XX"},
+]
+
+
+def _query(table, sort_by, descending, offset, limit, country=None, category=None, search=None):
+    return table.query(
+        equals={"country": country} if country else None,
+        iequals={"category": category} if category else None,
+        search=search,
+        sort_by=sort_by,
+        descending=descending,
+        offset=offset,
+        limit=limit
+    )
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("sort_by", ["price", "sales_count", "views", "likes"])
+@pytest.mark.parametrize("descending", [True, False])
+def test_query_matches_a_plain_filter_and_sort(products, filters, sort_by, descending):
+    expected = _reference(list(products.rows), sort_by, descending, **filters)
+    for offset, limit in ((0, 10), (7, 25), (len(expected) - 3, 10), (len(expected) + 5, 10)):
+        rows, total = _query(products, sort_by, descending, max(offset, 0), limit, **filters)
+        assert total == len(expected)
+        assert [row["id"] for row in rows] == expected[max(offset, 0):max(offset, 0) + limit]
+
+
+def test_upserts_are_visible_to_filters_sorts_and_search(products):
+    first = dict(products.rows[0])
+    products.upsert({**first, "country": "ZZ", "category": "Garden", "price": 10 ** 6, "name": "Snow Globe"})
+    products.upsert({**first, "id": "prod_999999", "country": "ZZ", "price": -1.0, "name": "Snow Shovel"})
+
+    rows = list(products.rows)
+    for filters in ({"country": "ZZ"}, {"category": "garden"}, {"search": "snow"}, {"country": "US"}):
+        for descending in (True, False):
+            expected = _reference(rows, "price", descending, **filters)
+            page, total = _query(products, "price", descending, 0, 500, **filters)
+            assert [row["id"] for row in page] == expected and total == len(expected)
+
+    page, _ = _query(products, "price", True, 0, 1)
+    assert page[0]["id"] == first["id"]
+    assert products.rows_where("country", "ZZ") == [products.rows[0], products.rows[-1]]
+
+
+def test_set_values_reorders_the_rank_orders(products):
+    changes = {row["id"]: float(i % 7) for i, row in enumerate(list(products.rows)[::5])}
+    rows = [
+        {**row, "trend_score": changes[row["id"]]} if row["id"] in changes else row
+        for row in products.rows
+    ]
+    products.set_values("trend_score", [row for row in rows if row["id"] in changes])
+
+    for descending in (True, False):
+        for filters in ({}, {"category": "fashion"}):
+            expected = _reference(rows, "trend_score", descending, **filters)
+            page, _ = _query(products, "trend_score", descending, 0, 500, **filters)
+            assert [row["id"] for row in page] == expected
@@ -0,0 +1,103 @@
+"""
+Batch comparisons against a per-entity count over the category.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.catalog.compare import COMPARE_METRICS, CatalogComparator
+from app.catalog.store import CatalogStore
+from app.routers import analytics
+
+
+@pytest.fixture
+def store(catalog_blocks):
+    store = CatalogStore()
+    store.load(
+        products=catalog_blocks["products"].rows(),
+        shops=catalog_blocks["shops"].rows(),
+        creators=catalog_blocks["creators"].rows()
+    )
+    return store
+
+
+def _expected(table, record_id, field):
+    row = table.rows[table.positions[record_id]]
+    peers = [float(other[field]) for other in table.rows if other["category"] == row["category"]]
+    value = float(row[field])
+    below = sum(peer < value for peer in peers)
+    at_or_below = sum(peer <= value for peer in peers)
+    return {
+        "category": row["category"],
+        "size": len(peers),
+        "rank": len(peers) - at_or_below + 1,
+        "percentile": round(100.0 * (below + at_or_below) / (2 * len(peers)), 1)
+    }
+
+
+@pytest.mark.parametrize("kind", sorted(COMPARE_METRICS))
+def test_compare_matches_a_count_over_the_category(store, kind):
+    table = getattr(store, kind)
+    ids = [row["id"] for row in list(table.rows)[::7]]
+    metrics = list(COMPARE_METRICS[kind])
+    result = CatalogComparator().compare(kind, table, ids, metrics)
+
+    assert result["ids"] == ids and result["missing"] == [] and result["metrics"] == metrics
+    for i, record_id in enumerate(ids):
+        for field in metrics:
+            expected = _expected(table, record_id, field)
+            assert result["category"][i] == expected["category"]
+            assert result["category_size"][i] == expected["size"]
+            assert result["values"][field][i] == table.rows[table.positions[record_id]][field]
+            assert result["ranks"][field][i] == expected["rank"]
+            assert result["percentiles"][field][i] == pytest.approx(expected["percentile"], abs=0.05)
+
+
+def test_unknown_and_repeated_ids(store):
+    table = store.shops
+    known = [table.rows[3]["id"], table.rows[1]["id"]]
+    result = CatalogComparator().compare("shops", table, [known[0], "shop_missing", known[1], known[0]], ["rating"])
+    assert result["ids"] == known and result["missing"] == ["shop_missing"]
+    assert len(result["values"]["rating"]) == len(result["ranks"]["rating"]) == 2
+
+    nothing = CatalogComparator().compare("shops", table, ["shop_missing"], ["rating"])
+    assert nothing["ids"] == [] and nothing["missing"] == ["shop_missing"]
+    assert nothing["values"]["rating"] == [] and nothing["ranks"]["rating"] == []
+
+
+def test_orders_are_rebuilt_after_the_table_changes(store):
+    comparator = CatalogComparator()
+    target = store.products.rows[0]
+    before = comparator.compare("products", store.products, [target["id"]], ["views"], store.versions["products"])
+
+    store.upsert("products", {**target, "views": 10 ** 12})
+    after = comparator.compare("products", store.products, [target["id"]], ["views"], store.versions["products"])
+    assert store.versions["products"] != 0
+    assert after["ranks"]["views"] == [1] and after["values"]["views"] == [10 ** 12]
+    assert after["ranks"]["views"] == [_expected(store.products, target["id"], "views")["rank"]]
+    assert before["values"]["views"] == [target["views"]]
+
+
+def _compare(**request):
+    return asyncio.run(analytics.compare_entities(analytics.ComparisonRequest(**request)))
+
+
+def test_compare_route(monkeypatch, store):
+    monkeypatch.setattr(analytics, "catalog_store", store)
+    ids = [store.creators.rows[0]["id"], "creator_missing"]
+    data = json.loads(_compare(kind="creators", ids=ids).body)["data"]
+    assert data["ids"] == ids[:1] and data["missing"] == ["creator_missing"]
+    assert data["metrics"] == list(COMPARE_METRICS["creators"])
+
+    for request in (
+        {"kind": "videos", "ids": ids},
+        {"kind": "creators", "ids": []},
+        {"kind": "creators", "ids": ids, "metrics": ["is_verified"]},
+        {"kind": "creators", "ids": ids, "metrics": ["username"]},
+    ):
+        with pytest.raises(HTTPException) as error:
+            _compare(**request)
+        assert error.value.status_code == 400
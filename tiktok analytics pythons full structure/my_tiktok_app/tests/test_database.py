@@ -0,0 +1,70 @@
+"""
+Engine settings and connection pool metrics.
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+# Importing the module builds the async engine, which needs greenlet
+pytest.importorskip("greenlet")
+
+from app.core.config import settings
+from app.core.database import PoolMetrics, async_url, engine_options, pool_report
+
+
+def test_async_url_swaps_the_driver():
+    assert async_url("postgresql://user:pw@db/app").drivername == "postgresql+asyncpg"
+    assert async_url("postgresql+psycopg2://db/app").drivername == "postgresql+asyncpg"
+    assert async_url("sqlite:///./app.db").drivername == "sqlite+aiosqlite"
+    assert async_url("sqlite+aiosqlite:///./app.db").drivername == "sqlite+aiosqlite"
+    assert async_url("mysql://db/app").drivername == "mysql"
+
+
+def test_sqlite_keeps_its_default_pool():
+    assert engine_options("sqlite:///./app.db") == {}
+    options = engine_options("postgresql://db/app")
+    assert options["pool_size"] == settings.DATABASE_POOL_SIZE
+    assert options["max_overflow"] == settings.DATABASE_MAX_OVERFLOW
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=2, max_overflow=1)
+    yield engine
+    engine.dispose()
+
+
+def test_metrics_follow_checkouts(engine):
+    metrics = PoolMetrics(engine, capacity=3)
+    assert metrics.report()["checked_out"] == 0 and metrics.report()["avg_hold_ms"] is None
+
+    first, second = engine.connect(), engine.connect()
+    report = metrics.report()
+    assert report["pool"] == "QueuePool"
+    assert report["checked_out"] == 2 and report["utilization"] == round(2 / 3, 4)
+    assert report["connects"] == 2 and report["checkouts"] == 2
+    first.close()
+    second.close()
+
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+    report = metrics.report()
+    assert report["checked_out"] == 0 and report["peak_checked_out"] == 2
+    assert report["checkouts"] == 3 and report["connects"] == 2  # the pooled connection was reused
+    assert report["utilization"] == 0 and report["avg_hold_ms"] >= 0
+
+
+def test_invalidated_connections_are_counted(engine):
+    metrics = PoolMetrics(engine)
+    with engine.connect() as connection:
+        connection.invalidate()
+    with engine.connect():
+        pass
+    report = metrics.report()
+    assert report["invalidations"] == 1 and report["connects"] == 2
+    assert report["checked_out"] == 0 and report["utilization"] is None
+
+
+def test_report_covers_both_engines():
+    assert set(pool_report()) == {"async", "sync"}
@@ -0,0 +1,162 @@
+"""
+Event validation, the ring buffer between requests and the flusher, and flushes into the analytics tables.
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pytest
+from sqlalchemy import event as sql_event, select
+
+from app.analytics.events import Event, EventBuffer, EventPipeline, parse_event
+from app.core import schema
+
+NOW = 1_750_000_000.0
+
+
+def _events(first, count):
+    return [
+        Event("products", f"prod_{i:06d}", "view", NOW + i, None, 1, 0.0)
+        for i in range(first, first + count)
+    ]
+
+
+def test_put_and_take_are_fifo():
+    buffer = EventBuffer(8)
+    assert buffer.put(_events(0, 5))
+    assert buffer.take(3) == _events(0, 3)
+    assert buffer.take(10) == _events(3, 2)
+    assert len(buffer) == 0 and buffer.take(4) == []
+
+
+def test_put_is_all_or_nothing():
+    buffer = EventBuffer(6)
+    assert buffer.put(_events(0, 4))
+    assert not buffer.put(_events(4, 3))
+    assert len(buffer) == 4
+    assert buffer.put(_events(4, 2)) and len(buffer) == 6
+    assert not buffer.put(_events(6, 1))
+    assert buffer.take(6) == _events(0, 6)
+
+
+def test_wraparound_matches_a_queue():
+    rng = np.random.default_rng(0)
+    buffer, expected, sent = EventBuffer(7), deque(), 0
+    for _ in range(2000):
+        if rng.integers(2):
+            batch = _events(sent, int(rng.integers(0, 8)))
+            accepted = buffer.put(batch)
+            assert accepted == (len(expected) + len(batch) <= buffer.capacity)
+            if accepted:
+                expected.extend(batch)
+                sent += len(batch)
+        else:
+            limit = int(rng.integers(0, 8))
+            taken = buffer.take(limit)
+            assert taken == [expected.popleft() for _ in range(min(limit, len(expected)))]
+        assert len(buffer) == len(expected)
+    # Taken slots are cleared, so the ring holds no references to flushed events
+    held = [slot for slot in buffer._slots if slot is not None]
+    assert sorted(held, key=lambda event: event.timestamp) == list(expected)
+
+
+def test_concurrent_producers_lose_nothing():
+    buffer, taken, done = EventBuffer(64), [], threading.Event()
+
+    def produce(worker):
+        for batch in range(200):
+            events = _events(worker * 10_000 + batch * 3, 3)
+            while not buffer.put(events):
+                pass
+
+    def consume():
+        while not done.is_set() or len(buffer):
+            taken.extend(buffer.take(16))
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    producers = [threading.Thread(target=produce, args=(worker,)) for worker in range(4)]
+    for thread in producers:
+        thread.start()
+    for thread in producers:
+        thread.join()
+    done.set()
+    consumer.join()
+
+    assert len(taken) == 4 * 200 * 3
+    for worker in range(4):
+        mine = [event.timestamp - NOW for event in taken if (event.timestamp - NOW) // 10_000 == worker]
+        assert mine == [worker * 10_000 + i for i in range(600)]
+
+
+@pytest.mark.parametrize("event_type, expected", [("sale", "sale"), ("purchase", "sale"), ("click", "click")])
+def test_sales_are_accepted_under_either_name(event_type, expected):
+    event = parse_event({"product_id": "prod_000001", "type": event_type, "amount": 9.5}, NOW)
+    assert event.type == expected
+
+
+@pytest.mark.parametrize("event_type", ["buy", ["sale"], 3])
+def test_unknown_event_types_are_rejected(event_type):
+    with pytest.raises(ValueError):
+        parse_event({"product_id": "prod_000001", "type": event_type}, NOW)
+
+
+@pytest.fixture
+def pipeline(fixture_engine):
+    pipeline = EventPipeline(capacity=1000, batch_size=100)
+    pipeline.engine = fixture_engine
+    return pipeline
+
+
+def _submit(pipeline, payloads):
+    events, errors = pipeline.parse(payloads)
+    assert not errors
+    assert pipeline.submit(events)
+    return pipeline.flush()
+
+
+def test_sales_are_written_to_the_product_and_its_shop(pipeline, fixture_engine, catalog_blocks):
+    product_id = catalog_blocks["products"].ids[0]
+    _submit(pipeline, [
+        {"product_id": product_id, "type": "view"},
+        {"product_id": product_id, "type": "sale", "quantity": 2, "amount": 30.0},
+        {"product_id": product_id, "type": "purchase", "amount": 10.0},
+    ])
+
+    products, shops = schema.product_analytics, schema.shop_analytics
+    with fixture_engine.connect() as conn:
+        product = conn.execute(select(products.c.views, products.c.sales, products.c.revenue)).one()
+        shop = conn.execute(select(shops.c.shop_id, shops.c.views, shops.c.sales, shops.c.revenue)).one()
+        shop_row = conn.execute(
+            select(schema.products.c.shop_id).where(schema.products.c.product_id == product_id)
+        ).scalar()
+    assert tuple(product) == (1, 3, 40.0)
+    assert tuple(shop) == (shop_row, 1, 3, 40.0)
+
+
+def _catalog_queries(engine):
+    statements = []
+    sql_event.listen(
+        engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement) if "FROM products" in statement else None
+    )
+    return statements
+
+
+def test_unknown_ids_are_not_looked_up_on_every_flush(pipeline, fixture_engine, catalog_blocks):
+    queries = _catalog_queries(fixture_engine)
+    now = time.time()
+    known, unknown = catalog_blocks["products"].ids[0], "prod_missing"
+    for _ in range(3):
+        _submit(pipeline, [{"product_id": known, "timestamp": now}, {"product_id": unknown, "timestamp": now}])
+    assert len(queries) == 1
+    assert pipeline.metrics.counts["unknown_entity"] == 3
+
+    # Once remembered misses expire the id is looked up again
+    pipeline.unknown_id_seconds = 0
+    pipeline._unknown["products"][unknown] = 0.0
+    _submit(pipeline, [{"product_id": unknown, "timestamp": now}])
+    _submit(pipeline, [{"product_id": unknown, "timestamp": now}])
+    assert len(queries) == 3
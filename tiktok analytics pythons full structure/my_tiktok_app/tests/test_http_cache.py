@@ -0,0 +1,67 @@
+"""
+Which routes the catalog ETag middleware validates, per catalog backend, and when it answers 304.
+"""
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.catalog.store import catalog_store
+from app.core.http_cache import CATALOG_ROUTE_KINDS, DATABASE_ROUTES, CatalogETagMiddleware
+
+MEMORY = CatalogETagMiddleware(None, rules=CATALOG_ROUTE_KINDS)
+DATABASE = CatalogETagMiddleware(None, rules=tuple(DATABASE_ROUTES) + tuple(CATALOG_ROUTE_KINDS))
+
+
+@pytest.mark.parametrize("path, kinds", [
+    ("/api/analytics/trending-products", ("products",)),
+    ("/api/analytics/shops", ("shops", "products")),
+    ("/api/analytics/creators", ("creators",)),
+    ("/api/analytics/shop/shop_001", ("shops", "products")),
+])
+def test_database_backed_routes_get_no_etag(path, kinds):
+    assert MEMORY._kinds(path) == kinds
+    assert DATABASE._kinds(path) is None
+
+
+@pytest.mark.parametrize("path, kinds", [
+    ("/api/analytics/product/prod_000001", ("products",)),
+    ("/api/analytics/creator/creator_000001", ("creators",)),
+    ("/api/analytics/category/cat_1", ("categories", "products")),
+])
+def test_store_backed_details_keep_their_etag(path, kinds):
+    assert DATABASE._kinds(path) == kinds
+
+
+def test_conditional_requests_see_a_reloaded_catalog(catalog_blocks):
+    catalog_store.load(
+        products=catalog_blocks["products"].rows(),
+        shops=catalog_blocks["shops"].rows(),
+        creators=catalog_blocks["creators"].rows(),
+        generation="first"
+    )
+    published = []
+
+    def refresh():
+        # Stands in for require_catalog switching to a snapshot another worker published
+        if published:
+            catalog_store.load(
+                products=catalog_blocks["products"].rows(),
+                shops=catalog_blocks["shops"].rows(),
+                creators=catalog_blocks["creators"].rows(),
+                generation=published.pop()
+            )
+
+    app = Starlette(routes=[Route("/api/analytics/product/{product_id}", lambda request: JSONResponse({}))])
+    app.add_middleware(CatalogETagMiddleware, refresh=refresh)
+    client = TestClient(app)
+
+    etag = client.get("/api/analytics/product/prod_000001").headers["etag"]
+    assert client.get("/api/analytics/product/prod_000001", headers={"If-None-Match": etag}).status_code == 304
+
+    published.append("second")
+    response = client.get("/api/analytics/product/prod_000001", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,70 @@
+"""
+Posting-list indexes over coded columns and their intersection.
+"""
+
+import numpy as np
+import pytest
+
+from app.catalog.indexes import PostingIndex, intersect_postings
+from app.catalog.store import CatalogStore, ColumnarTable
+
+VALUES = ["US", "uk", "US", "UK", "de", "US", "uk"]
+
+
+@pytest.fixture
+def index():
+    vocab = {}
+    codes = np.array([vocab.setdefault(value, len(vocab)) for value in VALUES], dtype=np.int32)
+    return PostingIndex(codes, vocab)
+
+
+def test_postings_are_sorted_row_ids(index):
+    assert index.get("US").tolist() == [0, 2, 5]
+    assert index.get("uk").tolist() == [1, 6]
+    assert index.get("us").tolist() == []
+    assert index.get("FR").dtype == np.int64
+
+
+def test_case_insensitive_lookup_merges_spellings(index):
+    assert index.get_ignore_case("uk").tolist() == [1, 3, 6]
+    assert index.get_ignore_case("Us").tolist() == [0, 2, 5]
+    assert index.get_ignore_case("fr").tolist() == []
+
+
+def test_add_and_remove_keep_postings_sorted(index):
+    index.add("UK", 0)
+    index.add("Fr", 9)
+    index.remove("US", 0)
+    index.remove("US", 4)  # not in the posting: ignored
+    assert index.get("US").tolist() == [2, 5]
+    assert index.get_ignore_case("uk").tolist() == [0, 1, 3, 6]
+    assert index.get_ignore_case("FR").tolist() == [9]
+
+
+def test_intersection():
+    rng = np.random.default_rng(0)
+    postings = [np.unique(rng.integers(0, 1000, size)) for size in (600, 50, 300)]
+    expected = np.intersect1d(np.intersect1d(postings[0], postings[1]), postings[2])
+    assert intersect_postings(postings).tolist() == expected.tolist()
+    assert intersect_postings([postings[0], np.zeros(0, dtype=np.int64)]).tolist() == []
+    assert intersect_postings([]) is None
+
+
+@pytest.mark.parametrize("equals, iequals", [
+    ({"country": "US"}, None),
+    ({"shop_id": "shop_003"}, None),
+    ({"country": "DE", "shop_id": "shop_001"}, {"category": "fashion"}),
+    (None, {"category": "HOME & GARDEN"}),
+    ({"country": "US", "shop_id": "shop_404"}, None),
+])
+def test_filter_ids_match_a_scan(catalog_blocks, equals, iequals):
+    table = ColumnarTable(catalog_blocks["products"].rows(), **CatalogStore.TABLES["products"])
+    expected = [
+        position for position, row in enumerate(table.rows)
+        if all(row[field] == value for field, value in (equals or {}).items())
+        and all(row[field].lower() == value.lower() for field, value in (iequals or {}).items())
+    ]
+    assert table.filter_ids(equals, iequals).tolist() == expected
+    assert table.filter_ids() is None
+    if equals and "shop_id" in equals and not iequals and len(equals) == 1:
+        assert table.rows_where("shop_id", equals["shop_id"], limit=3) == [table.rows[i] for i in expected[:3]]
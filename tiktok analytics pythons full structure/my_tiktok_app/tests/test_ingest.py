@@ -0,0 +1,118 @@
+"""
+Bulk upserts into the daily analytics tables.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import OperationalError
+
+from app.analytics import ingest as ingest_module
+from app.analytics.ingest import AnalyticsIngestor, IngestMetrics
+from app.analytics.rollups import ROLLUPS
+from app.core import schema
+
+DAY = timedelta(days=1)
+START = date(2025, 3, 3)
+
+
+def _rows(seed=0):
+    return [
+        {"product_id": product_id, "date": START + offset * DAY, "views": 100 + seed + offset,
+         "clicks": 10 + offset, "sales": product_id + offset, "revenue": 12.5 * (product_id + offset)}
+        for product_id in (1, 2, 3, 4)
+        for offset in range(12)
+    ]
+
+
+def _contents(engine, table):
+    with engine.connect() as conn:
+        columns = [column for column in table.c if column.name != "created_at"]
+        return sorted(tuple(row) for row in conn.execute(select(*columns)))
+
+
+@pytest.fixture
+def ingestor(fixture_engine):
+    return AnalyticsIngestor(fixture_engine, batch_size=7, metrics=IngestMetrics())
+
+
+def test_same_ingest_twice_is_idempotent(fixture_engine, ingestor):
+    daily = schema.product_analytics
+    rollups = ROLLUPS["products"].values()
+    first = ingestor.ingest("products", _rows())
+    assert first["rows"] == 48 and first["batches"] == 7 and first["duplicates"] == 0
+    after_first = [_contents(fixture_engine, table) for table in (daily, *rollups)]
+
+    second = ingestor.ingest("products", _rows())
+    assert second["rows"] == first["rows"]
+    assert [_contents(fixture_engine, table) for table in (daily, *rollups)] == after_first
+    assert len(after_first[0]) == 48
+
+    report = ingestor.metrics.report()["products"]
+    assert report["runs"] == 2 and report["rows"] == 96 and report["batches"] == 14
+
+
+def test_reingest_replaces_values(fixture_engine, ingestor):
+    ingestor.ingest("products", _rows())
+    ingestor.ingest("products", _rows(seed=50)[:20])
+    views = {(row[0], row[1]): row[2] for row in _contents(fixture_engine, schema.product_analytics)}
+    assert len(views) == 48
+    assert views[(1, START)] == 150 and views[(4, START + 11 * DAY)] == 111
+
+
+def test_repeated_keys_keep_the_last_row_and_missing_metrics_get_defaults(fixture_engine, ingestor):
+    stats = ingestor.ingest("products", [
+        {"product_id": 1, "date": START.isoformat(), "views": 5},
+        {"product_id": 1, "date": START, "views": 9, "sales": 2},
+    ])
+    assert stats["rows"] == 1 and stats["duplicates"] == 1
+    daily = schema.product_analytics
+    with fixture_engine.connect() as conn:
+        row = conn.execute(select(daily).where(daily.c.product_id == 1)).one()
+    assert (row.date, row.views, row.sales, row.clicks, float(row.revenue)) == (START, 9, 2, 0, 0.0)
+
+
+def test_increments_add_to_existing_rows(fixture_engine, ingestor):
+    ingestor.ingest("products", [{"product_id": 2, "date": START, "views": 100, "sales": 10, "revenue": 50}])
+    stats = ingestor.add("products", [
+        {"product_id": 2, "date": START, "views": 60, "sales": 10, "revenue": 30},
+        {"product_id": 2, "date": START, "views": 40},
+        {"product_id": 3, "date": START, "views": 4, "sales": 1, "revenue": 8},
+    ])
+    assert stats["rows"] == 2 and stats["duplicates"] == 1
+    daily = schema.product_analytics
+    with fixture_engine.connect() as conn:
+        rows = {row.product_id: row for row in conn.execute(select(daily))}
+    assert (rows[2].views, rows[2].sales, float(rows[2].revenue)) == (200, 20, 80.0)
+    assert float(rows[2].conversion_rate) == pytest.approx(0.1) and float(rows[2].avg_order_value) == 4.0
+    assert (rows[3].views, float(rows[3].conversion_rate)) == (4, 0.25)
+
+    with pytest.raises(ValueError, match="likes"):
+        ingestor.add("products", [{"product_id": 2, "date": START, "likes": 1}])
+
+
+def test_lost_connections_are_retried(monkeypatch, fixture_engine, ingestor):
+    monkeypatch.setattr(ingest_module.time, "sleep", lambda seconds: None)
+    failures = []
+
+    def fail_once(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO product_analytics") and not failures:
+            failures.append(statement)
+            raise OperationalError(statement, parameters, Exception("connection lost"))
+
+    event.listen(fixture_engine, "before_cursor_execute", fail_once)
+    try:
+        stats = ingestor.ingest("products", _rows()[:5])
+    finally:
+        event.remove(fixture_engine, "before_cursor_execute", fail_once)
+    assert failures and stats["retries"] == 1 and stats["rows"] == 5
+    assert len(_contents(fixture_engine, schema.product_analytics)) == 5
+
+
+def test_unsupported_methods_are_rejected(fixture_engine):
+    with pytest.raises(ValueError):
+        AnalyticsIngestor(fixture_engine, method="bulk")
+    with pytest.raises(ValueError, match="COPY"):
+        AnalyticsIngestor(fixture_engine, method="copy")
+    assert AnalyticsIngestor(fixture_engine).method == "values"
@@ -0,0 +1,100 @@
+"""
+Lazy component providers: one build, retries after failure, background warm-up.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.core.lazy import LazyProvider, ProviderRegistry
+
+
+class Component:
+    def __init__(self):
+        self.value = 42
+
+    def double(self):
+        return self.value * 2
+
+
+def test_builds_once_on_first_use():
+    builds = []
+
+    def factory():
+        builds.append(1)
+        return Component()
+
+    provider = LazyProvider("component", factory)
+    assert not provider.ready and builds == []
+    assert provider.report() == {"state": "pending", "seconds": None, "error": None}
+
+    assert provider.value == 42 and provider.double() == 84
+    assert provider.get() is provider.get()
+    assert provider.ready and builds == [1]
+    assert provider.report()["state"] == "ready" and provider.report()["seconds"] >= 0
+    with pytest.raises(AttributeError):
+        provider.missing
+
+
+def test_concurrent_callers_share_one_build():
+    builds = []
+    barrier = threading.Barrier(8)
+
+    def factory():
+        builds.append(1)
+        time.sleep(0.05)
+        return Component()
+
+    provider = LazyProvider("slow", factory)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(provider.get())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert builds == [1] and len(results) == 8 and all(result is results[0] for result in results)
+
+
+def test_failed_build_is_reported_and_retried():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("database offline")
+        return Component()
+
+    provider = LazyProvider("flaky", factory)
+    with pytest.raises(RuntimeError):
+        provider.get()
+    report = provider.report()
+    assert report["state"] == "failed" and report["error"] == "database offline"
+
+    assert provider.get().value == 42
+    assert provider.report()["state"] == "ready" and provider.report()["error"] is None
+    assert len(attempts) == 2
+
+
+def test_registry_warms_in_the_background():
+    registry = ProviderRegistry()
+    first = registry.register("first", Component)
+    assert registry.register("first", lambda: None) is first and registry.get("first") is first
+    registry.register("broken", lambda: 1 / 0)
+
+    threads = registry.warm(["first", "broken", "unknown"])
+    assert len(threads) == 2
+    for thread in threads:
+        thread.join()
+    # A built component starts no new build
+    assert first.ready and registry.warm(["first"]) == [threads[0]] and not threads[0].is_alive()
+
+    report = registry.report()
+    assert report["boot_seconds"] is None
+    assert report["components"]["first"]["state"] == "ready"
+    assert report["components"]["broken"]["state"] == "failed"
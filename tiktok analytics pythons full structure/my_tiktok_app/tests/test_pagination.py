@@ -0,0 +1,113 @@
+"""
+Keyset cursors: encoding, and walking the in-memory store with them.
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app.catalog.pagination import InvalidCursor, decode_cursor, encode_cursor, optional_cursor
+from app.catalog.store import CatalogStore
+from app.routers.analytics import _listing_response
+
+
+@pytest.fixture
+def store(catalog_blocks):
+    store = CatalogStore()
+    store.load(
+        products=catalog_blocks["products"].rows(),
+        shops=catalog_blocks["shops"].rows(),
+        creators=catalog_blocks["creators"].rows()
+    )
+    return store
+
+
+def _walk(table, sort_by, sort_order, limit, **filters):
+    """Every row id of a listing, paged through with cursors."""
+    ids, cursor = [], None
+    while True:
+        page = _listing_response(
+            table, filters.get("country"), filters.get("category"), filters.get("search"),
+            sort_by, sort_order, limit, 1, cursor
+        )
+        ids.extend(row["id"] for row in page["data"])
+        cursor = page["meta"]["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("value", [0, 17, -3, 12.75, 1751328000123456, None])
+def test_cursor_round_trip(value):
+    cursor = encode_cursor("price", "desc", value, "prod_000042")
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "price", "desc") == (value, "prod_000042")
+    assert optional_cursor((value, "prod_000042"), "price", "desc") == cursor
+    assert optional_cursor(None, "price", "desc") is None
+
+
+@pytest.mark.parametrize("sort_by, sort_order", [("views", "desc"), ("price", "asc")])
+def test_cursor_for_another_sort_is_rejected(sort_by, sort_order):
+    cursor = encode_cursor("price", "desc", 10, "prod_000001")
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, sort_by, sort_order)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encode_cursor("price", "desc", "10", "prod_000001"),
+    encode_cursor("price", "desc", 10, 7),
+    "eyJzIjoicHJpY2UifQ",  # {"s":"price"}
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, "price", "desc")
+
+
+@pytest.mark.parametrize("sort_by", ["trend_score", "price", "sales_count"])
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+@pytest.mark.parametrize("filters", [{}, {"country": "us"}, {"category": "fashion", "search": "1"}])
+def test_cursor_walk_matches_offset_pages(store, sort_by, sort_order, filters):
+    table = store.products
+    ordered, total = table.query(
+        equals={"country": filters["country"].upper()} if "country" in filters else None,
+        iequals={"category": filters["category"]} if "category" in filters else None,
+        search=filters.get("search"),
+        sort_by=sort_by,
+        descending=sort_order == "desc",
+        limit=len(table)
+    )
+    assert _walk(table, sort_by, sort_order, 7, **filters) == [row["id"] for row in ordered]
+    assert len(ordered) == total
+
+
+def test_walk_survives_updates_between_pages(store):
+    table = store.products
+    first = _listing_response(table, None, None, None, "price", "desc", 10, 1, None)
+    served = [row["id"] for row in first["data"]]
+
+    # Move a row that was already served to the end, and one not yet served to the front
+    store.upsert("products", {**first["data"][0].to_dict(), "price": 0.0})
+    ordered, _ = table.query(sort_by="price", descending=True, limit=len(table))
+    promoted = ordered[-2]["id"]
+    store.upsert("products", {**table.rows[table.positions[promoted]].to_dict(), "price": 10 ** 6})
+
+    cursor, rest = first["meta"]["next_cursor"], []
+    while cursor is not None:
+        page = _listing_response(table, None, None, None, "price", "desc", 10, 1, cursor)
+        rest.extend(row["id"] for row in page["data"])
+        cursor = page["meta"]["next_cursor"]
+
+    seen = served + rest
+    assert promoted not in seen
+    assert seen.count(served[0]) == 2
+    assert len(set(seen)) == len(table) - 1
+
+
+def test_cursor_errors_are_bad_requests(store):
+    with pytest.raises(HTTPException) as error:
+        _listing_response(store.products, None, None, None, "price", "desc", 10, 1, "garbage")
+    assert error.value.status_code == 400
+
+    cursor = encode_cursor("price", "desc", None, "prod_000001")
+    with pytest.raises(HTTPException) as error:
+        _listing_response(store.products, None, None, None, "price", "desc", 10, 1, cursor)
+    assert error.value.status_code == 400
@@ -0,0 +1,99 @@
+"""
+Maintained rank orders against a full re-sort.
+"""
+
+import numpy as np
+import pytest
+
+from app.catalog.rank import RankOrder
+
+
+def _expected(values, ids, descending):
+    """Row ids sorted by ``(value, id)``, ties by ascending id in both directions."""
+    return sorted(values, key=lambda row: (-values[row] if descending else values[row], ids[row]))
+
+
+def _table(size, seed=0):
+    rng = np.random.default_rng(seed)
+    # Few distinct values, so ties are common
+    values = rng.integers(0, 20, size).astype(np.int64)
+    ids = np.asarray([f"id_{i:04d}" for i in rng.permutation(size)])
+    return values, ids
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_initial_order(descending):
+    values, ids = _table(200)
+    rank = RankOrder(values, ids, descending)
+    expected = _expected(dict(enumerate(values.tolist())), ids.tolist(), descending)
+    assert rank.order.tolist() == expected
+    assert rank.ids.tolist() == [ids[row] for row in expected]
+    assert len(rank) == 200
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_insert_update_remove_match_a_resort(descending):
+    values, ids = _table(100, seed=1)
+    rank = RankOrder(values, ids, descending)
+    current = dict(enumerate(values.tolist()))
+    names = ids.tolist()
+    rng = np.random.default_rng(2)
+
+    for step in range(300):
+        action = rng.integers(3)
+        if action == 0:
+            row = len(names)
+            value = float(rng.integers(0, 20)) + 0.5  # widens the int keys
+            names.append(f"new_{step:04d}")
+            rank.insert(row, value, names[row])
+            current[row] = value
+        elif action == 1:
+            row = int(rng.choice(list(current)))
+            value = int(rng.integers(0, 20))
+            rank.update(row, current[row], value, names[row])
+            current[row] = value
+        elif len(current) > 1:
+            row = int(rng.choice(list(current)))
+            rank.remove(row, current.pop(row), names[row])
+        assert rank.order.tolist() == _expected(current, names, descending)
+
+    assert rank.ids.tolist() == [names[row] for row in rank.order.tolist()]
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_update_many_matches_single_updates(descending):
+    values, ids = _table(150, seed=3)
+    batch, single = RankOrder(values, ids, descending), RankOrder(values, ids, descending)
+    rng = np.random.default_rng(4)
+    rows = rng.choice(150, 40, replace=False).tolist()
+    new_values = rng.integers(0, 20, 40).tolist()
+
+    batch.update_many(rows, values[rows].tolist(), new_values, ids[rows].tolist())
+    for row, value in zip(rows, new_values):
+        single.update(row, values[row], value, ids[row])
+
+    current = dict(enumerate(values.tolist()))
+    current.update(zip(rows, new_values))
+    assert batch.order.tolist() == single.order.tolist() == _expected(current, ids.tolist(), descending)
+
+
+def test_seek_skips_to_the_entry_after_a_cursor():
+    values, ids = _table(120, seed=5)
+    rank = RankOrder(values, ids, descending=True)
+    for position in (0, 17, 60, 119):
+        row = rank.order[position]
+        assert rank.seek(values[row], ids[row]) == position + 1
+    # A cursor whose row is gone still lands between its neighbours
+    assert rank.seek(25, "id_0000") == 0
+    assert rank.seek(-1, "id_0000") == 120
+
+
+def test_removing_with_a_stale_value_fails():
+    values, ids = _table(30, seed=6)
+    rank = RankOrder(values, ids, descending=False)
+    with pytest.raises(KeyError):
+        rank.remove(0, values[0] + 100, ids[0])
+    with pytest.raises(KeyError):
+        rank.update_many([0], [values[0] + 0.5], [1], [ids[0]])
+    with pytest.raises(KeyError):
+        rank.update_many([0], [values[0] + 100], [1], [ids[0]])
@@ -0,0 +1,93 @@
+"""
+Ranking scores, per-category top lists, and stored ranking lookups.
+"""
+
+import asyncio
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+
+from app.analytics.rankings import (
+    RATING_PRIOR_REVIEWS, RankingJob, RankingRepository, _bayesian_rating, normalize, top_per_category
+)
+from app.catalog.repository import SQLCatalogRepository
+from app.core import schema
+from app.routers import analytics
+
+DAY = date(2025, 3, 31)
+
+
+def test_ties_keep_position_order():
+    category = np.array([1, 1, 1, 1, 2, 2])
+    score = np.array([5.0, 7.0, 5.0, 7.0, 3.0, 3.0])
+    positions, ranks = top_per_category(category, score, 3)
+    assert positions.tolist() == [1, 3, 0, 4, 5]
+    assert ranks.tolist() == [1, 2, 3, 1, 2]
+
+
+def test_categories_with_fewer_positive_scores_than_top_n():
+    category = np.array([1, 1, 1, 2, 2, 3])
+    score = np.array([0.0, 2.0, -1.0, 4.0, 1.0, 0.0])
+    positions, ranks = top_per_category(category, score, 5)
+    assert positions.tolist() == [1, 3, 4]
+    assert ranks.tolist() == [1, 1, 2]
+
+
+def test_all_zero_scores_rank_nothing():
+    score = normalize(np.zeros(4))
+    assert score.tolist() == [0.0] * 4
+    positions, ranks = top_per_category(np.array([1, 1, 2, 2]), score, 3)
+    assert positions.size == 0 and ranks.size == 0
+    assert normalize(np.array([])).size == 0
+
+
+def test_normalize_scales_to_the_best():
+    assert normalize(np.array([2.0, -1.0, 8.0, 1.0 / 3])).tolist() == [25.0, 0.0, 100.0, 4.1667]
+
+
+def test_bayesian_rating_pulls_few_reviews_toward_the_mean():
+    rating = np.array([5.0, 4.8, 3.0, 4.0])
+    reviews = np.array([2.0, 500.0, 100.0, 0.0])
+    shrunk = _bayesian_rating(rating, reviews)
+    mean = (5.0 * 2 + 4.8 * 500 + 3.0 * 100) / 602
+    assert shrunk[0] == pytest.approx((5.0 * 2 + mean * RATING_PRIOR_REVIEWS) / (2 + RATING_PRIOR_REVIEWS))
+    assert shrunk[1] > shrunk[0] > mean > shrunk[2]
+    assert shrunk[3] == 0.0
+    assert _bayesian_rating(rating, np.zeros(4)).tolist() == [0.0] * 4
+
+
+@pytest.fixture
+def repository(fixture_engine):
+    RankingJob(top_n=5, window_days=7).run(fixture_engine, DAY, ["shops"])
+    return RankingRepository(SQLCatalogRepository(fixture_engine))
+
+
+def test_lookup_orders_by_score(repository):
+    rows, day = repository.lookup("shops", "most_followed", limit=10)
+    assert day == DAY
+    assert [row["rank"] for row in rows] == list(range(1, 11))
+    followers = [row["follower_count"] for row in rows]
+    assert followers == sorted(followers, reverse=True)
+    assert repository.lookup("shops", "most_followed", date(2020, 1, 1)) == ([], date(2020, 1, 1))
+
+
+def test_deleted_entities_leave_a_gap_in_the_ranks(fixture_engine, repository):
+    rows, _ = repository.lookup("shops", "most_followed", limit=5)
+    with fixture_engine.begin() as conn:
+        conn.execute(delete(schema.shops).where(schema.shops.c.shop_id == rows[1]["id"]))
+
+    after, _ = repository.lookup("shops", "most_followed", limit=5)
+    assert [row["rank"] for row in after] == [1, 3, 4, 5]
+    assert [row["id"] for row in after] == [rows[0]["id"]] + [row["id"] for row in rows[2:]]
+
+
+def test_rankings_without_the_schema_are_unavailable(monkeypatch, sqlite_engine):
+    monkeypatch.setattr(
+        analytics.ranking_repository, "get", lambda: RankingRepository(SQLCatalogRepository(sqlite_engine))
+    )
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(analytics.get_rankings("shops", None, None, None, 20))
+    assert error.value.status_code == 503
@@ -0,0 +1,64 @@
+"""
+Slotted catalog records standing in for row dicts.
+"""
+
+import pickle
+from datetime import datetime
+
+import pytest
+
+from app.catalog.records import Category, Shop, from_microseconds, to_microseconds
+
+CREATED = datetime(2024, 2, 29, 13, 45, 7, 123456)
+
+
+def _shop(**changes):
+    row = {
+        "id": "shop_001", "name": "Lamp Co", "owner_name": None, "country": "US",
+        "category": "Home & Garden", "follower_count": 1200, "product_count": 8,
+        "total_orders": 310, "total_revenue": 8123.5, "avg_order_value": 26.2,
+        "conversion_rate": 3.1, "is_verified": True, "rating": 4.6, "created_at": CREATED
+    }
+    row.update(changes)
+    return row
+
+
+def test_record_reads_like_its_dict():
+    row = _shop()
+    shop = Shop.from_dict(row)
+    assert shop == row and dict(shop) == row and shop.to_dict() == row
+    assert list(shop) == list(Shop._fields) and len(shop) == len(row)
+    assert shop["created_at"] == CREATED and shop.get("owner_name", "x") is None
+    assert shop.get("missing") is None and "rating" in shop and "missing" not in shop
+    with pytest.raises(KeyError):
+        shop["missing"]
+    assert not hasattr(shop, "__dict__")
+
+
+def test_datetimes_keep_microseconds():
+    assert from_microseconds(to_microseconds(CREATED)) == CREATED
+    assert from_microseconds(to_microseconds(datetime(1969, 12, 31, 23, 59, 59, 1))) == datetime(1969, 12, 31, 23, 59, 59, 1)
+    assert Shop.from_dict(_shop(created_at=None))["created_at"] is None
+
+
+def test_records_are_read_only():
+    shop = Shop.from_dict(_shop())
+    with pytest.raises(AttributeError):
+        shop.rating = 1.0
+    with pytest.raises(TypeError):
+        shop["rating"] = 1.0
+    assert shop["rating"] == 4.6
+
+
+def test_missing_fields_are_rejected():
+    with pytest.raises(TypeError, match="owner_name"):
+        Shop(**{key: value for key, value in _shop().items() if key != "owner_name"})
+    with pytest.raises(KeyError):
+        Category.from_dict({"id": "fashion", "name": "Fashion"})
+
+
+def test_from_dict_reuses_records_and_pickle_round_trips():
+    shop = Shop.from_dict(_shop())
+    assert Shop.from_dict(shop) is shop
+    restored = pickle.loads(pickle.dumps(shop))
+    assert type(restored) is Shop and restored == shop and restored["created_at"] == CREATED
@@ -0,0 +1,79 @@
+"""
+Id lookups through the catalog registry, and the detail routes built on them.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.catalog.registry import CatalogRegistry
+from app.catalog.store import CatalogStore
+from app.routers import analytics
+
+
+def test_lookup_by_id():
+    registry = CatalogRegistry()
+    registry.load("categories", [{"id": "cat_1", "name": "Fashion"}, {"id": "cat_2", "name": "Beauty"}])
+    assert registry.get("categories", "cat_2") == {"id": "cat_2", "name": "Beauty"}
+    assert registry.get("categories", "cat_3") is None
+    assert registry.get("shops", "cat_1") is None
+    assert registry.count("categories") == 2 and registry.count("shops") == 0
+
+
+def test_put_replaces_or_appends():
+    registry = CatalogRegistry()
+    registry.load("categories", [{"id": "cat_1", "name": "Fashion"}])
+    registry.put("categories", {"id": "cat_1", "name": "Style"})
+    registry.put("categories", {"id": "cat_2", "name": "Beauty"})
+    registry.put("shops", {"id": "shop_001"})
+    assert [row["name"] for row in registry.list("categories")] == ["Style", "Beauty"]
+    assert registry.get("categories", "cat_2")["name"] == "Beauty"
+    assert registry.get("shops", "shop_001") == {"id": "shop_001"}
+
+
+def test_reload_replaces_every_record(catalog_blocks):
+    registry = CatalogRegistry()
+    block = catalog_blocks["creators"]
+    registry.load("creators", [{"id": "creator_old"}])
+    registry.load("creators", block.rows())
+    assert registry.get("creators", "creator_old") is None
+    assert registry.count("creators") == block.size
+    for position in (0, 17, block.size - 1):
+        record_id = block.ids[position]
+        assert registry.get("creators", record_id) is registry.list("creators")[position]
+
+
+@pytest.fixture
+def store(catalog_blocks):
+    store = CatalogStore()
+    store.load(
+        products=catalog_blocks["products"].rows(),
+        shops=catalog_blocks["shops"].rows(),
+        creators=catalog_blocks["creators"].rows(),
+        categories=analytics.generate_dummy_categories(seed=1)
+    )
+    return store
+
+
+def _data(response):
+    return json.loads(response.body)["data"]
+
+
+def test_detail_routes_find_records_by_id(store):
+    product = store.products.rows[5]
+    assert _data(asyncio.run(analytics.get_product_details(product["id"])))["name"] == product["name"]
+    creator = store.creators.rows[3]
+    assert _data(asyncio.run(analytics.get_creator_details(creator["id"])))["username"] == creator["username"]
+
+    category = _data(asyncio.run(analytics.get_category_details("fashion")))
+    assert category["name"] == "Fashion" and category["products"]
+    assert all(row["category"].lower() == category["name"].lower() for row in category["products"])
+
+
+@pytest.mark.parametrize("route", ["get_product_details", "get_shop_details", "get_creator_details", "get_category_details"])
+def test_unknown_ids_are_not_found(store, route):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(getattr(analytics, route)("missing_000001"))
+    assert error.value.status_code == 404
@@ -0,0 +1,126 @@
+"""
+SQL catalog listings over a SQLite copy of the seeded catalog.
+"""
+
+import json
+
+import pytest
+from sqlalchemy import update
+
+from app.catalog.pagination import decode_cursor
+from app.catalog.repository import SQLCatalogRepository
+from app.catalog.store import CatalogStore
+from app.core import schema
+from app.core.config import settings
+from app.routers import analytics
+from app.routers.analytics import _cached_listing, _listing_response
+
+
+def _walk(table, sort_by, sort_order, limit=40):
+    """Every row id of a listing, paged through with cursors."""
+    ids, cursor = [], None
+    while True:
+        page = _listing_response(table, None, None, None, sort_by, sort_order, limit, 1, cursor)
+        ids.extend(row["id"] for row in page["data"])
+        cursor = page["meta"]["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.fixture
+def repository(fixture_engine):
+    return SQLCatalogRepository(fixture_engine)
+
+
+@pytest.fixture
+def store(catalog_blocks):
+    store = CatalogStore()
+    store.load(
+        products=catalog_blocks["products"].rows(),
+        shops=catalog_blocks["shops"].rows(),
+        creators=catalog_blocks["creators"].rows()
+    )
+    return store
+
+
+@pytest.mark.parametrize("kind, sort_by", [
+    ("products", "price"), ("products", "views"), ("products", "name"), ("products", "created_at"),
+    ("shops", "total_revenue"), ("shops", "name"), ("shops", "rating"),
+    ("creators", "engagement_rate"), ("creators", "username"), ("creators", "no_such_field"),
+])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+@pytest.mark.parametrize("category", [None, "fashion"])
+def test_backends_list_the_same_rows(repository, store, kind, sort_by, sort_order, category):
+    memory, database = getattr(store, kind), getattr(repository, kind)
+    for page in (1, 3):
+        expected = _listing_response(memory, None, category, None, sort_by, sort_order, 25, page, None)
+        actual = _listing_response(database, None, category, None, sort_by, sort_order, 25, page, None)
+        assert [row["id"] for row in actual["data"]] == [row["id"] for row in expected["data"]]
+        assert actual["meta"]["total_count"] == expected["meta"]["total_count"]
+
+
+@pytest.mark.parametrize("kind", ["products", "shops", "creators"])
+def test_created_at_pages_issue_cursors(repository, kind):
+    table = getattr(repository, kind)
+    page = _listing_response(table, None, None, None, "created_at", "desc", 10, 1, None)
+
+    cursor = page["meta"]["next_cursor"]
+    value, record_id = decode_cursor(cursor, "created_at", "desc")
+    assert isinstance(value, int)
+    assert record_id == page["data"][-1]["id"]
+
+    following = _listing_response(table, None, None, None, "created_at", "desc", 10, 1, cursor)
+    second, _ = table.query(sort_by="created_at", descending=True, offset=10, limit=10)
+    assert [row["id"] for row in following["data"]] == [row["id"] for row in second]
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_cursor_walk_matches_offsets(repository, sort_order):
+    ordered, total = repository.products.query(sort_by="price", descending=sort_order == "desc", limit=1000)
+    assert _walk(repository.products, "price", sort_order) == [row["id"] for row in ordered]
+    assert total == len(ordered)
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_null_sort_values_come_last(fixture_engine, repository, sort_order):
+    with fixture_engine.begin() as conn:
+        conn.execute(update(schema.shops).where(schema.shops.c.id % 3 == 0).values(created_at=None, rating=None))
+
+    for sort_by in ("created_at", "rating"):
+        ids = _walk(repository.shops, sort_by, sort_order, limit=3)
+        rows, total = repository.shops.query(sort_by=sort_by, descending=sort_order == "desc", limit=100)
+        assert ids == [row["id"] for row in rows]
+        assert len(set(ids)) == total
+        values = [row[sort_by] for row in rows]
+        nulls = values.index(None)
+        assert all(value is None for value in values[nulls:])
+        assert all(value is not None for value in values[:nulls])
+
+
+def test_trend_score_is_served_and_sorted(repository):
+    rows, _ = repository.products.query(sort_by="trend_score", descending=True, limit=300)
+    scores = [row["trend_score"] for row in rows]
+    assert all(50 <= score < 100 for score in scores)
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_conversion_rate_comes_from_sales_and_views(repository):
+    rows, _ = repository.products.query(sort_by="conversion_rate", descending=True, limit=300)
+    for row in rows:
+        assert row["conversion_rate"] == pytest.approx(row["sales_count"] / row["views"], abs=5e-5)
+    rates = [row["conversion_rate"] for row in rows]
+    assert rates == sorted(rates, reverse=True)
+
+
+def test_database_listings_are_not_served_stale(monkeypatch, fixture_engine, repository):
+    monkeypatch.setattr(settings, "CATALOG_BACKEND", "database")
+    monkeypatch.setattr(analytics.catalog_repository, "get", lambda: repository)
+
+    def first_price():
+        response = _cached_listing("products", None, None, None, "price", "desc", 5, 1, None)
+        return json.loads(response.body)["data"][0]["price"]
+
+    price = first_price()
+    with fixture_engine.begin() as conn:
+        conn.execute(update(schema.products).values(price=schema.products.c.price + 1000))
+    assert first_price() == pytest.approx(price + 1000)
@@ -0,0 +1,146 @@
+"""
+Weekly and monthly rollups kept in step with the daily analytics tables.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from app.analytics.ingest import AnalyticsIngestor, IngestMetrics
+from app.analytics.rollups import (
+    ROLLUP_METRICS, ROLLUPS, period_after, period_start, plan_range, range_totals, rebuild
+)
+from app.core import schema
+
+DAY = timedelta(days=1)
+START, END = date(2025, 1, 20), date(2025, 4, 10)
+
+
+def _days(first, last):
+    return [first + i * DAY for i in range((last - first).days + 1)]
+
+
+def test_plan_range_example():
+    assert plan_range(date(2025, 1, 15), date(2025, 4, 10)) == [
+        ("day", date(2025, 1, 15), date(2025, 1, 19)),
+        ("week", date(2025, 1, 20), date(2025, 1, 26)),
+        ("day", date(2025, 1, 27), date(2025, 1, 31)),
+        ("month", date(2025, 2, 1), date(2025, 3, 31)),
+        ("day", date(2025, 4, 1), date(2025, 4, 10)),
+    ]
+
+
+def test_plan_range_covers_every_day_once_with_whole_periods():
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        start = date(2024, 1, 1) + int(rng.integers(0, 500)) * DAY
+        end = start + int(rng.integers(-3, 200)) * DAY
+        segments = plan_range(start, end)
+
+        covered = [day for _, first, last in segments for day in _days(first, last)]
+        assert covered == _days(start, end)
+        for grain, first, last in segments:
+            if grain != "day":
+                assert period_start(first, grain) == first
+                assert period_after(period_start(last, grain), grain) == last + DAY
+        # Whole weeks left as days would mean a missed rollup read
+        for grain, first, last in segments:
+            if grain == "day":
+                monday = period_start(first, "week")
+                whole = monday if monday == first else monday + 7 * DAY
+                assert whole + 6 * DAY > last
+
+
+def test_plan_range_single_grain_and_empty():
+    assert plan_range(date(2025, 3, 5), date(2025, 3, 4)) == []
+    first, last = date(2025, 3, 3), date(2025, 3, 16)
+    assert plan_range(first, last, ("week",)) == [("week", first, last)]
+    assert plan_range(first, last, ()) == [("day", first, last)]
+
+
+def _daily_rows(shop_ids, days, seed):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for shop_id in shop_ids:
+        for day in days:
+            views = int(rng.integers(100, 1000))
+            sales = int(rng.integers(0, 50))
+            rows.append({
+                "shop_id": shop_id, "date": day, "views": views, "clicks": views // 4,
+                "sales": sales, "revenue": round(sales * float(rng.uniform(5, 80)), 2)
+            })
+    return rows
+
+
+def _rollup_rows(engine, grain):
+    table = ROLLUPS["shops"][grain]
+    columns = [table.c.shop_id, table.c.period_start, table.c.days] + [table.c[m] for m in ROLLUP_METRICS]
+    with engine.connect() as conn:
+        return {
+            (row[0], row[1]): (row[2],) + tuple(round(float(value), 2) for value in row[3:])
+            for row in conn.execute(select(*columns))
+        }
+
+
+@pytest.fixture
+def ingested(fixture_engine):
+    """Shops 1-3 with daily analytics over ``START..END``, rollups kept by the ingestor."""
+    ingestor = AnalyticsIngestor(fixture_engine, batch_size=50, metrics=IngestMetrics())
+    ingestor.ingest("shops", _daily_rows([1, 2, 3], _days(START, END), seed=1))
+    return ingestor
+
+
+def _assert_matches_rebuild(engine):
+    kept = {grain: _rollup_rows(engine, grain) for grain in ROLLUPS["shops"]}
+    rebuild(engine, "shops", START - 60 * DAY, END + 60 * DAY)
+    for grain in ROLLUPS["shops"]:
+        assert kept[grain] == _rollup_rows(engine, grain)
+
+
+def test_ingest_keeps_rollups_exact(fixture_engine, ingested):
+    weeks = _rollup_rows(fixture_engine, "week")
+    assert weeks[(1, START)][0] == 7
+    assert sum(days for days, *_ in _rollup_rows(fixture_engine, "month").values()) == 3 * len(_days(START, END))
+    _assert_matches_rebuild(fixture_engine)
+
+
+def test_reingested_days_replace_their_old_values(fixture_engine, ingested):
+    # Overlaps existing days and adds new ones past the end
+    ingested.ingest("shops", _daily_rows([2, 3], _days(END - 20 * DAY, END + 10 * DAY), seed=2))
+    _assert_matches_rebuild(fixture_engine)
+
+
+def test_increments_add_to_rollups(fixture_engine, ingested):
+    ingested.add("shops", [
+        {"shop_id": 1, "date": START, "views": 5, "sales": 1, "revenue": 9.5},
+        {"shop_id": 1, "date": START, "views": 2},
+        {"shop_id": 2, "date": END + DAY, "views": 3, "clicks": 1},
+    ])
+    weeks = _rollup_rows(fixture_engine, "week")
+    assert weeks[(2, period_start(END + DAY, "week"))][0] == 1 + len(_days(period_start(END, "week"), END))
+    _assert_matches_rebuild(fixture_engine)
+
+
+def test_range_totals_match_the_daily_rows(fixture_engine, ingested):
+    rng = np.random.default_rng(3)
+    daily = schema.shop_analytics
+    for _ in range(10):
+        start = START - 5 * DAY + int(rng.integers(0, 60)) * DAY
+        end = start + int(rng.integers(0, 60)) * DAY
+        with fixture_engine.connect() as conn:
+            totals = range_totals(conn, "shops", start, end)
+            rows = conn.execute(
+                select(daily.c.shop_id, daily.c.views, daily.c.sales, daily.c.revenue)
+                .where(daily.c.date.between(start, end))
+            ).all()
+        for shop_id in (1, 2, 3):
+            mine = [row for row in rows if row.shop_id == shop_id]
+            if not mine:
+                assert shop_id not in totals
+                continue
+            assert totals[shop_id]["days"] == len(mine)
+            assert totals[shop_id]["views"] == sum(row.views for row in mine)
+            assert totals[shop_id]["sales"] == sum(row.sales for row in mine)
+            assert totals[shop_id]["revenue"] == pytest.approx(float(sum(row.revenue for row in mine)), abs=0.01)
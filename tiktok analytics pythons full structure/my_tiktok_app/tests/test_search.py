@@ -0,0 +1,62 @@
+"""
+Character n-gram search against a substring scan.
+"""
+
+import numpy as np
+import pytest
+
+from app.catalog.search import NGramIndex
+
+NAMES = [
+    "Amazing Product 1", "Home & Garden Set", "amazing shop 12", "Café Crème",
+    "USB-C Cable (2m)", "Product 10", "", "Sports Bottle 100", "Garden Hose",
+]
+OWNERS = ["Ann", "Bob", "Ann Lee", "Zoë", "Bob", "Lee", "Ann", "Cy", "Dee"]
+QUERIES = [
+    "a", "A", "an", "ann", "amazing", "product 1", "product 10", "& g", "(2m)", "é",
+    "crème", "garden", "e", "zz", "bottle 1000", "lee", "ob", "10",
+]
+
+
+def _rows():
+    return [{"name": name, "owner": owner} for name, owner in zip(NAMES, OWNERS)]
+
+
+def _scan(rows, query, fields=("name", "owner")):
+    query = query.lower()
+    return [i for i, row in enumerate(rows) if any(query in row[field].lower() for field in fields)]
+
+
+@pytest.mark.parametrize("n", [2, 3])
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_a_substring_scan(n, query):
+    rows = _rows()
+    index = NGramIndex(("name", "owner"), n=n)
+    index.load(rows)
+    hits = index.search(query)
+    assert hits.dtype == np.int64
+    assert hits.tolist() == _scan(rows, query)
+
+
+def test_search_within_candidates():
+    rows = _rows()
+    index = NGramIndex(("name", "owner"))
+    index.load(rows)
+    candidates = np.array([0, 2, 5, 7], dtype=np.int64)
+    expected = [i for i in _scan(rows, "product") if i in candidates]
+    assert index.search("product", candidates).tolist() == expected
+    assert index.search("product", np.zeros(0, dtype=np.int64)).tolist() == []
+
+
+def test_put_reindexes_changed_and_new_rows():
+    rows = _rows()
+    index = NGramIndex(("name", "owner"))
+    index.load(rows)
+    index.search("warm up")  # builds the postings
+
+    rows[1] = {"name": "Kitchen Knife", "owner": "Bob"}
+    index.put(1, rows[1])
+    rows.append({"name": "Garden Gnome", "owner": "Eve"})
+    index.put(len(rows) - 1, rows[-1])
+    for query in ("garden", "knife", "home", "gnome", "bob", "e", "en g"):
+        assert index.search(query).tolist() == _scan(rows, query)
@@ -0,0 +1,72 @@
+"""
+Catalog JSON assembled from cached record fragments.
+"""
+
+import json
+from datetime import date, datetime
+
+import pytest
+
+from app.catalog.records import Category
+from app.catalog.serialization import CatalogJSONResponse, encode, encode_record
+
+
+def _category(**changes):
+    row = {
+        "id": "home", "name": "Home & Garden", "description": "Lamps, rugs — and “more”",
+        "product_count": 42, "avg_price": 19.99, "trending_score": 7.5,
+        "growth_rate": -0.25, "image_url": None
+    }
+    row.update(changes)
+    return Category.from_dict(row)
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def test_encode_matches_json_dumps():
+    record = _category()
+    when = datetime(2024, 5, 1, 8, 30, 0, 250)
+    payload = {
+        "data": [record, {"nested": (1, 2.5, None, True)}, []],
+        "meta": {"when": when, "day": date(2024, 5, 1), 7: "int key", "empty": {}},
+        "message": "ok"
+    }
+    expected = {
+        "data": [record.to_dict(), {"nested": [1, 2.5, None, True]}, []],
+        "meta": {"when": when.isoformat(), "day": "2024-05-01", "7": "int key", "empty": {}},
+        "message": "ok"
+    }
+    assert encode(payload) == _dumps(expected)
+    assert json.loads(encode(payload)) == json.loads(_dumps(expected))
+
+
+def test_non_finite_and_unknown_values_are_rejected():
+    with pytest.raises(ValueError):
+        encode({"score": float("nan")})
+    with pytest.raises(TypeError):
+        encode({"value": object()})
+
+
+def test_fragment_is_cached_per_record():
+    record = _category()
+    assert record._fragment is None
+    fragment = encode_record(record)
+    assert encode_record(record) is fragment and record._fragment is fragment
+    assert encode([record, record]) == b"[" + fragment + b"," + fragment + b"]"
+
+    # A changed row is a new record with its own fragment
+    replaced = _category(product_count=43)
+    assert json.loads(encode_record(replaced))["product_count"] == 43
+    assert json.loads(encode_record(record))["product_count"] == 42
+
+
+def test_response_renders_content_and_passes_bytes_through():
+    record = _category()
+    response = CatalogJSONResponse(content={"data": record})
+    assert response.body == b'{"data":' + encode_record(record) + b"}"
+    assert response.headers["content-type"] == "application/json"
+
+    body = b'{"cached":true}'
+    assert CatalogJSONResponse(content=body).body is body
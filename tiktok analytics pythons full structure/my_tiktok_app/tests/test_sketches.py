@@ -0,0 +1,122 @@
+"""
+Quantile sketches and histograms of catalog distributions.
+"""
+
+import numpy as np
+import pytest
+
+from app.catalog.sketches import CatalogDistributions, Histogram, QuantileSketch
+
+QUANTILES = (0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999, 1)
+
+
+def _sketch(values, relative_accuracy=0.01):
+    sketch = QuantileSketch(relative_accuracy)
+    for value in values:
+        sketch.add(float(value))
+    return sketch
+
+
+def _assert_relative_error(sketch, values):
+    ordered = np.sort(values)
+    for q, estimate in zip(QUANTILES, sketch.quantiles(QUANTILES)):
+        exact = ordered[int(np.floor(q * (len(ordered) - 1)))]
+        assert abs(estimate - exact) <= sketch.relative_accuracy * abs(exact) + 1e-12, q
+
+
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.05])
+def test_quantiles_are_within_the_relative_accuracy(relative_accuracy):
+    values = np.random.default_rng(0).lognormal(3, 2, 20000)  # spans many orders of magnitude
+    sketch = _sketch(values, relative_accuracy)
+    _assert_relative_error(sketch, values)
+    assert sketch.count == len(values)
+    assert sketch.sum == pytest.approx(values.sum())
+    assert len(sketch.positive) < 2000
+
+
+def test_negative_and_zero_values():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([-rng.exponential(50, 3000), np.zeros(500), rng.exponential(5, 3000)])
+    _assert_relative_error(_sketch(values), values)
+
+
+def test_empty_sketch_has_no_quantiles():
+    assert QuantileSketch().quantiles([0.5, 0.9]) == [None, None]
+
+
+def test_merge_equals_one_sketch_of_everything():
+    rng = np.random.default_rng(2)
+    first, second = rng.lognormal(1, 1, 5000), -rng.lognormal(0, 1, 3000)
+    merged = _sketch(first)
+    merged.merge(_sketch(second))
+    whole = _sketch(np.concatenate([first, second]))
+    assert merged.positive == whole.positive and merged.negative == whole.negative
+    assert merged.count == whole.count
+    assert merged.quantiles(QUANTILES) == whole.quantiles(QUANTILES)
+
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(0.05))
+
+
+def test_removing_values_restores_the_sketch_without_them():
+    rng = np.random.default_rng(3)
+    kept, removed = rng.lognormal(2, 1, 4000), rng.lognormal(2, 1, 1000)
+    sketch = _sketch(np.concatenate([kept, removed]))
+    for value in removed:
+        sketch.add(float(value), -1)
+    reference = _sketch(kept)
+    assert sketch.positive == reference.positive
+    assert sketch.count == reference.count
+    assert sketch.sum == pytest.approx(reference.sum)
+
+
+def test_sketch_round_trips_through_a_dict():
+    sketch = _sketch(np.random.default_rng(4).normal(0, 10, 1000))
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+    assert restored.quantiles(QUANTILES) == sketch.quantiles(QUANTILES)
+
+
+def test_histogram_bins():
+    histogram = Histogram((0, 10, 100))
+    for value in (-5, 0, 9.99, 10, 99, 100, 1e9):
+        histogram.add(value)
+    assert histogram.counts.tolist() == [3, 2, 2]
+    histogram.add(50, -1)
+    other = Histogram((0, 10, 100))
+    other.add(1)
+    histogram.merge(other)
+    assert histogram.counts.tolist() == [4, 1, 2]
+
+
+def test_block_pass_matches_row_by_row(catalog_blocks):
+    by_block, by_row = CatalogDistributions(), CatalogDistributions()
+    for kind in ("products", "shops", "creators"):
+        block = catalog_blocks[kind]
+        by_block.add_block(kind, block)
+        for row in block.rows():
+            by_row.add(kind, row)
+
+    for kind, field in (("products", "price"), ("shops", "follower_count"), ("creators", "engagement_rate")):
+        for category, country in ((None, None), ("fashion", None), (None, "us")):
+            expected = by_row.describe(kind, field, category, country)
+            actual = by_block.describe(kind, field, category, country)
+            assert actual["quantiles"] == expected["quantiles"]
+            assert actual["histogram"] == expected["histogram"]
+            assert actual["count"] == expected["count"]
+            assert actual["mean"] == pytest.approx(expected["mean"], abs=2e-6)  # rounded to 6 places
+
+
+def test_describe_merges_segments_within_accuracy(catalog_blocks):
+    distributions = CatalogDistributions()
+    distributions.add_block("products", catalog_blocks["products"])
+    prices = np.asarray(catalog_blocks["products"].numeric["price"], dtype=np.float64)
+
+    summary = distributions.describe("products", "price", quantiles=(0.5, 0.9))
+    assert summary["count"] == len(prices)
+    ordered = np.sort(prices)
+    for q in (0.5, 0.9):
+        exact = ordered[int(np.floor(q * (len(prices) - 1)))]
+        assert summary["quantiles"][f"p{q * 100:g}"] == pytest.approx(exact, rel=0.0101)
+
+    restored = CatalogDistributions.from_dict(distributions.to_dict())
+    assert restored.describe("products", "price") == distributions.describe("products", "price")
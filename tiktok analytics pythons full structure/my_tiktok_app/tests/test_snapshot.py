@@ -0,0 +1,65 @@
+"""
+Publishing and mapping shared catalog snapshots.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from app.catalog import snapshot as snapshots
+from app.catalog.generator import snapshot_fingerprint
+from app.catalog.snapshot import PUBLISH_LOCK, current_version, load_or_generate, publish_lock
+
+SIZES = dict(seed=3, products=50, shops=5, creators=10)
+
+
+def test_concurrent_cold_starts_publish_once(tmp_path, monkeypatch):
+    published = []
+    publish = snapshots.publish_snapshot
+
+    def counting_publish(*args, **kwargs):
+        published.append(args[2])
+        time.sleep(0.2)  # hold the lock while the other workers arrive
+        return publish(*args, **kwargs)
+
+    monkeypatch.setattr(snapshots, "publish_snapshot", counting_publish)
+    results = []
+    workers = [
+        threading.Thread(target=lambda: results.append(load_or_generate(str(tmp_path), **SIZES)))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    fingerprint = snapshot_fingerprint(**SIZES)
+    assert published == [fingerprint]
+    assert {result["version"] for result in results} == {fingerprint}
+    assert current_version(str(tmp_path)) == fingerprint
+    assert not os.path.exists(tmp_path / PUBLISH_LOCK)
+
+
+def test_republishing_reuses_the_version(tmp_path):
+    first = load_or_generate(str(tmp_path), **SIZES)
+    blocks = first["blocks"]
+    assert snapshots.publish_snapshot(str(tmp_path), blocks, first["fingerprint"]) == first["version"]
+    assert [entry.name for entry in os.scandir(tmp_path) if entry.is_dir()] == [first["version"]]
+
+
+def test_stale_lock_is_broken(tmp_path):
+    lock = tmp_path / PUBLISH_LOCK
+    lock.write_text("12345")
+    os.utime(lock, (time.time() - 60, time.time() - 60))
+    with publish_lock(str(tmp_path), stale_after=30):
+        assert lock.read_text() == str(os.getpid())
+    assert not lock.exists()
+
+
+def test_held_lock_times_out(tmp_path):
+    with publish_lock(str(tmp_path)):
+        with pytest.raises(TimeoutError):
+            with publish_lock(str(tmp_path), timeout=0.3):
+                pass
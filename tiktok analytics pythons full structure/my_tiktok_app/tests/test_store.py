@@ -0,0 +1,112 @@
+"""
+Columnar store lookups over a mapped catalog snapshot.
+"""
+
+import numpy as np
+import pytest
+
+from app.catalog.indexes import IdIndex
+from app.catalog.registry import catalog_registry
+from app.catalog.serialization import encode
+from app.catalog.snapshot import open_snapshot, publish_snapshot
+from app.catalog.store import CatalogStore
+
+
+@pytest.fixture
+def snapshot(tmp_path, catalog_blocks):
+    version = publish_snapshot(str(tmp_path), catalog_blocks, "seeded")
+    return open_snapshot(str(tmp_path), version)
+
+
+@pytest.fixture
+def store(snapshot):
+    blocks = snapshot["blocks"]
+    store = CatalogStore()
+    store.load(
+        products=blocks["products"].rows(),
+        shops=blocks["shops"].rows(),
+        creators=blocks["creators"].rows()
+    )
+    return store
+
+
+def test_id_index_finds_every_id():
+    ids = np.asarray(["b", "d", "a", "c"])
+    index = IdIndex(ids)
+    assert [index[row_id] for row_id in ("a", "b", "c", "d")] == [2, 0, 3, 1]
+    assert index.get("e") is None and "" not in index and None not in index
+    with pytest.raises(KeyError):
+        index["aa"]
+
+    index["e"] = 4
+    assert index["e"] == 4 and len(index) == 5
+
+
+def test_snapshot_maps_the_id_order(snapshot):
+    block = snapshot["blocks"]["products"]
+    assert isinstance(block.id_order, np.memmap)
+    assert block.ids[block.id_order].tolist() == sorted(block.ids.tolist())
+
+
+def test_store_and_registry_look_ids_up_in_the_mapped_order(store):
+    table = store.products
+    assert isinstance(table.positions, IdIndex)
+    for position, row_id in enumerate(table.ids.tolist()):
+        assert table.positions[row_id] == position
+        assert catalog_registry.get("products", row_id)["id"] == row_id
+    assert table.positions.get("prod_999999") is None
+    assert catalog_registry.get("products", "prod_999999") is None
+
+
+def test_upserted_ids_are_found(store):
+    row = {**store.products.rows[0].to_dict(), "id": "prod_999999", "name": "Brand New Gadget"}
+    store.upsert("products", row)
+    position = store.products.positions["prod_999999"]
+    assert position == len(store.products) - 1
+    assert store.products.rows[position]["name"] == "Brand New Gadget"
+    assert catalog_registry.get("products", "prod_999999")["name"] == "Brand New Gadget"
+
+
+def test_search_index_builds_on_first_search(store):
+    index = store.products.search_index
+    assert not index.built
+
+    # Changes before the first search are picked up when it builds
+    first = store.products.rows[0].to_dict()
+    store.upsert("products", {**first, "name": "Quirky Widget"})
+    store.upsert("products", {**first, "id": "prod_999999", "name": "Quirky Gizmo"})
+
+    names = [row["name"].lower() for row in store.products.rows]
+    for query in ("quirky", "qu", "product 1", "zzz"):
+        expected = [i for i, name in enumerate(names) if query in name]
+        assert store.products.search_ids(None, query).tolist() == expected
+    assert index.built
+
+    store.upsert("products", {**first, "name": "Amazing Product 1"})
+    assert store.products.search_ids(None, "quirky").tolist() == [len(names) - 1]
+
+
+def test_served_rows_reuse_their_encoded_fragment(store):
+    rows, _ = store.products.query(sort_by="price", limit=5)
+    body = encode(rows)
+    again, _ = store.products.query(sort_by="price", limit=5)
+    assert [a is b for a, b in zip(rows, again)] == [True] * 5
+    assert all(row._fragment is not None for row in again)
+    assert encode(again) == body
+
+
+def test_writes_leave_the_block_columns_alone(catalog_blocks):
+    block = catalog_blocks["products"]
+    store = CatalogStore()
+    store.load(
+        products=block.rows(),
+        shops=catalog_blocks["shops"].rows(),
+        creators=catalog_blocks["creators"].rows()
+    )
+    before = block.numeric["trend_score"][:3].copy()
+    record = block.record(0)
+
+    store.set_values("products", "trend_score", {row_id: 1.0 for row_id in block.ids[:3].tolist()})
+    assert block.numeric["trend_score"][:3].tolist() == before.tolist()
+    assert block.record(0) is record
+    assert store.products.rows[0]["trend_score"] == 1.0
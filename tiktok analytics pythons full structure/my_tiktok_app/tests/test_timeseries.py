@@ -0,0 +1,85 @@
+"""
+Time series reads, and the routes built on them with and without the analytics schema.
+"""
+
+import asyncio
+import json
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.analytics.ingest import AnalyticsIngestor, IngestMetrics
+from app.analytics.timeseries import TimeSeriesRepository
+from app.catalog.store import CatalogStore
+from app.core.config import settings
+from app.routers import analytics
+
+END = date(2025, 3, 31)
+
+
+@pytest.fixture
+def store(catalog_blocks):
+    store = CatalogStore()
+    store.load(
+        products=catalog_blocks["products"].rows(),
+        shops=catalog_blocks["shops"].rows(),
+        creators=catalog_blocks["creators"].rows()
+    )
+    return store
+
+
+@pytest.fixture
+def shop_id(fixture_engine, catalog_blocks):
+    """External id of a shop with 60 days of analytics up to ``END`` (5 sales a day, 10 a day for the last week)."""
+    ingestor = AnalyticsIngestor(fixture_engine, batch_size=50, metrics=IngestMetrics())
+    ingestor.ingest("shops", [
+        {"shop_id": 1, "date": END - timedelta(days=i), "views": 100, "sales": 10 if i < 7 else 5, "revenue": 100.0}
+        for i in range(60)
+    ])
+    return catalog_blocks["shops"].ids[0]
+
+
+def _use(monkeypatch, engine, backend):
+    monkeypatch.setattr(settings, "CATALOG_BACKEND", backend)
+    monkeypatch.setattr(analytics.timeseries_repository, "get", lambda: TimeSeriesRepository(engine))
+
+
+def _shop_details(shop_id):
+    return json.loads(asyncio.run(analytics.get_shop_details(shop_id)).body)["data"]
+
+
+def test_compare_windows_match_single_compares(fixture_engine, shop_id):
+    repository = TimeSeriesRepository(fixture_engine)
+    windows = repository.compare_windows("shops", shop_id, (7, 30))
+    assert windows == {days: repository.compare("shops", shop_id, days) for days in (7, 30)}
+    assert windows[7]["current"]["sales"] == 70 and windows[7]["previous"]["sales"] == 35
+    assert repository.compare_windows("shops", "shop_missing", (7, 30)) is None
+
+
+def test_database_shop_details_read_the_time_series(monkeypatch, store, fixture_engine, shop_id):
+    _use(monkeypatch, fixture_engine, "database")
+    data = _shop_details(shop_id)
+    assert data["analytics"] == {
+        "customer_satisfaction": data["rating"],
+        "daily_sales": 10.0,
+        "weekly_growth": 0.0,
+        "monthly_revenue": 3000.0,
+        "as_of": END.isoformat()
+    }
+
+
+@pytest.mark.parametrize("backend", ["memory", "database"])
+def test_shop_details_without_the_analytics_schema(monkeypatch, store, sqlite_engine, backend):
+    _use(monkeypatch, sqlite_engine, backend)
+    shop = store.shops.rows[0]
+    data = _shop_details(shop["id"])
+    assert data["analytics"] == {"customer_satisfaction": shop["rating"]}
+    assert "analytics" not in shop.to_dict()
+
+
+def test_timeseries_without_the_analytics_schema_is_unavailable(monkeypatch, sqlite_engine):
+    _use(monkeypatch, sqlite_engine, "memory")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(analytics.get_timeseries("shops", "shop_001", "day", None, None, "30d", 7, None))
+    assert error.value.status_code == 503
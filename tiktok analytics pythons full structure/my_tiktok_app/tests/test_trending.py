@@ -0,0 +1,190 @@
+"""
+Streaming trend scores: sketches and publishing into the catalog.
+"""
+
+import numpy as np
+import pytest
+
+from app.analytics.trending import (
+    CountMinSketch, SlidingHyperLogLog, SpaceSaving, TrendTracker, blend, stable_hash
+)
+from app.catalog.store import CatalogStore
+
+NOW = 1_750_000_000.0
+
+
+@pytest.fixture
+def store(catalog_blocks):
+    store = CatalogStore()
+    store.load(
+        products=catalog_blocks["products"].rows(),
+        shops=catalog_blocks["shops"].rows(),
+        creators=catalog_blocks["creators"].rows()
+    )
+    return store
+
+
+def _ranking(store):
+    rows, _ = store.products.query(sort_by="trend_score", descending=True, limit=len(store.products))
+    return [row["id"] for row in rows]
+
+
+def _events(product_id, count, offset=0):
+    return [
+        {"product_id": product_id, "type": kind, "user_id": f"u{offset + i}", "timestamp": NOW - i}
+        for i in range(count)
+        for kind in ("view", "sale")
+    ]
+
+
+def _category_pair(store):
+    """Two products of the same category, from the middle of the ranking."""
+    seen = {}
+    for product_id in _ranking(store)[100:]:
+        category = store.products.rows[store.products.positions[product_id]]["category"]
+        if category in seen:
+            return seen[category], product_id
+        seen[category] = product_id
+
+
+def _score(store, product_id):
+    return store.products.rows[store.products.positions[product_id]]["trend_score"]
+
+
+def _hashes(values):
+    return np.array([stable_hash(value) for value in values], dtype=np.uint64)
+
+
+@pytest.mark.parametrize("distinct", [10, 800, 20000])
+def test_hyperloglog_counts_distinct_values(distinct):
+    sketch = SlidingHyperLogLog(window=3600)
+    users = [f"user{i}" for i in range(distinct)]
+    for repeat in range(3):
+        sketch.add(_hashes(users), NOW - 10 * repeat)
+    assert sketch.count(NOW) == pytest.approx(distinct, rel=0.1)
+    assert sketch.total(NOW) == 3 * distinct
+
+
+def test_hyperloglog_window_slides():
+    sketch = SlidingHyperLogLog(window=3600, buckets=4)
+    sketch.add(_hashes([f"old{i}" for i in range(1000)]), NOW - 3000)
+    sketch.add(_hashes([f"new{i}" for i in range(1000)]), NOW)
+    assert sketch.count(NOW) == pytest.approx(2000, rel=0.1)
+    # Once its slot leaves the window the old batch no longer counts
+    assert sketch.count(NOW + 1800) == pytest.approx(1000, rel=0.1)
+    assert sketch.count(NOW + 7200) == 0
+    # Late additions for a slot that already left the window are dropped
+    sketch.add(_hashes(["late"]), NOW - 7200)
+    assert sketch.total(NOW) == 2000
+
+
+def test_count_min_never_undercounts_and_stays_within_its_bound():
+    rng = np.random.default_rng(0)
+    keys = [f"prod_{i:06d}" for i in range(5000)]
+    weights = rng.zipf(1.5, len(keys)).astype(np.float64)
+    sketch = CountMinSketch(width=2048, depth=4)
+    sketch.add(_hashes(keys), weights)
+
+    estimates = sketch.estimate(_hashes(keys))
+    assert np.all(estimates >= weights - 1e-9)
+    bound = np.e / sketch.width * weights.sum()
+    assert np.mean(estimates - weights <= bound) > 0.98
+
+    sketch.scale(0.5)
+    assert np.allclose(sketch.estimate(_hashes(keys)), estimates / 2)
+
+
+def test_space_saving_keeps_the_heavy_hitters():
+    rng = np.random.default_rng(1)
+    stream = [f"p{key}" for key in rng.zipf(1.3, 50000) if key < 10 ** 6]
+    summary = SpaceSaving(50)
+    for key in stream:
+        summary.offer(key, 1.0)
+
+    exact = {}
+    for key in stream:
+        exact[key] = exact.get(key, 0) + 1
+    threshold = len(stream) / summary.capacity
+    heavy = [key for key, count in exact.items() if count > threshold]
+    assert heavy and all(key in summary for key in heavy)
+    for key, (count, error) in summary.counts.items():
+        assert count - error <= exact[key] <= count
+    assert len(summary) == 50
+
+
+def test_blend_stays_between_prior_and_100():
+    assert blend(64.5, 0) == 64.5
+    assert blend(64.5, 100) == 100
+    assert blend(100, 37) == 100
+    assert blend(64.5, 10) < blend(64.5, 20) < 100
+
+
+def test_activity_never_lowers_rank(store):
+    tracker = TrendTracker(top_k=10, half_life=3600, baseline_half_life=86400, window=86400)
+    tracker.reset(now=NOW - 3600)
+    ranking = _ranking(store)
+    leader, follower = ranking[0], ranking[len(ranking) // 2]
+    before = {product_id: _score(store, product_id) for product_id in ranking}
+
+    tracker.record(_events(leader, 2000), store, now=NOW)
+    tracker.record(_events(follower, 50), store, now=NOW)
+    tracker.publish(store, now=NOW)
+
+    after = _ranking(store)
+    assert after[0] == leader
+    assert after.index(follower) < ranking.index(follower)
+    for product_id in ranking:
+        assert _score(store, product_id) >= before[product_id]
+
+
+def test_more_activity_scores_higher(store):
+    tracker = TrendTracker(top_k=10)
+    tracker.reset(now=NOW - 3600)
+    ranking = _ranking(store)
+    light, heavy = ranking[-1], ranking[-2]
+
+    tracker.record(_events(light, 10), store, now=NOW)
+    tracker.record(_events(heavy, 100, offset=1000), store, now=NOW)
+    tracker.publish(store, now=NOW)
+
+    assert _ranking(store).index(heavy) < _ranking(store).index(light)
+    assert _score(store, heavy) > _score(store, light)
+
+
+def test_decayed_products_return_to_their_catalog_score(store):
+    tracker = TrendTracker(top_k=1, half_life=60)
+    tracker.reset(now=NOW - 60)
+    first, second = _category_pair(store)
+    prior = _score(store, first)
+
+    tracker.record(_events(first, 20), store, now=NOW)
+    tracker.publish(store, now=NOW)
+    assert _score(store, first) > prior
+
+    # A busier product of the same category takes the only top-k slot
+    tracker.record(_events(second, 200, offset=500), store, now=NOW)
+    assert first not in tracker.audiences
+
+    tracker.publish(store, now=NOW + 60 * 60)
+    assert _score(store, first) == prior
+    assert first not in tracker.priors
+    assert second in tracker.priors
+
+
+def test_reloaded_catalog_drops_priors(store, catalog_blocks):
+    tracker = TrendTracker(top_k=10)
+    tracker.reset(now=NOW - 3600)
+    product_id = _ranking(store)[0]
+    tracker.record(_events(product_id, 5), store, now=NOW)
+    tracker.publish(store, now=NOW)
+    lifted = _score(store, product_id)
+    assert tracker.priors[product_id] < lifted
+
+    products = [row.to_dict() for row in catalog_blocks["products"].rows()]
+    for row in products:
+        if row["id"] == product_id:
+            row["trend_score"] = 10.0
+    store.load(products=products, shops=catalog_blocks["shops"].rows(), creators=catalog_blocks["creators"].rows())
+    tracker.publish(store, now=NOW)
+    assert tracker.priors[product_id] == 10.0
+    assert 10.0 < _score(store, product_id) < lifted
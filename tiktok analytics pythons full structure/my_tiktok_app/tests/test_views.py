@@ -0,0 +1,56 @@
+"""
+Detail responses are views over the shared catalog rows, never edits of them.
+"""
+
+import asyncio
+import copy
+import json
+
+import pytest
+
+from app.catalog.registry import catalog_registry
+from app.catalog.store import CatalogStore
+from app.catalog.views import overlay
+from app.routers import analytics
+
+
+def test_overlay_leaves_the_record_alone():
+    record = {"id": "prod_000001", "name": "Lamp", "tags": ["home"]}
+    original = copy.deepcopy(record)
+    view = overlay(record, name="Desk Lamp", reviews={"count": 3})
+    assert view == {"id": "prod_000001", "name": "Desk Lamp", "tags": ["home"], "reviews": {"count": 3}}
+    assert record == original
+    view["extra"] = True
+    assert "extra" not in record
+
+
+@pytest.fixture
+def store(catalog_blocks):
+    store = CatalogStore()
+    store.load(
+        products=catalog_blocks["products"].rows(),
+        shops=catalog_blocks["shops"].rows(),
+        creators=catalog_blocks["creators"].rows(),
+        categories=analytics.generate_dummy_categories(seed=1)
+    )
+    return store
+
+
+@pytest.mark.parametrize("kind, route, extra", [
+    ("products", "get_product_details", "detailed_info"),
+    ("shops", "get_shop_details", "analytics"),
+    ("creators", "get_creator_details", "collaboration_info"),
+    ("categories", "get_category_details", "market_insights"),
+])
+def test_detail_routes_do_not_change_the_shared_row(store, kind, route, extra):
+    record_id = catalog_registry.list(kind)[2]["id"]
+    shared = catalog_registry.get(kind, record_id)
+    before = shared.to_dict()
+
+    for _ in range(2):
+        data = json.loads(asyncio.run(getattr(analytics, route)(record_id)).body)["data"]
+        assert extra in data and data["id"] == record_id
+
+    assert catalog_registry.get(kind, record_id) is shared
+    assert shared.to_dict() == before
+    assert extra not in shared